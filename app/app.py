@@ -1,6 +1,7 @@
 """Flask application entry point and route definitions for Catalitium."""
 
 import os
+import json
 import logging
 import re
 from datetime import datetime, timezone, timedelta
@@ -22,10 +23,20 @@ from .models.db import (
     SUPABASE_URL,
     PER_PAGE_MAX,
     RATELIMIT_STORAGE_URL,
+    JOB_STORE,
+    JOB_SNAPSHOT_PATH,
+    JOBS_CHANGED_LISTENER,
+    DATABASE_READ_URL,
+    ADMISSION_DEEP_PAGE,
+    ADMISSION_WIDE_PATTERNS,
     logger,
     close_db,
     init_db,
     get_db,
+    get_read_db,
+    report_replica_error,
+    deadline_remaining_ms,
+    start_request_deadline,
     normalize_country,
     normalize_title,
     parse_salary_query,
@@ -36,7 +47,15 @@ from .models.db import (
     insert_search_event,
     insert_subscribe_event,
     Job,
+    invalidate_job_store,
+    set_job_store,
 )
+from .models.cache import search_cache
+from .models.changes import jobs_changes
+from .models.resilience import AdmissionController, Overloaded, search_admission, search_reads
+from .models.salary import enrich_salary_reference
+from .models.snapshot import SnapshotStore
+from .models.store import JobStore
 
 
 BLACKLIST_LINKS = {
@@ -45,6 +64,12 @@ BLACKLIST_LINKS = {
 
 ENVIRONMENT = os.getenv("FLASK_ENV") or os.getenv("ENV") or "development"
 
+@jobs_changes.on_change
+def _drop_job_caches(generation: int) -> None:
+    """Jobs changed: switch to fresh search cache keys and have the job store re-check."""
+    search_cache.generation = generation
+    invalidate_job_store()
+
 def create_app() -> Flask:
     """Instantiate and configure the Flask application."""
     app = Flask(__name__, template_folder="views/templates")
@@ -65,7 +90,9 @@ def create_app() -> Flask:
     )
     app.teardown_appcontext(close_db)
 
-    def _resolve_pagination(default_per_page: int = 20) -> Tuple[int, int]:
+    DEFAULT_PER_PAGE = 20
+
+    def _resolve_pagination(default_per_page: int = DEFAULT_PER_PAGE) -> Tuple[int, int]:
         """Return (page, per_page) constrained to safe bounds."""
         per_page_raw = request.args.get("per_page", default=default_per_page, type=int) or default_per_page
         per_page = max(10, min(per_page_raw, int(app.config.get("PER_PAGE_MAX", 100))))
@@ -73,6 +100,70 @@ def create_app() -> Flask:
         page = max(1, page_raw)
         return page, per_page
 
+    def _guarded_search(title, country, page: int, per_page: int, sort, include_archived: bool = False):
+        """Return (total, rows, stale, per_page) for a search, shedding load when the worker is busy.
+
+        Stale results come from the last successful identical search; ``stale`` says why they
+        were served: "busy" (shed or past the deadline), "unavailable" (the database failed)
+        or None for a live result. Under load, a
+        request that is only expensive for its page size runs with the default size; deep
+        pages, wide filters and requests past their deadline get the cached result or
+        ``Overloaded``.
+        """
+        deep = page > ADMISSION_DEEP_PAGE
+        wide = include_archived or Job.filter_width(title, country) >= ADMISSION_WIDE_PATTERNS
+        with search_admission.slot(deep or wide or per_page > DEFAULT_PER_PAGE) as verdict:
+            if verdict == AdmissionController.DOWNGRADE and not (deep or wide):
+                per_page, verdict = DEFAULT_PER_PAGE, AdmissionController.ADMIT
+            remaining = deadline_remaining_ms()
+            if verdict != AdmissionController.ADMIT or (remaining is not None and remaining <= 0):
+                cached = search_reads.cache.get(_search_key(title, country, page, per_page, sort, include_archived))
+                if cached is None:
+                    raise Overloaded("search shed under load")
+                total, rows = cached
+                return total, [dict(row) for row in rows], "busy", per_page
+            return _run_search(title, country, page, per_page, sort, include_archived) + (per_page,)
+
+    def _search_key(title, country, page: int, per_page: int, sort, include_archived: bool) -> tuple:
+        return (title, country, (max(1, page) - 1) * per_page, per_page, sort, include_archived)
+
+    def _run_search(title, country, page: int, per_page: int, sort, include_archived: bool):
+        offset = (max(1, page) - 1) * per_page
+
+        def run():
+            total = Job.count(title, country, include_archived=include_archived)
+            rows = Job.search(
+                title, country, limit=per_page, offset=offset, include_archived=include_archived, sort=sort
+            )
+            return total, rows
+
+        key = _search_key(title, country, page, per_page, sort, include_archived)
+        cache_key = json.dumps(key)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            total, rows = cached
+            return total, [dict(row) for row in rows], None
+        # Concurrent identical searches share one execution (and, across workers, one refresh).
+        (total, rows), stale = search_reads.call(key, lambda: search_cache.fetch(cache_key, run))
+        # Callers enrich rows in place; keep the cached copy untouched.
+        return total, [dict(row) for row in rows], "unavailable" if stale else None
+
+    def _resolve_sort() -> Optional[str]:
+        """Return the requested result order ("date" or "pay"), or None for the default."""
+        sort = (request.args.get("sort") or "").strip().lower()
+        return sort if sort in Job.SORTS else None
+
+    @app.before_request
+    def start_deadline():
+        """Start the request's time budget, counting time spent queued behind the proxy."""
+        start_request_deadline(request.headers.get("X-Request-Start"))
+
+    if JOBS_CHANGED_LISTENER:
+        @app.before_request
+        def follow_jobs_changes():
+            """Start (or, in a forked worker, restart) this worker's jobs_changed listener."""
+            jobs_changes.ensure_running()
+
     @app.after_request
     def apply_analytics_cookie(response):
         """Ensure the analytics session cookie is propagated when a new ID is issued."""
@@ -100,10 +191,23 @@ def create_app() -> Flask:
     except Exception as exc:
         logger.warning("init_db failed: %s", exc)
 
+    if JOB_SNAPSHOT_PATH:
+        # Mapped by the first search; a snapshot published by the CLI is picked up on its own.
+        set_job_store(SnapshotStore(JOB_SNAPSHOT_PATH))
+    elif JOB_STORE:
+        # Loaded lazily by the first search, then refreshed from the updated_at watermark.
+        set_job_store(JobStore())
+
     @app.errorhandler(404)
     def handle_not_found(_error):
         return jsonify({"error": "not found"}), 404
 
+    @app.errorhandler(Overloaded)
+    def handle_overloaded(error):
+        response = jsonify({"error": "overloaded"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 503
+
     @app.errorhandler(500)
     def handle_server_error(error):
         logger.exception("Unhandled error", exc_info=error)
@@ -115,6 +219,7 @@ def create_app() -> Flask:
         raw_title = (request.args.get("title") or "").strip()
         raw_country = (request.args.get("country") or "").strip()
         page, per_page = _resolve_pagination()
+        sort = _resolve_sort()
 
         cleaned_title, sal_floor, sal_ceiling = parse_salary_query(raw_title)
         title_q = normalize_title(cleaned_title)
@@ -133,11 +238,10 @@ def create_app() -> Flask:
         q_title = title_q or None
         q_country = search_country or None
 
+        stale = None
         try:
-            total = Job.count(q_title, q_country)
+            total, rows, stale, per_page = _guarded_search(q_title, q_country, page, per_page, sort)
             pages = (total + per_page - 1) // per_page if total else 1
-            offset = (max(1, page) - 1) * per_page
-            rows = Job.search(q_title, q_country, limit=per_page, offset=offset)
             if raw_title or raw_country:
                 try:
                     insert_search_event(
@@ -155,11 +259,18 @@ def create_app() -> Flask:
                 except Exception:
                     pass
 
+        except Overloaded as exc:
+            # The search page stays HTML: an empty result list with a notice to retry.
+            page_html = render_template(
+                "index.html", results=[], count=0, title_q=title_q, country_q=display_country, busy=True
+            )
+            return page_html, 503, {"Retry-After": str(exc.retry_after)}
         except Exception:
             total = 0
             pages = 1
             rows = []
 
+        enrich_salary_reference(rows)
         items = []
         for row in rows:
             title = (row.get("job_title") or "(Untitled)").strip()
@@ -179,6 +290,7 @@ def create_app() -> Flask:
                     "date_posted": format_job_date_string(job_date_str) if job_date_str else "",
                     "link": link,
                     "is_new": _job_is_new(job_date_raw, row.get("date")),
+                    "salary_reference": row.get("salary_reference"),
                 }
             )
 
@@ -270,6 +382,7 @@ def create_app() -> Flask:
             title_q=title_q,
             country_q=display_country,
             pagination=pagination,
+            stale=stale,
         )
 
     @app.get("/api/jobs")
@@ -277,22 +390,29 @@ def create_app() -> Flask:
         """Return jobs as JSON with pagination metadata."""
         raw_title = (request.args.get("title") or "").strip()
         raw_country = (request.args.get("country") or "").strip()
+        # Opt-in historical search over jobs_archive (slower; descriptions are decompressed).
+        include_archived = (request.args.get("include_archived") or "").strip().lower() in {"1", "true", "yes"}
         page, per_page = _resolve_pagination()
+        sort = _resolve_sort()
 
         cleaned_title, _, _ = parse_salary_query(raw_title)
         country_q = normalize_country(raw_country)
         title_q = normalize_title(cleaned_title)
 
+        stale = None
         try:
-            total = Job.count(title_q or None, country_q or None)
+            total, rows, stale, per_page = _guarded_search(
+                title_q or None, country_q or None, page, per_page, sort, include_archived=include_archived
+            )
             pages = (total + per_page - 1) // per_page if per_page else 1
-            offset = (max(1, page) - 1) * per_page
-            rows = Job.search(title_q or None, country_q or None, limit=per_page, offset=offset)
+        except Overloaded:
+            raise
         except Exception:
             total = 0
             pages = 1
             rows = []
 
+        enrich_salary_reference(rows)
         items = []
         for row in rows:
             job_date_raw = row.get("job_date")
@@ -310,12 +430,16 @@ def create_app() -> Flask:
                     "job_date": format_job_date_string(job_date_str) if job_date_str else "",
                     "date": row.get("date"),
                     "is_new": _job_is_new(job_date_raw, row.get("date")),
+                    "archived": bool(row.get("archived")),
+                    "salary_reference": row.get("salary_reference"),
+                    "pay_rank": row.get("pay_rank"),
                 }
             )
 
         return jsonify(
             {
                 "items": items,
+                "stale": bool(stale),
                 "meta": {
                     "page": max(1, page),
                     "per_page": per_page,
@@ -421,7 +545,7 @@ def create_app() -> Flask:
         raw_country = (request.args.get("country") or "").strip()
         title_q = normalize_title(raw_title)
         country_q = normalize_country(raw_country)
-        rows = Job.search(title_q or None, country_q or None, limit=100, offset=0)
+        rows = enrich_salary_reference(Job.search(title_q or None, country_q or None, limit=100, offset=0))
         items = [
             {
                 "title": _to_lc(row.get("job_title") or ""),
@@ -429,6 +553,7 @@ def create_app() -> Flask:
                 "job_date": format_job_date_string((row.get("job_date") or "").strip()),
                 "link": row.get("link"),
                 "is_new": _job_is_new(row.get("job_date"), row.get("date")),
+                "salary_reference": row.get("salary_reference"),
             }
             for row in rows
         ]
@@ -450,7 +575,19 @@ def create_app() -> Flask:
                 cur.fetchone()
         except Exception:
             return jsonify({"status": "error", "db": "failed"}), 503
-        return jsonify({"status": "ok", "db": "connected"}), 200
+        payload = {"status": "ok", "db": "connected"}
+        if DATABASE_READ_URL:
+            # Reads that cannot use the replica fall back to the primary checked above.
+            read_db = get_read_db()
+            try:
+                with read_db.cursor() as cur:
+                    cur.execute("SELECT 1")
+                    cur.fetchone()
+                payload["read_db"] = "replica" if read_db is not db else "primary"
+            except Exception as exc:
+                report_replica_error(exc)
+                payload["read_db"] = "primary"
+        return jsonify(payload), 200
 
     @app.get("/legal")
     def legal():
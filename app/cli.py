@@ -0,0 +1,284 @@
+"""Command-line maintenance tasks for Catalitium.
+
+Usage:
+  python -m app.cli load-analytics [--watch SECONDS] [--stale-after SECONDS]
+  python -m app.cli archive-jobs [--days N] [--batch-size N] [--pause SECONDS]
+  python -m app.cli ingest data/jobs.csv [--insert-only] [--workers N] [--stages normalize,dedupe,...]
+  python -m app.cli ingest data/jobs.csv --full-reload
+  python -m app.cli rollback-reload
+  python -m app.cli rank-jobs
+  python -m app.cli build-snapshot [--out PATH]
+  python -m app.cli build-serving-db [--out PATH]
+  python -m app.cli sync-local-jobs [--out PATH] [--watch SECONDS] [--full]
+"""
+
+import argparse
+import os
+import time
+from typing import List, Optional
+
+from .models.db import (
+    ANALYTICS_SPOOL_DIR,
+    ANALYTICS_SPOOL_SEGMENT_SECONDS,
+    ANALYTICS_SPOOL_STALE_SECONDS,
+    JOBS_RETENTION_DAYS,
+    JOB_SNAPSHOT_PATH,
+    LOCAL_JOBS_DB_PATH,
+    SERVING_DB_PATH,
+    Job,
+    bump_jobs_generation,
+    load_analytics_spool,
+    logger,
+    migrate_db,
+    open_db,
+)
+from .models.ingest import DEFAULT_CHUNK_SIZE, DEFAULT_STAGES, format_report, ingest_file
+from .models.salary import rank_jobs
+from .models.serving import build_serving_db
+from .models.snapshot import write_snapshot
+from .models.sync import sync_local_jobs
+
+
+def _cmd_load_analytics(args: argparse.Namespace) -> int:
+    if args.stale_after <= ANALYTICS_SPOOL_SEGMENT_SECONDS:
+        print(f"--stale-after must exceed ANALYTICS_SPOOL_SEGMENT_SECONDS ({ANALYTICS_SPOOL_SEGMENT_SECONDS:g}s)")
+        return 2
+    conn = open_db()
+    try:
+        while True:
+            stats = load_analytics_spool(conn, args.spool_dir, args.stale_after)
+            if stats["segments"] or stats["skipped"]:
+                logger.info(
+                    "analytics spool: loaded %s rows from %s segments (%s already loaded)",
+                    stats["rows"],
+                    stats["segments"],
+                    stats["skipped"],
+                )
+            if not args.watch:
+                return 0
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        conn.close()
+
+
+def _publish_read_copies(conn) -> None:
+    """Rebuild the configured read copies (snapshot, serving database) after Jobs changed."""
+    if JOB_SNAPSHOT_PATH:
+        header = write_snapshot(JOB_SNAPSHOT_PATH, conn)
+        print(f"Published snapshot {JOB_SNAPSHOT_PATH} (version {header['version']}, {header['count']} jobs)")
+    if SERVING_DB_PATH:
+        built = build_serving_db(SERVING_DB_PATH, conn)
+        print(f"Published serving database {SERVING_DB_PATH} (version {built['version']}, {built['jobs']} jobs)")
+    if JOB_SNAPSHOT_PATH or SERVING_DB_PATH:
+        # Workers served the old copy since the write's own notification; drop what they cached.
+        bump_jobs_generation(conn)
+
+
+def _cmd_ingest(args: argparse.Namespace) -> int:
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    if args.full_reload and len(args.paths) != 1:
+        print("--full-reload replaces every job, so it takes exactly one export file")
+        return 2
+    conn = open_db()
+    try:
+        migrate_db(conn)
+        for path in args.paths:
+            report = ingest_file(
+                path,
+                conn,
+                fmt=args.format,
+                stages=stages,
+                batch_size=args.batch_size,
+                update_existing=not args.insert_only,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                full_reload=args.full_reload,
+            )
+            print(f"{path}:")
+            for line in format_report(report):
+                print(f"  {line}")
+        _publish_read_copies(conn)
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_rollback_reload(args: argparse.Namespace) -> int:
+    conn = open_db()
+    try:
+        Job.rollback_reload(conn)
+        print("Swapped jobs_prev back in as Jobs")
+        _publish_read_copies(conn)
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_archive_jobs(args: argparse.Namespace) -> int:
+    conn = open_db()
+    try:
+        migrate_db(conn)
+        moved = Job.archive_expired(args.days, batch_size=args.batch_size, pause=args.pause, db=conn)
+        print(f"Moved {moved} jobs older than {args.days} days to jobs_archive")
+        if moved:
+            _publish_read_copies(conn)
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_rank_jobs(args: argparse.Namespace) -> int:
+    conn = open_db()
+    try:
+        migrate_db(conn)
+        changed = rank_jobs(conn, batch_size=args.batch_size)
+        print(f"Updated pay_rank for {changed} jobs")
+        if changed:
+            _publish_read_copies(conn)
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_build_snapshot(args: argparse.Namespace) -> int:
+    if not args.out:
+        print("No snapshot path: pass --out or set JOB_SNAPSHOT_PATH")
+        return 2
+    conn = open_db()
+    try:
+        migrate_db(conn)
+        header = write_snapshot(args.out, conn)
+        print(f"Wrote {args.out} (version {header['version']}, {header['count']} jobs)")
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_build_serving_db(args: argparse.Namespace) -> int:
+    if not args.out:
+        print("No serving database path: pass --out or set SERVING_DB_PATH")
+        return 2
+    conn = open_db()
+    try:
+        migrate_db(conn)
+        built = build_serving_db(args.out, conn)
+        print(f"Wrote {args.out} (version {built['version']}, {built['jobs']} jobs)")
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_sync_local_jobs(args: argparse.Namespace) -> int:
+    if not args.out:
+        print("No local copy path: pass --out or set LOCAL_JOBS_DB_PATH")
+        return 2
+    conn = None
+    full = args.full
+    try:
+        while True:
+            try:
+                if conn is None:
+                    conn = open_db()
+                    migrate_db(conn)
+                synced = sync_local_jobs(args.out, conn, full=full)
+                full = False
+            except Exception as exc:
+                if not args.watch:
+                    raise
+                # The previous copy keeps serving through a database blip; reconnect next round.
+                logger.warning("Local jobs sync failed: %s", exc)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+            else:
+                if not args.watch:
+                    print(f"Synced {args.out}: {synced['upserted']} upserted, {synced['deleted']} deleted")
+                    return 0
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="catalitium", description="Catalitium maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load-analytics", help="Bulk-load closed analytics spool segments")
+    load.add_argument("--spool-dir", default=ANALYTICS_SPOOL_DIR, help="Spool directory (default: %(default)s)")
+    load.add_argument("--watch", type=float, default=0, metavar="SECONDS", help="Keep running, polling every SECONDS")
+    load.add_argument(
+        "--stale-after",
+        type=float,
+        default=ANALYTICS_SPOOL_STALE_SECONDS,
+        metavar="SECONDS",
+        help="Also load .open segments untouched this long; must exceed ANALYTICS_SPOOL_SEGMENT_SECONDS "
+        "(default: %(default)s)",
+    )
+    load.set_defaults(func=_cmd_load_analytics)
+
+    archive = sub.add_parser("archive-jobs", help="Move expired jobs into jobs_archive")
+    archive.add_argument("--days", type=int, default=JOBS_RETENTION_DAYS, help="Retention in days (default: %(default)s)")
+    archive.add_argument("--batch-size", type=int, default=1000, help="Jobs moved per transaction (default: %(default)s)")
+    archive.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches (default: %(default)s)")
+    archive.set_defaults(func=_cmd_archive_jobs)
+
+    ingest = sub.add_parser("ingest", help="Load job exports (TSV/CSV or JSON) into Jobs")
+    ingest.add_argument("paths", nargs="+", help="Export files to ingest")
+    ingest.add_argument("--format", choices=["csv", "tsv", "json", "jsonl"], help="Override format detection by suffix")
+    ingest.add_argument("--stages", default=",".join(DEFAULT_STAGES), help="Comma-separated stages (default: %(default)s)")
+    ingest.add_argument("--batch-size", type=int, default=Job.BULK_BATCH_SIZE, help="Rows per upsert batch (default: %(default)s)")
+    ingest.add_argument("--insert-only", action="store_true", help="Never update jobs whose link already exists")
+    ingest.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for describe/parse; 1 runs them inline (default: %(default)s)",
+    )
+    ingest.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows per chunk sent to a worker process (default: %(default)s)",
+    )
+    ingest.add_argument(
+        "--full-reload",
+        action="store_true",
+        help="Replace all jobs with the file via a blue/green table swap (Postgres only)",
+    )
+    ingest.set_defaults(func=_cmd_ingest)
+
+    rollback = sub.add_parser("rollback-reload", help="Swap the jobs table from before the last full reload back in")
+    rollback.set_defaults(func=_cmd_rollback_reload)
+
+    rank = sub.add_parser("rank-jobs", help="Recompute pay_rank after the salary/regions tables changed")
+    rank.add_argument("--batch-size", type=int, default=1000, help="Jobs updated per transaction (default: %(default)s)")
+    rank.set_defaults(func=_cmd_rank_jobs)
+
+    snapshot = sub.add_parser("build-snapshot", help="Write the memory-mapped job search snapshot")
+    snapshot.add_argument("--out", default=JOB_SNAPSHOT_PATH, help="Snapshot path (default: JOB_SNAPSHOT_PATH)")
+    snapshot.set_defaults(func=_cmd_build_snapshot)
+
+    serving = sub.add_parser("build-serving-db", help="Write the read-only SQLite database job reads are served from")
+    serving.add_argument("--out", default=SERVING_DB_PATH, help="Database path (default: SERVING_DB_PATH)")
+    serving.set_defaults(func=_cmd_build_serving_db)
+
+    sync = sub.add_parser("sync-local-jobs", help="Pull changed jobs into this host's local SQLite copy")
+    sync.add_argument("--out", default=LOCAL_JOBS_DB_PATH, help="Local copy path (default: LOCAL_JOBS_DB_PATH)")
+    sync.add_argument("--watch", type=float, default=0, metavar="SECONDS", help="Keep running, syncing every SECONDS")
+    sync.add_argument("--full", action="store_true", help="Re-pull every job instead of changes since the last sync")
+    sync.set_defaults(func=_cmd_sync_local_jobs)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,391 @@
+# app/models/analytics.py - Background batching writer for analytics events
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("catalitium")
+
+_FLUSH = object()
+_STOP = object()
+
+
+def insert_sql(table: str, columns: Sequence[str]) -> str:
+    """Return a %s-style INSERT statement for ``table``."""
+    placeholders = ",".join(["%s"] * len(columns))
+    return f"INSERT INTO {table}({', '.join(columns)}) VALUES({placeholders})"
+
+
+class DatabaseSink:
+    """Write batches through a long-lived connection, reopening it on failure or target change."""
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        target: Callable[[], Hashable],
+        columns: Dict[str, Sequence[str]],
+    ):
+        self._connect = connect
+        self._target = target
+        self._sql = {table: insert_sql(table, cols) for table, cols in columns.items()}
+        self._conn = None
+        self._conn_target: Optional[Hashable] = None
+
+    def _connection(self):
+        target = self._target()
+        if self._conn is not None and self._conn_target != target:
+            self.close()
+        if self._conn is None:
+            self._conn = self._connect()
+            self._conn_target = target
+        return self._conn
+
+    def write(self, table: str, rows: List[tuple]) -> None:
+        conn = self._connection()
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(self._sql[table], rows)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class SpoolSink:
+    """Append batches as JSON lines to rotating local segment files.
+
+    Each line is ``[table, row]``. The active segment is ``<name>.jsonl.open`` and is
+    fsynced once per batch; it is renamed to ``<name>.jsonl`` (closed, ready to load)
+    once it reaches ``max_bytes`` or has been open for ``max_age`` seconds.
+    """
+
+    def __init__(self, directory, *, max_bytes: int = 16 * 1024 * 1024, max_age: float = 60.0):
+        self.directory = Path(directory)
+        self._max_bytes = max(1, int(max_bytes))
+        self._max_age = max(0.0, float(max_age))
+        self._file = None
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._bytes = 0
+
+    def _segment(self):
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f"events-{time.time_ns():020d}-{os.getpid()}.jsonl.open"
+            self._path = self.directory / name
+            self._file = open(self._path, "a", encoding="utf-8")
+            self._opened_at = time.monotonic()
+            self._bytes = 0
+        return self._file
+
+    def write(self, table: str, rows: List[tuple]) -> None:
+        fh = self._segment()
+        data = "".join(json.dumps([table, list(row)], separators=(",", ":")) + "\n" for row in rows)
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+        self._bytes += len(data)
+        self.tick()
+
+    def tick(self) -> None:
+        """Close the active segment when it is full or old enough."""
+        if self._file is None:
+            return
+        if self._bytes >= self._max_bytes or time.monotonic() - self._opened_at >= self._max_age:
+            self.close()
+
+    def close(self) -> None:
+        fh, path = self._file, self._path
+        self._file = self._path = None
+        if fh is None:
+            return
+        fh.close()
+        if self._bytes:
+            os.replace(path, path.with_suffix(""))
+        else:
+            path.unlink(missing_ok=True)
+
+
+class AnalyticsWriter:
+    """Bounded in-process queue drained by a daemon thread with ``executemany`` batches.
+
+    ``submit`` never blocks: when the queue is full the event is dropped and counted.
+    Batches are written when ``batch_size`` events are pending or ``flush_interval``
+    seconds after the first pending event, whichever comes first. The thread is started
+    lazily and restarted after a fork, so a writer created before gunicorn forks its
+    workers is safe to use in each of them.
+    """
+
+    def __init__(
+        self,
+        sink,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+    ):
+        self._sink = sink
+        self._max_queue = max(1, int(max_queue))
+        self._batch_size = max(1, int(batch_size))
+        self._flush_interval = max(0.01, float(flush_interval))
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self._max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's queue and thread did not come along.
+                self._queue = queue.Queue(maxsize=self._max_queue)
+                self._thread = None
+                self._pid = os.getpid()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, table: str, params: tuple) -> bool:
+        """Queue one event row for ``table``; return False when it was dropped under backpressure."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((table, params))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning("analytics queue full; %s events dropped so far", dropped)
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every event submitted so far has been written or dropped."""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_FLUSH, timeout=timeout)
+        except queue.Full:
+            return
+        self._wait_idle(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending events and stop the background thread (worker shutdown)."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        if not thread.is_alive():
+            self._sink.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def _wait_idle(self, timeout: float) -> None:
+        # Queue.join() has no timeout; poll unfinished_tasks instead.
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _run(self) -> None:
+        q = self._queue
+        tick = getattr(self._sink, "tick", None)
+        while True:
+            try:
+                item = q.get(timeout=self._flush_interval)
+            except queue.Empty:
+                if tick is not None:
+                    tick()
+                continue
+            batch: List[Tuple[str, tuple]] = []
+            control = None
+            if item is _FLUSH or item is _STOP:
+                control = item
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self._flush_interval
+                while len(batch) < self._batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = q.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _FLUSH or item is _STOP:
+                        control = item
+                        break
+                    batch.append(item)
+            if control is _STOP:
+                # Drain whatever was queued before the stop request.
+                while True:
+                    try:
+                        item = q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _FLUSH or item is _STOP:
+                        q.task_done()
+                    else:
+                        batch.append(item)
+            self._write(batch)
+            for _ in range(len(batch) + (1 if control is not None else 0)):
+                q.task_done()
+            if control is _STOP:
+                return
+
+    def _write(self, batch: List[Tuple[str, tuple]]) -> None:
+        if not batch:
+            return
+        grouped: Dict[str, List[tuple]] = {}
+        for table, params in batch:
+            grouped.setdefault(table, []).append(params)
+        for table, rows in grouped.items():
+            try:
+                self._sink.write(table, rows)
+            except Exception as exc:
+                with self._lock:
+                    self.failed += len(rows)
+                logger.warning("analytics batch of %s events dropped: %s", len(rows), exc)
+                continue
+            with self._lock:
+                self.written += len(rows)
+
+
+# ------------------------- Spool Loader ---------------------------------------
+
+def _read_segment(path: Path, columns: Dict[str, Sequence[str]]) -> Dict[str, List[list]]:
+    rows: Dict[str, List[list]] = {}
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            try:
+                table, row = json.loads(line)
+            except ValueError:
+                # A torn final line from a crashed writer; everything before it is intact.
+                logger.warning("skipping unreadable line %s in %s", line_no, path.name)
+                continue
+            if table in columns and len(row) == len(columns[table]):
+                rows.setdefault(table, []).append(row)
+    return rows
+
+
+def closed_segments(directory, stale_after: Optional[float] = None) -> List[Path]:
+    """Return loadable segments in write order.
+
+    With ``stale_after`` set, segments still named ``.open`` are included once untouched
+    for that many seconds, which covers writers that died without closing them. It must
+    exceed the writer's ``max_age`` (a live writer closes even an idle segment by then), or
+    a segment could be loaded and unlinked while its writer still appends to it.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    now = time.time()
+    found = list(directory.glob("*.jsonl"))
+    if stale_after is None:
+        return sorted(found, key=lambda p: p.name)
+    for path in directory.glob("*.jsonl.open"):
+        try:
+            if now - path.stat().st_mtime >= stale_after:
+                found.append(path)
+        except FileNotFoundError:
+            continue
+    return sorted(found, key=lambda p: p.name)
+
+
+def load_segment(conn, path: Path, columns: Dict[str, Sequence[str]]) -> int:
+    """Load one segment in a single transaction; return rows loaded (0 if already loaded).
+
+    The segment name is recorded in ``analytics_segments`` inside the same transaction
+    as its rows, so re-running after a crash never loads a segment twice.
+    """
+    segment = path.name.split(".", 1)[0]
+    rows = _read_segment(path, columns)
+    total = sum(len(r) for r in rows.values())
+    if isinstance(conn, sqlite3.Connection):
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM analytics_segments WHERE segment = ?", (segment,)).fetchone():
+                conn.rollback()
+                return 0
+            for table, table_rows in rows.items():
+                cols = columns[table]
+                conn.executemany(
+                    f"INSERT INTO {table}({', '.join(cols)}) VALUES({','.join(['?'] * len(cols))})",
+                    table_rows,
+                )
+            conn.execute(
+                "INSERT INTO analytics_segments(segment, row_count, loaded_at) VALUES(?, ?, ?)",
+                (segment, total, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        return total
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = 0")
+            # Serialize concurrent loaders on the same segment name.
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (segment,))
+            cur.execute("SELECT 1 FROM analytics_segments WHERE segment = %s", (segment,))
+            if cur.fetchone():
+                return 0
+            for table, table_rows in rows.items():
+                with cur.copy(f"COPY {table} ({', '.join(columns[table])}) FROM STDIN") as copy:
+                    for row in table_rows:
+                        copy.write_row(row)
+            cur.execute(
+                "INSERT INTO analytics_segments(segment, row_count, loaded_at) VALUES(%s, %s, now())",
+                (segment, total),
+            )
+    return total
+
+
+def load_spool(
+    conn, directory, columns: Dict[str, Sequence[str]], *, stale_after: Optional[float] = None
+) -> Dict[str, int]:
+    """Bulk-load every closed segment in ``directory`` and delete it once committed."""
+    stats = {"segments": 0, "rows": 0, "skipped": 0}
+    for path in closed_segments(directory, stale_after=stale_after):
+        loaded = load_segment(conn, path, columns)
+        if loaded:
+            stats["segments"] += 1
+            stats["rows"] += loaded
+        else:
+            stats["skipped"] += 1
+        path.unlink(missing_ok=True)
+    return stats
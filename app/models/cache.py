@@ -0,0 +1,436 @@
+# app/models/cache.py - Result cache with single-flight recomputation and shared backends
+
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .db import (
+    CACHE_MAX_ENTRIES,
+    CACHE_URL,
+    SEARCH_CACHE_STALE_SECONDS,
+    SEARCH_CACHE_TTL_SECONDS,
+    deadline_remaining_ms,
+    logger,
+)
+
+_MISSING = object()
+
+
+class LocalCache:
+    """In-process LRU with per-entry TTL.
+
+    Backends share this interface: ``get``/``set``/``delete``, and ``add``, which stores only
+    when the key is absent or expired and reports whether it did (used as a lock).
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.time):
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+
+    def _live(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            return _MISSING
+        return value
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._live(key)
+            if value is _MISSING:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        with self._lock:
+            if self._live(key) is not _MISSING:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _store(self, key: str, value, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """Cache shared by every worker on a host through one WAL-mode SQLite file.
+
+    Values are pickled. Reads refresh an entry's LRU stamp at most every few seconds so hits
+    rarely write; every 64th write drops expired entries and then the least recently used
+    ones beyond ``max_entries``. Each thread keeps its own connection, and lock waits are
+    capped at 50 ms (the caller treats a busy cache as a miss).
+    """
+
+    _TOUCH_SECONDS = 5.0
+
+    def __init__(self, path: str, max_entries: int = CACHE_MAX_ENTRIES, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=0.05, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_used ON cache(used)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str):
+        conn = self._conn()
+        now = self._clock()
+        row = conn.execute("SELECT value, used FROM cache WHERE key = ? AND expires > ?", (key, now)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now - self._TOUCH_SECONDS:
+            conn.execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value, ttl: float) -> None:
+        now = self._clock()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now),
+        )
+        self._wrote()
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        now = self._clock()
+        cur = self._conn().execute(
+            "INSERT INTO cache (key, value, expires, used) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, "
+            "used = excluded.used WHERE cache.expires <= ?",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now, now),
+        )
+        if cur.rowcount:
+            self._wrote()
+        return cur.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires <= ?", (self._clock(),))
+        excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used LIMIT ?)", (excess,)
+            )
+
+
+class RedisError(RuntimeError):
+    """Error reply from a Redis-protocol server."""
+
+
+class RedisCache:
+    """Cache on any server speaking the Redis protocol (RESP2), via a minimal built-in client.
+
+    Only GET, SET (PX, NX) and DEL are used, so Redis, Valkey, KeyDB or a test stand-in all
+    work. Values are pickled; the server must be as trusted as the database. One socket per
+    thread, reopened after any error; after a failed connect the server is skipped for
+    ``retry_seconds`` so an outage costs requests one timeout, not one per cache call.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.5, retry_seconds: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        path = (parsed.path or "").strip("/")
+        self.db = int(path) if path else 0
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._down_until = 0.0
+        self._local = threading.local()
+
+    def _connect(self):
+        if time.monotonic() < self._down_until:
+            raise ConnectionError(f"cache server {self.host}:{self.port} unavailable")
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError:
+            self._down_until = time.monotonic() + self.retry_seconds
+            raise
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock, self._local.reader = sock, sock.makefile("rb")
+        self._local.pid = os.getpid()
+        if self.password:
+            auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            self._command(*auth)
+        if self.db:
+            self._command("SELECT", str(self.db))
+
+    def close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = self._local.reader = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _command(self, *args):
+        if getattr(self._local, "sock", None) is None or self._local.pid != os.getpid():
+            self._connect()
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        try:
+            self._local.sock.sendall(b"".join(parts))
+            return self._reply(self._local.reader)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def _reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RedisError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [self._reply(reader) for _ in range(size)]
+        raise ConnectionError(f"unexpected reply from cache server: {line!r}")
+
+    def get(self, key: str):
+        data = self._command("GET", key)
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key: str, value, ttl: float) -> None:
+        self._command("SET", key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), "PX", max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value, ttl: float) -> bool:
+        reply = self._command(
+            "SET", key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), "NX", "PX", max(1, int(ttl * 1000))
+        )
+        return reply == b"OK"
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+
+def cache_backend_from_url(url: str = CACHE_URL):
+    """Backend for ``CACHE_URL``: ``memory://`` (default), ``sqlite:///path`` or ``redis://host:port/db``."""
+    url = (url or "memory://").strip()
+    if url.startswith("memory://"):
+        return LocalCache()
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "valkey://")):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution within a process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        """Run ``fn`` unless a call for ``key`` is in flight; then wait and share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class ResultCache:
+    """Cache of computed results: one computation per key per process, one per expiry across workers.
+
+    Entries are kept ``stale_seconds`` past their ``ttl``. On a miss the process's callers
+    are collapsed by ``SingleFlight``; the one left running then takes a short ``add`` lock
+    in the backend. Without the lock it serves the expired entry if there is one, else waits
+    briefly for the lock holder's result before computing it itself.
+
+    Keys include ``generation``; bumping it (see app/models/changes.py) retires every entry
+    at once, and a computation started before the bump stores under the old generation.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = SEARCH_CACHE_TTL_SECONDS,
+        stale_seconds: float = SEARCH_CACHE_STALE_SECONDS,
+        lock_seconds: float = 10.0,
+        wait_seconds: float = 2.0,
+        prefix: str = "",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend if backend is not None else LocalCache()
+        self.ttl = ttl
+        self.stale_seconds = stale_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.prefix = prefix
+        self.generation = 0
+        self._clock = clock
+        self._flight = SingleFlight()
+
+    def _scoped(self, key: str) -> str:
+        return f"{self.generation}:{key}"
+
+    def _entry(self, key: str) -> Optional[Tuple[float, object]]:
+        try:
+            return self.backend.get(self.prefix + key)
+        except Exception as exc:
+            logger.warning("Result cache read failed: %s", exc)
+            return None
+
+    def get(self, key: str):
+        """The fresh cached value for ``key``, or None."""
+        return self._fresh(self._scoped(key))
+
+    def set(self, key: str, value) -> None:
+        self._store(self._scoped(key), value)
+
+    def _fresh(self, key: str):
+        entry = self._entry(key)
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+        return None
+
+    def _store(self, key: str, value) -> None:
+        try:
+            self.backend.set(self.prefix + key, (self._clock() + self.ttl, value), self.ttl + self.stale_seconds)
+        except Exception as exc:
+            logger.warning("Result cache write failed: %s", exc)
+
+    def fetch(self, key: str, compute: Callable[[], object]):
+        """Return the cached value for ``key``, computing and storing it once when missing."""
+        if self.ttl <= 0:
+            return self._flight.do(key, compute)
+        key = self._scoped(key)
+        value = self._fresh(key)
+        if value is not None:
+            return value
+        return self._flight.do(key, lambda: self._refresh(key, compute))
+
+    def _refresh(self, key: str, compute: Callable[[], object]):
+        entry = self._entry(key)
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+        lock_key = f"{self.prefix}lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            locked = self.backend.add(lock_key, token, self.lock_seconds)
+        except Exception as exc:
+            logger.warning("Result cache lock failed: %s", exc)
+            locked = True
+        if not locked:
+            if entry is not None:
+                return entry[1]
+            waited = self._wait_for(key)
+            if waited is not None:
+                return waited
+        try:
+            value = compute()
+            self._store(key, value)
+            return value
+        finally:
+            if locked:
+                self._unlock(lock_key, token)
+
+    def _wait_for(self, key: str):
+        budget = self.wait_seconds
+        remaining = deadline_remaining_ms()
+        if remaining is not None:
+            budget = min(budget, remaining / 2000.0)
+        give_up = time.monotonic() + budget
+        while time.monotonic() < give_up:
+            time.sleep(0.02)
+            value = self._fresh(key)
+            if value is not None:
+                return value
+        return None
+
+    def _unlock(self, lock_key: str, token: str) -> None:
+        try:
+            if self.backend.get(lock_key) == token:
+                self.backend.delete(lock_key)
+        except Exception as exc:
+            logger.warning("Result cache unlock failed: %s", exc)
+
+
+# Search results (count + rows) shared by the search endpoints (across workers with a shared backend).
+search_cache = ResultCache(cache_backend_from_url(), prefix="search:")
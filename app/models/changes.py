@@ -0,0 +1,129 @@
+# app/models/changes.py - Per-worker listener following the jobs generation (NOTIFY jobs_changed)
+
+import os
+import threading
+from typing import Callable, List, Optional
+
+from .db import (
+    JOBS_CHANGED_CHANNEL,
+    JOBS_CHANGED_POLL_SECONDS,
+    JOBS_LISTEN_URL,
+    _pg_connect,
+    _should_use_sqlite,
+    _sqlite_connect,
+    is_sqlite_connection,
+    jobs_generation,
+    logger,
+)
+
+
+def _listen_connect():
+    if _should_use_sqlite():
+        return _sqlite_connect()
+    # A plain SELECT every poll is all this connection runs; keep it off the request timeout.
+    return _pg_connect(JOBS_LISTEN_URL or None, connect_timeout=5, statement_timeout_ms=5000)
+
+
+class JobsChangeListener:
+    """Daemon thread calling back whenever the jobs generation moves.
+
+    On Postgres it LISTENs on ``jobs_changed`` and handles notifications as they arrive. On
+    both backends it also re-reads the generation every ``poll_seconds``, which catches
+    notifications sent while it was reconnecting (or dropped by a transaction pooler) and is
+    the only signal on SQLite. Connection errors are logged and retried with exponential
+    backoff up to ``max_backoff`` seconds. The thread is started lazily and restarted after a
+    fork, like AnalyticsWriter.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], object] = _listen_connect,
+        poll_seconds: float = JOBS_CHANGED_POLL_SECONDS,
+        max_backoff: float = 30.0,
+    ):
+        self._connect = connect
+        self.poll_seconds = max(0.01, poll_seconds)
+        self.max_backoff = max_backoff
+        self._callbacks: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.generation: Optional[int] = None
+
+    def on_change(self, callback: Callable[[int], None]) -> Callable[[int], None]:
+        """Register ``callback(generation)``; usable as a decorator."""
+        self._callbacks.append(callback)
+        return callback
+
+    def ensure_running(self) -> None:
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._thread, self._pid = None, os.getpid()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="jobs-changed", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def _seen(self, generation: int) -> None:
+        if generation == self.generation:
+            return
+        previous, self.generation = self.generation, generation
+        logger.info("Jobs generation %s -> %s", previous, generation)
+        for callback in list(self._callbacks):
+            try:
+                callback(generation)
+            except Exception:
+                logger.exception("jobs_changed callback failed")
+
+    def _run(self) -> None:
+        backoff = min(1.0, self.max_backoff)
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                if not is_sqlite_connection(conn):
+                    conn.execute(f"LISTEN {JOBS_CHANGED_CHANNEL}")
+                # Changes made while we were not listening.
+                self._seen(jobs_generation(conn))
+                backoff = min(1.0, self.max_backoff)
+                self._follow(conn)
+            except Exception as exc:
+                if self._stop.is_set():
+                    break
+                logger.warning("jobs_changed listener: %s; reconnecting in %.1fs", exc, backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _follow(self, conn) -> None:
+        while not self._stop.is_set():
+            if is_sqlite_connection(conn):
+                self._stop.wait(self.poll_seconds)
+            else:
+                for note in conn.notifies(timeout=self.poll_seconds):
+                    try:
+                        generation = int(note.payload)
+                    except ValueError:
+                        continue
+                    # A notification can trail the poll that already saw its generation.
+                    if self.generation is None or generation > self.generation:
+                        self._seen(generation)
+            self._seen(jobs_generation(conn))
+
+
+# One per worker; app.py registers what to drop when Jobs change.
+jobs_changes = JobsChangeListener()
@@ -2,14 +2,20 @@
 
 import os
 import re
+import atexit
 import logging
 import sqlite3
 import hashlib
+import threading
+import time
 import uuid
-from datetime import datetime, timezone
+import zlib
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
-from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
+
+from .analytics import AnalyticsWriter, DatabaseSink, SpoolSink, insert_sql, load_spool
 
 try:
     import psycopg  # psycopg v3
@@ -17,8 +23,9 @@ except Exception:
     psycopg = None  # optional, only required when SUPABASE_URL is set
 
 try:
-    from psycopg.errors import UniqueViolation  # type: ignore[attr-defined]
+    from psycopg.errors import LockNotAvailable, UniqueViolation  # type: ignore[attr-defined]
 except Exception:
+    LockNotAvailable = None  # type: ignore[assignment]
     UniqueViolation = None  # type: ignore[assignment]
 
 try:
@@ -60,11 +67,84 @@ def _should_use_sqlite() -> bool:
 # Prefer DATABASE_URL for Postgres; fallback to SUPABASE_URL for backwards-compat
 _SUPABASE_RAW = (os.getenv("DATABASE_URL") or os.getenv("SUPABASE_URL") or "").strip()
 SUPABASE_URL = _normalize_pg_url(_SUPABASE_RAW)
+# Optional streaming replica for read-only job queries (see get_read_db); writes stay on the
+# primary. Reads fall back to the primary while the replica is unreachable or lags too far.
+DATABASE_READ_URL = _normalize_pg_url((os.getenv("DATABASE_READ_URL") or "").strip())
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS") or 30)
+READ_REPLICA_CHECK_SECONDS = float(os.getenv("READ_REPLICA_CHECK_SECONDS") or 10)
 SECRET_KEY = os.getenv("SECRET_KEY", "").strip()
 PER_PAGE_MAX = 100  # safety cap
 RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
 ANALYTICS_SALT = os.getenv("ANALYTICS_SALT", "dev")
 ANALYTICS_SESSION_COOKIE = os.getenv("ANALYTICS_SESSION_COOKIE", "sid")
+# "async" queues analytics writes for a background thread that writes to the database,
+# "spool" has that thread append to local segment files instead (see load_analytics_spool),
+# "sync" writes in the request.
+ANALYTICS_MODE = (os.getenv("ANALYTICS_MODE") or "async").strip().lower()
+ANALYTICS_QUEUE_MAX = int(os.getenv("ANALYTICS_QUEUE_MAX") or 10000)
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE") or 200)
+ANALYTICS_FLUSH_SECONDS = float(os.getenv("ANALYTICS_FLUSH_SECONDS") or 1.0)
+ANALYTICS_SPOOL_DIR = os.getenv("ANALYTICS_SPOOL_DIR") or str(PROJECT_ROOT / "data" / "spool")
+ANALYTICS_SPOOL_SEGMENT_BYTES = int(os.getenv("ANALYTICS_SPOOL_SEGMENT_BYTES") or 16 * 1024 * 1024)
+ANALYTICS_SPOOL_SEGMENT_SECONDS = float(os.getenv("ANALYTICS_SPOOL_SEGMENT_SECONDS") or 60)
+# The loader also takes .open segments untouched this long (left by a crashed worker). A live
+# writer closes its segment within ANALYTICS_SPOOL_SEGMENT_SECONDS, so keep a wide margin over it.
+ANALYTICS_SPOOL_STALE_SECONDS = float(
+    os.getenv("ANALYTICS_SPOOL_STALE_SECONDS") or 2 * ANALYTICS_SPOOL_SEGMENT_SECONDS + 60
+)
+# Jobs posted longer ago than this move to jobs_archive (see Job.archive_expired).
+JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS") or 90)
+# How often each worker re-reads the salary/regions tables (reloaded only when they changed).
+SALARY_REFERENCE_REFRESH_SECONDS = float(os.getenv("SALARY_REFERENCE_REFRESH_SECONDS") or 60)
+# pay_rank is the regional median in thousands of USD; HIGH_PAY searches jobs at or above this.
+HIGH_PAY_MIN_RANK = int(os.getenv("HIGH_PAY_MIN_RANK") or 100)
+# Serve Job.search/count from an in-process columnar copy of Jobs (see app/models/store.py).
+JOB_STORE = _truthy(os.getenv("JOB_STORE"))
+JOB_STORE_REFRESH_SECONDS = float(os.getenv("JOB_STORE_REFRESH_SECONDS") or 30)
+# When set, workers serve from this memory-mapped snapshot instead (see app/models/snapshot.py);
+# the CLI rewrites it after every command that changes Jobs.
+JOB_SNAPSHOT_PATH = (os.getenv("JOB_SNAPSHOT_PATH") or "").strip()
+JOB_SNAPSHOT_CHECK_SECONDS = float(os.getenv("JOB_SNAPSHOT_CHECK_SECONDS") or 5)
+# SQLite mode: serve job reads from this read-only copy (see app/models/serving.py), so imports
+# and analytics writes on the main database file never block or half-fill search results.
+SERVING_DB_PATH = (os.getenv("SERVING_DB_PATH") or "").strip()
+# Postgres mode: serve job reads from this local SQLite copy, kept current by
+# `python -m app.cli sync-local-jobs` (see app/models/sync.py); writes still go to Postgres.
+LOCAL_JOBS_DB_PATH = (os.getenv("LOCAL_JOBS_DB_PATH") or "").strip()
+# Web requests get this budget (from arrival at the proxy when it sends X-Request-Start); Postgres
+# statement_timeout and the SQLite progress handler stop queries once it is spent. A statement
+# never gets more than STATEMENT_TIMEOUT_MS, which is all connections outside a request get.
+REQUEST_DEADLINE_MS = int(os.getenv("REQUEST_DEADLINE_MS") or 2000)
+STATEMENT_TIMEOUT_MS = 800
+# Per host: searches in flight beyond this shed expensive work (deep pages, per_page above
+# the default, country filters expanding to ADMISSION_WIDE_PATTERNS+ LIKE arms); twice this sheds all.
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT") or 4)
+# Lock files the workers of a host claim per search (see AdmissionController); empty counts
+# per worker, which only sheds with threaded workers.
+ADMISSION_LOCK_DIR = os.getenv("ADMISSION_LOCK_DIR", str(PROJECT_ROOT / "data" / "admission")).strip()
+ADMISSION_DEEP_PAGE = int(os.getenv("ADMISSION_DEEP_PAGE") or 10)
+ADMISSION_WIDE_PATTERNS = int(os.getenv("ADMISSION_WIDE_PATTERNS") or 100)
+# Result cache backend (see app/models/cache.py): memory:// (per worker), sqlite:///path/cache.db
+# (shared by the workers of a host) or redis://host:port/db (shared by all hosts).
+CACHE_URL = (os.getenv("CACHE_URL") or "memory://").strip()
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES") or 10000)
+# Identical searches share one computed result for this long (0: only coalesce concurrent ones);
+# an expired result is still served for SEARCH_CACHE_STALE_SECONDS while one worker recomputes it.
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS") or 30)
+SEARCH_CACHE_STALE_SECONDS = float(os.getenv("SEARCH_CACHE_STALE_SECONDS") or 300)
+# Writes to Jobs bump a generation number and NOTIFY jobs_changed; each worker's listener (see
+# app/models/changes.py) then drops its cached searches and refreshes its job store. It LISTENs on
+# JOBS_LISTEN_URL (default: the primary; LISTEN needs a session, not a transaction-mode pooler)
+# and also re-reads the generation every JOBS_CHANGED_POLL_SECONDS, the only signal on SQLite.
+JOBS_CHANGED_LISTENER = _truthy(os.getenv("JOBS_CHANGED_LISTENER", "1"))
+JOBS_LISTEN_URL = _normalize_pg_url((os.getenv("JOBS_LISTEN_URL") or "").strip())
+JOBS_CHANGED_POLL_SECONDS = float(os.getenv("JOBS_CHANGED_POLL_SECONDS") or 5)
+# Search reads: this many failures in a row open the circuit breaker for DB_BREAKER_RESET_SECONDS,
+# during which searches answer from the last known good results (see app/models/resilience.py).
+DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES") or 5)
+DB_BREAKER_RESET_SECONDS = float(os.getenv("DB_BREAKER_RESET_SECONDS") or 15)
+SEARCH_LKG_SIZE = int(os.getenv("SEARCH_LKG_SIZE") or 512)
+SEARCH_LKG_MAX_AGE_SECONDS = float(os.getenv("SEARCH_LKG_MAX_AGE_SECONDS") or 6 * 3600)
 
 # ------------------------- Logging -------------------------------------------
 logging.basicConfig(
@@ -75,17 +155,23 @@ logger = logging.getLogger("catalitium")
 
 # ------------------------- Database Connection Functions ----------------------
 
-def _pg_connect():
-    """Connect to PostgreSQL database."""
+def _pg_connect(
+    url: Optional[str] = None,
+    connect_timeout: Optional[int] = None,
+    statement_timeout_ms: Optional[int] = None,
+):
+    """Connect to PostgreSQL database (the primary unless ``url`` is given)."""
     import psycopg
-    if not SUPABASE_URL:
+    url = url or SUPABASE_URL
+    if not url:
         raise RuntimeError("SUPABASE_URL not set")
-    conn = psycopg.connect(SUPABASE_URL, autocommit=True)
+    extra = {"connect_timeout": connect_timeout} if connect_timeout else {}
+    conn = psycopg.connect(url, **extra, autocommit=True)
     # Apply safe session settings (best-effort)
     try:
         with conn.cursor() as cur:
             # Keep queries snappy and fail fast; units in ms
-            cur.execute("SET statement_timeout TO 800")
+            cur.execute(f"SET statement_timeout TO {int(statement_timeout_ms or STATEMENT_TIMEOUT_MS)}")
             cur.execute("SET idle_in_transaction_session_timeout TO 5000")
             cur.execute("SET application_name TO 'catalitium'")
     except Exception:
@@ -149,6 +235,108 @@ def is_sqlite_connection(conn) -> bool:
     """Return True when the connection object comes from sqlite3."""
     return isinstance(conn, sqlite3.Connection)
 
+def _execute_hot(cur, db, sql: str, params) -> None:
+    """Execute a hot read query within the request deadline."""
+    if is_sqlite_connection(db):
+        _check_deadline()
+        cur.execute(sql, params)
+    else:
+        _tighten_statement_timeout(cur, db)
+        cur.execute(sql, params)
+
+# ------------------------- Request Deadline ----------------------------------
+
+class DeadlineExceeded(RuntimeError):
+    """The request's time budget ran out before a query could start."""
+
+def _request_start_age(header: Optional[str]) -> float:
+    """Seconds since the proxy received the request, from ``X-Request-Start`` (``t=`` s/ms/us)."""
+    if not header:
+        return 0.0
+    try:
+        stamp = float(header.strip().removeprefix("t="))
+    except ValueError:
+        return 0.0
+    if stamp > 1e14:
+        stamp /= 1e6
+    elif stamp > 1e11:
+        stamp /= 1e3
+    return max(0.0, time.time() - stamp)
+
+def start_request_deadline(request_start: Optional[str] = None, budget_ms: Optional[int] = None) -> None:
+    """Give the current request its deadline, less the time it already queued upstream."""
+    from flask import g
+
+    budget = (budget_ms if budget_ms is not None else REQUEST_DEADLINE_MS) / 1000.0
+    g.deadline = time.monotonic() + budget - _request_start_age(request_start)
+
+def deadline_remaining_ms() -> Optional[int]:
+    """Milliseconds left for the current request; None outside a request or without a deadline."""
+    from flask import g, has_app_context
+
+    if not has_app_context():
+        return None
+    deadline = g.get("deadline")
+    if deadline is None:
+        return None
+    return int((deadline - time.monotonic()) * 1000)
+
+def _check_deadline() -> Optional[int]:
+    remaining = deadline_remaining_ms()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return remaining
+
+def _tighten_statement_timeout(cur, db) -> None:
+    """Lower the session's statement_timeout to what is left of the request budget.
+
+    Skipped while the current setting is within 20% of the budget, so most requests set it
+    once, when get_db() connects.
+    """
+    remaining = _check_deadline()
+    if remaining is None:
+        return
+    from flask import g
+
+    timeouts = g.setdefault("statement_timeouts", {})
+    current = timeouts.get(id(db), STATEMENT_TIMEOUT_MS)
+    if remaining < current * 0.8:
+        cur.execute(f"SET statement_timeout TO {remaining}")
+        timeouts[id(db)] = remaining
+
+def _arm_sqlite_deadline(conn) -> None:
+    """Interrupt this SQLite connection's queries once the request deadline has passed."""
+    from flask import g
+
+    deadline = g.get("deadline")
+    if deadline is None:
+        return
+    # Called every 10k VM instructions; a true result aborts with "interrupted".
+    conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+
+def _open_pg_for_request(url: Optional[str] = None, connect_timeout: Optional[int] = None):
+    """_pg_connect with statement_timeout capped by the remaining request budget."""
+    from flask import g
+
+    remaining = _check_deadline()
+    timeout = STATEMENT_TIMEOUT_MS if remaining is None else min(STATEMENT_TIMEOUT_MS, remaining)
+    conn = _pg_connect(url, connect_timeout=connect_timeout, statement_timeout_ms=timeout)
+    if remaining is not None:
+        g.setdefault("statement_timeouts", {})[id(conn)] = timeout
+    return conn
+
+def _connection_target() -> Tuple[str, str]:
+    """Identify the database that new connections would currently open."""
+    if _should_use_sqlite():
+        return ("sqlite", _sqlite_path())
+    return ("postgres", SUPABASE_URL)
+
+def open_db():
+    """Open a standalone connection outside the request cycle (background threads, tools)."""
+    if _should_use_sqlite():
+        return _sqlite_connect()
+    return _pg_connect()
+
 def get_db():
     """Get database connection from Flask g object."""
     from flask import g, current_app
@@ -160,9 +348,12 @@ def get_db():
             except Exception as e:
                 logger.error("SQLite connection failed: %s", e)
                 raise
+            _arm_sqlite_deadline(g.db)
         else:
             try:
-                g.db = _pg_connect()
+                g.db = _open_pg_for_request()
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 logger.error("Postgres connection failed: %s", e)
                 raise
@@ -174,6 +365,188 @@ def close_db(_e=None):
     db = g.pop("db", None)
     if db:
         db.close()
+    # The serving connection is per thread and outlives the request.
+    read_db = g.pop("read_db", None)
+    if read_db is not None and read_db is not db and is_sqlite_connection(read_db):
+        read_db.set_progress_handler(None, 0)
+    replica = g.pop("replica_db", None)
+    if replica:
+        replica.close()
+
+# Per-thread connection to the serving database (or local copy) and the file identity it was opened on.
+_serving = threading.local()
+
+def _open_serving_db(path: str, immutable: bool = True):
+    # immutable=1: the file never changes under an open connection (new versions arrive by
+    # rename), so SQLite skips locking and change detection entirely. A synced local copy
+    # changes in place and is read with normal (WAL) locking instead.
+    conn = sqlite3.connect(
+        f"file:{quote(os.path.abspath(path))}?mode=ro{'&immutable=1' if immutable else ''}",
+        uri=True,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        factory=_SQLiteConnection,
+    )
+    conn.row_factory = sqlite3.Row
+    return conn
+
+class _ReplicaHealth:
+    """Per-process view of the read replica: lag checked at most every ``check_seconds``.
+
+    A failed connect or check (or lag above ``max_lag``) sends reads to the primary until
+    the next check is due, so an outage costs one connect attempt per interval, not per request.
+    """
+
+    def __init__(self, max_lag: float, check_seconds: float):
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds
+
+    def usable(self) -> bool:
+        return self.healthy or self.due()
+
+    def record(self, healthy: bool, lag: Optional[float] = None, reason: str = "") -> None:
+        with self._lock:
+            if healthy != self.healthy:
+                if healthy:
+                    logger.info("Read replica back in use (lag %.1fs)", lag or 0.0)
+                else:
+                    logger.warning("Read replica unusable (%s); reading from the primary", reason)
+            self.healthy, self.lag, self._checked_at = healthy, lag, time.monotonic()
+
+
+_replica_health = _ReplicaHealth(READ_REPLICA_MAX_LAG_SECONDS, READ_REPLICA_CHECK_SECONDS)
+
+# Seconds behind the primary; 0 when everything received has been replayed (an idle primary
+# sends nothing, so the last replay timestamp alone would overstate the lag).
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+def replica_lag(conn) -> float:
+    """Replication lag of ``conn`` in seconds (0 for a primary)."""
+    with conn.cursor() as cur:
+        cur.execute(_REPLICA_LAG_SQL)
+        return float(cur.fetchone()[0] or 0)
+
+def report_replica_error(exc: Exception) -> None:
+    """Stop reading from the replica until its next check (a query on it failed)."""
+    _replica_health.record(False, reason=f"query failed: {exc}")
+
+def _get_replica_db():
+    """The request's replica connection, or None when reads should use the primary."""
+    from flask import g
+
+    health = _replica_health
+    if not health.usable():
+        return None
+    try:
+        conn = _open_pg_for_request(DATABASE_READ_URL, connect_timeout=2)
+    except DeadlineExceeded:
+        raise
+    except Exception as exc:
+        health.record(False, reason=f"connect failed: {exc}")
+        return None
+    if health.due():
+        try:
+            lag = replica_lag(conn)
+        except Exception as exc:
+            conn.close()
+            health.record(False, reason=f"lag check failed: {exc}")
+            return None
+        if lag > health.max_lag:
+            conn.close()
+            health.record(False, lag, reason=f"{lag:.1f}s behind")
+            return None
+        health.record(True, lag)
+    g.replica_db = conn
+    return conn
+
+def get_read_db():
+    """Connection for read-only job queries; get_db() unless a read copy is configured.
+
+    On Postgres with ``LOCAL_JOBS_DB_PATH`` it is the synced local SQLite copy once it
+    exists. With ``DATABASE_READ_URL`` it is a connection to the replica, opened once
+    per request, or the primary while the replica is down or lagging. In SQLite mode with
+    ``SERVING_DB_PATH`` it is the serving database: the file is stat-ed once per request and
+    the thread's connection is reopened when a new version was renamed into place.
+    """
+    from flask import g
+
+    if "read_db" in g:
+        return g.read_db
+    if not _should_use_sqlite():
+        if LOCAL_JOBS_DB_PATH:
+            local = _thread_read_db(LOCAL_JOBS_DB_PATH, immutable=False)
+            if local is not None:
+                _arm_sqlite_deadline(local)
+                g.read_db = local
+                return local
+        if not DATABASE_READ_URL:
+            return get_db()
+        g.read_db = _get_replica_db() or get_db()
+        return g.read_db
+    if not SERVING_DB_PATH:
+        return get_db()
+    conn = _thread_read_db(SERVING_DB_PATH)
+    if conn is None:
+        return get_db()
+    _arm_sqlite_deadline(conn)
+    g.read_db = conn
+    return conn
+
+def _thread_read_db(path: str, immutable: bool = True):
+    """The thread's read-only connection to ``path``; None until the file exists."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # Published versions replace the file; a synced copy only changes its inode when rebuilt.
+    key = (path, st.st_ino, st.st_mtime_ns, st.st_size) if immutable else (path, st.st_ino)
+    conn = getattr(_serving, "conn", None)
+    if conn is None or _serving.key != key:
+        if conn is not None:
+            conn.close()
+        conn = _open_serving_db(path, immutable)
+        _serving.conn, _serving.key = conn, key
+        try:
+            version = conn.execute("SELECT value FROM serving_meta WHERE key = 'version'").fetchone()
+            logger.info("Opened serving database %s (version %s)", path, version[0] if version else "?")
+        except sqlite3.Error:
+            logger.info("Opened serving database %s", path)
+    return conn
+
+def stream_query(db, sql: str, params: Sequence = (), fetch_size: int = 5000) -> Iterator[tuple]:
+    """Yield the rows of a long read in batches; on Postgres without the 800 ms budget."""
+
+    def rows(cur):
+        cur.execute(sql, params)
+        while True:
+            batch = cur.fetchmany(fetch_size)
+            if not batch:
+                return
+            yield from batch
+
+    if is_sqlite_connection(db):
+        cur = db.cursor()
+        try:
+            yield from rows(cur)
+        finally:
+            cur.close()
+        return
+    with db.transaction():
+        with db.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = 0")
+            yield from rows(cur)
 
 # ------------------------- Subscriber & Analytics Helpers --------------------
 
@@ -213,6 +586,99 @@ def _client_meta() -> Tuple[str, str, str, str]:
     sid = request.cookies.get(ANALYTICS_SESSION_COOKIE or "sid") or _ensure_session_id() or ""
     return (ua, ref, _hash(ip), sid)
 
+EVENT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "subscribe_events": (
+        "created_at",
+        "email_hash",
+        "status",
+        "user_agent",
+        "referer",
+        "ip_hash",
+        "session_id",
+        "source",
+    ),
+    "search_events": (
+        "created_at",
+        "raw_title",
+        "raw_country",
+        "norm_title",
+        "norm_country",
+        "sal_floor",
+        "sal_ceiling",
+        "result_count",
+        "page",
+        "per_page",
+        "user_agent",
+        "referer",
+        "ip_hash",
+        "session_id",
+        "source",
+        "event_status",
+        "event_type",
+        "job_id",
+        "job_title_event",
+        "job_company_event",
+        "job_location_event",
+        "job_link_event",
+        "job_summary_event",
+    ),
+}
+
+def _analytics_sink():
+    if ANALYTICS_MODE == "spool":
+        return SpoolSink(
+            ANALYTICS_SPOOL_DIR,
+            max_bytes=ANALYTICS_SPOOL_SEGMENT_BYTES,
+            max_age=ANALYTICS_SPOOL_SEGMENT_SECONDS,
+        )
+    return DatabaseSink(open_db, _connection_target, EVENT_COLUMNS)
+
+_analytics_writer = AnalyticsWriter(
+    _analytics_sink(),
+    max_queue=ANALYTICS_QUEUE_MAX,
+    batch_size=ANALYTICS_BATCH_SIZE,
+    flush_interval=ANALYTICS_FLUSH_SECONDS,
+)
+# Gunicorn workers exit through sys.exit on graceful shutdown, which runs atexit hooks.
+atexit.register(_analytics_writer.close)
+
+def _record_event(table: str, payload: tuple, kind: str) -> None:
+    """Hand an analytics row to the background writer, or write it inline in sync mode."""
+    if ANALYTICS_MODE != "sync":
+        _analytics_writer.submit(table, payload)
+        return
+    try:
+        with get_db().cursor() as cur:
+            cur.execute(insert_sql(table, EVENT_COLUMNS[table]), payload)
+    except Exception as exc:
+        # Swallow logging errors so the request flow remains unaffected
+        logger.debug("%s analytics skipped: %s", kind, exc)
+
+def flush_analytics(timeout: float = 5.0) -> None:
+    """Wait until queued analytics events have been written (tests, shutdown hooks)."""
+    _analytics_writer.flush(timeout)
+
+def analytics_stats() -> Dict[str, int]:
+    """Return the background writer's counters (pending, written, dropped, failed)."""
+    return _analytics_writer.stats()
+
+def load_analytics_spool(
+    db=None, directory: Optional[str] = None, stale_after: float = ANALYTICS_SPOOL_STALE_SECONDS
+) -> Dict[str, int]:
+    """Bulk-load closed spool segments into the analytics tables (idempotent per segment)."""
+    conn = db or open_db()
+    try:
+        migrate_db(conn)
+        if stale_after <= ANALYTICS_SPOOL_SEGMENT_SECONDS:
+            raise ValueError(
+                f"stale_after ({stale_after}s) must exceed ANALYTICS_SPOOL_SEGMENT_SECONDS "
+                f"({ANALYTICS_SPOOL_SEGMENT_SECONDS}s), or open segments get loaded under their writer"
+            )
+        return load_spool(conn, directory or ANALYTICS_SPOOL_DIR, EVENT_COLUMNS, stale_after=stale_after)
+    finally:
+        if db is None:
+            conn.close()
+
 def insert_subscriber(email: str) -> str:
     """Insert a subscriber record; return 'ok', 'duplicate', or 'error'."""
     db = get_db()
@@ -231,7 +697,6 @@ def insert_subscriber(email: str) -> str:
 
 def insert_subscribe_event(email: str, status: str, *, source: str = "form") -> None:
     """Persist a newsletter subscribe analytics event (best effort)."""
-    db = get_db()
     created_at = _now_iso()
     ua, ref, ip_hash, sid = _client_meta()
     payload = (
@@ -244,25 +709,7 @@ def insert_subscribe_event(email: str, status: str, *, source: str = "form") ->
         sid,
         (source or "form")[:50],
     )
-    try:
-        with db.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO subscribe_events(
-                    created_at,
-                    email_hash,
-                    status,
-                    user_agent,
-                    referer,
-                    ip_hash,
-                    session_id,
-                    source
-                ) VALUES(%s,%s,%s,%s,%s,%s,%s,%s)
-                """,
-                payload,
-            )
-    except Exception as exc:
-        logger.debug("subscribe analytics skipped: %s", exc)
+    _record_event("subscribe_events", payload, "subscribe")
 
 def insert_search_event(
     *,
@@ -286,7 +733,6 @@ def insert_search_event(
     job_summary: Optional[str] = None,
 ) -> None:
     """Persist a lightweight search log for analytics."""
-    db = get_db()
     ua, ref, ip_hash, sid = _client_meta()
     safe_raw_title = (raw_title or job_title or "").strip()
     safe_raw_country = (raw_country or job_location or "").strip()
@@ -324,44 +770,7 @@ def insert_search_event(
         safe_job_link[:500],
         safe_job_summary[:400],
     )
-    try:
-        with db.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO search_events(
-                    created_at,
-                    raw_title,
-                    raw_country,
-                    norm_title,
-                    norm_country,
-                    sal_floor,
-                    sal_ceiling,
-                    result_count,
-                    page,
-                    per_page,
-                    user_agent,
-                    referer,
-                    ip_hash,
-                    session_id,
-                    source,
-                    event_status,
-                    event_type,
-                    job_id,
-                    job_title_event,
-                    job_company_event,
-                    job_location_event,
-                    job_link_event,
-                    job_summary_event
-                ) VALUES(
-                    %s,%s,%s,%s,%s,%s,%s,%s,%s,%s,
-                    %s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s
-                )
-                """,
-                payload,
-            )
-    except Exception as exc:
-        # Swallow logging errors so search flow remains unaffected
-        logger.debug("search analytics skipped: %s", exc)
+    _record_event("search_events", payload, "search")
 
 # ------------------------- Description Parsing ------------------------------
 
@@ -410,6 +819,8 @@ def parse_job_description(text: str) -> str:
     t = clean_job_description_text(text or "")
     return summarize_two_sentences(t)
 
+# ------------------------- Schema Migrations ---------------------------------
+
 def _ensure_sqlite_columns(db, table: str, definitions: Dict[str, str]) -> None:
     try:
         rows = db.execute(f"PRAGMA table_info('{table}')").fetchall()
@@ -425,23 +836,48 @@ def _ensure_sqlite_columns(db, table: str, definitions: Dict[str, str]) -> None:
                 logger.debug("Unable to add %s to %s: %s", column, table, exc)
 
 def _ensure_postgres_columns(db, table: str, definitions: Dict[str, str]) -> None:
-    try:
-        with db.cursor() as cur:
-            for column, ddl in definitions.items():
-                cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {ddl}")
-    except Exception as exc:
-        logger.debug("Unable to ensure columns for %s: %s", table, exc)
+    # Runs inside the migration transaction; a swallowed error would only abort it later.
+    with db.cursor() as cur:
+        for column, ddl in definitions.items():
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {ddl}")
+
+_SEARCH_EVENT_COLUMNS = {
+    "sal_floor": "sal_floor INTEGER",
+    "sal_ceiling": "sal_ceiling INTEGER",
+    "user_agent": "user_agent TEXT",
+    "referer": "referer TEXT",
+    "ip_hash": "ip_hash TEXT",
+    "session_id": "session_id TEXT",
+    "source": "source TEXT DEFAULT 'server'",
+    "event_status": "event_status TEXT",
+    "event_type": "event_type TEXT DEFAULT 'search'",
+    "job_id": "job_id TEXT",
+    "job_title_event": "job_title_event TEXT",
+    "job_company_event": "job_company_event TEXT",
+    "job_location_event": "job_location_event TEXT",
+    "job_link_event": "job_link_event TEXT",
+    "job_summary_event": "job_summary_event TEXT",
+}
 
-def init_db():
-    """Ensure required tables exist in the primary Postgres database."""
-    db = get_db()
-    if is_sqlite_connection(db):
-        db.executescript(
+_SUBSCRIBE_EVENT_COLUMNS = {
+    "user_agent": "user_agent TEXT",
+    "referer": "referer TEXT",
+    "ip_hash": "ip_hash TEXT",
+    "session_id": "session_id TEXT",
+    "source": "source TEXT DEFAULT 'form'",
+}
+
+def _migrate_baseline(db, use_sqlite: bool) -> None:
+    """Create the original tables and backfill analytics columns on older databases."""
+    if use_sqlite:
+        for statement in (
             """
             CREATE TABLE IF NOT EXISTS subscribers (
                 email TEXT PRIMARY KEY,
                 created_at TEXT
-            );
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS search_events (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 created_at TEXT,
@@ -467,7 +903,9 @@ def init_db():
                 job_location_event TEXT,
                 job_link_event TEXT,
                 job_summary_event TEXT
-            );
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS subscribe_events (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 created_at TEXT,
@@ -478,7 +916,9 @@ def init_db():
                 ip_hash TEXT,
                 session_id TEXT,
                 source TEXT DEFAULT 'form'
-            );
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS Jobs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 job_title TEXT,
@@ -488,47 +928,17 @@ def init_db():
                 location TEXT,
                 job_date TEXT,
                 date TEXT
-            );
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link_unique ON Jobs(link);
-            CREATE INDEX IF NOT EXISTS idx_jobs_title_norm ON Jobs(job_title_norm);
-            CREATE INDEX IF NOT EXISTS idx_jobs_location ON Jobs(location);
-            CREATE INDEX IF NOT EXISTS idx_search_events_created ON search_events(created_at);
-            CREATE INDEX IF NOT EXISTS idx_subscribe_events_created ON subscribe_events(created_at);
-            """
-        )
-        _ensure_sqlite_columns(
-            db,
-            "search_events",
-            {
-                "sal_floor": "sal_floor INTEGER",
-                "sal_ceiling": "sal_ceiling INTEGER",
-                "user_agent": "user_agent TEXT",
-                "referer": "referer TEXT",
-                "ip_hash": "ip_hash TEXT",
-                "session_id": "session_id TEXT",
-                "source": "source TEXT DEFAULT 'server'",
-                "event_status": "event_status TEXT",
-                "event_type": "event_type TEXT DEFAULT 'search'",
-                "job_id": "job_id TEXT",
-                "job_title_event": "job_title_event TEXT",
-                "job_company_event": "job_company_event TEXT",
-                "job_location_event": "job_location_event TEXT",
-                "job_link_event": "job_link_event TEXT",
-                "job_summary_event": "job_summary_event TEXT",
-            },
-        )
-        _ensure_sqlite_columns(
-            db,
-            "subscribe_events",
-            {
-                "user_agent": "user_agent TEXT",
-                "referer": "referer TEXT",
-                "ip_hash": "ip_hash TEXT",
-                "session_id": "session_id TEXT",
-                "source": "source TEXT DEFAULT 'form'",
-            },
-        )
-        db.commit()
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link_unique ON Jobs(link)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_title_norm ON Jobs(job_title_norm)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_location ON Jobs(location)",
+            "CREATE INDEX IF NOT EXISTS idx_search_events_created ON search_events(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_subscribe_events_created ON subscribe_events(created_at)",
+        ):
+            db.execute(statement)
+        _ensure_sqlite_columns(db, "search_events", _SEARCH_EVENT_COLUMNS)
+        _ensure_sqlite_columns(db, "subscribe_events", _SUBSCRIBE_EVENT_COLUMNS)
         return
     with db.cursor() as cur:
         cur.execute(
@@ -603,37 +1013,247 @@ def init_db():
             CREATE INDEX IF NOT EXISTS idx_jobs_location ON Jobs(location);
             """
         )
-    _ensure_postgres_columns(
-        db,
-        "search_events",
-        {
-            "sal_floor": "sal_floor INTEGER",
-            "sal_ceiling": "sal_ceiling INTEGER",
-            "user_agent": "user_agent TEXT",
-            "referer": "referer TEXT",
-            "ip_hash": "ip_hash TEXT",
-            "session_id": "session_id TEXT",
-            "source": "source TEXT DEFAULT 'server'",
-            "event_type": "event_type TEXT DEFAULT 'search'",
-            "job_id": "job_id TEXT",
-            "job_title_event": "job_title_event TEXT",
-            "job_company_event": "job_company_event TEXT",
-            "job_location_event": "job_location_event TEXT",
-            "job_link_event": "job_link_event TEXT",
-            "job_summary_event": "job_summary_event TEXT",
-        },
-    )
-    _ensure_postgres_columns(
-        db,
-        "subscribe_events",
-        {
-            "user_agent": "user_agent TEXT",
-            "referer": "referer TEXT",
-            "ip_hash": "ip_hash TEXT",
-            "session_id": "session_id TEXT",
-            "source": "source TEXT DEFAULT 'form'",
-        },
-    )
+    _ensure_postgres_columns(db, "search_events", _SEARCH_EVENT_COLUMNS)
+    _ensure_postgres_columns(db, "subscribe_events", _SUBSCRIBE_EVENT_COLUMNS)
+
+def _migrate_analytics_segments(db, use_sqlite: bool) -> None:
+    """Track which analytics spool segments have been loaded."""
+    loaded_at_type = "TEXT" if use_sqlite else "TIMESTAMP WITH TIME ZONE"
+    cur = db.cursor()
+    try:
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS analytics_segments (
+                segment TEXT PRIMARY KEY,
+                row_count INTEGER,
+                loaded_at {loaded_at_type}
+            )
+            """
+        )
+    finally:
+        cur.close()
+
+_JOB_DERIVED_COLUMNS = {
+    "country_code": "country_code TEXT",
+    "summary": "summary TEXT",
+    "salary_min": "salary_min INTEGER",
+    "salary_max": "salary_max INTEGER",
+    "salary_currency": "salary_currency TEXT",
+}
+
+def _migrate_job_derived_columns(db, use_sqlite: bool) -> None:
+    """Add the columns the ingest pipeline derives from each posting."""
+    if use_sqlite:
+        _ensure_sqlite_columns(db, "Jobs", _JOB_DERIVED_COLUMNS)
+    else:
+        _ensure_postgres_columns(db, "Jobs", _JOB_DERIVED_COLUMNS)
+
+def _migrate_job_change_tracking(db, use_sqlite: bool) -> None:
+    """Add the per-job content hash used to skip unchanged rows on ingest."""
+    definitions = {
+        "content_hash": "content_hash TEXT",
+        "updated_at": "updated_at TEXT" if use_sqlite else "updated_at TIMESTAMP WITH TIME ZONE",
+    }
+    if use_sqlite:
+        _ensure_sqlite_columns(db, "Jobs", definitions)
+    else:
+        _ensure_postgres_columns(db, "Jobs", definitions)
+
+def _migrate_jobs_archive(db, use_sqlite: bool) -> None:
+    """Create the cold tier for expired jobs and the date index the retention scan uses."""
+    blob_type = "BLOB" if use_sqlite else "BYTEA"
+    ts_type = "TEXT" if use_sqlite else "TIMESTAMP WITH TIME ZONE"
+    cur = db.cursor()
+    try:
+        for statement in (
+            f"""
+            CREATE TABLE IF NOT EXISTS jobs_archive (
+                id INTEGER PRIMARY KEY,
+                job_title TEXT,
+                job_description_z {blob_type},
+                link TEXT UNIQUE,
+                job_title_norm TEXT,
+                location TEXT,
+                job_date TEXT,
+                date {ts_type},
+                country_code TEXT,
+                summary TEXT,
+                salary_min INTEGER,
+                salary_max INTEGER,
+                salary_currency TEXT,
+                content_hash TEXT,
+                updated_at {ts_type},
+                archived_at {ts_type}
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_jobs_archive_date ON jobs_archive(date)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_date ON Jobs(date)",
+        ):
+            cur.execute(statement)
+    finally:
+        cur.close()
+
+def _migrate_job_pay_rank(db, use_sqlite: bool) -> None:
+    """Add pay_rank (set at ingest from the salary reference) and the index HIGH_PAY scans."""
+    definitions = {"pay_rank": "pay_rank INTEGER"}
+    nulls_last = "" if use_sqlite else " NULLS LAST"
+    if use_sqlite:
+        _ensure_sqlite_columns(db, "Jobs", definitions)
+        _ensure_sqlite_columns(db, "jobs_archive", definitions)
+    else:
+        _ensure_postgres_columns(db, "Jobs", definitions)
+        _ensure_postgres_columns(db, "jobs_archive", definitions)
+    cur = db.cursor()
+    try:
+        # SQLite already sorts NULLs last for DESC; Postgres needs it spelled out to match
+        # the ORDER BY in Job._order_by.
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_pay_rank ON "
+            f"Jobs(pay_rank DESC{nulls_last}, date DESC{nulls_last}, id DESC)"
+        )
+    finally:
+        cur.close()
+
+def _migrate_jobs_updated_at_index(db, use_sqlite: bool) -> None:
+    """Index updated_at, the watermark the in-process job store refreshes from."""
+    cur = db.cursor()
+    try:
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON Jobs(updated_at)")
+    finally:
+        cur.close()
+
+def _migrate_jobs_generation(db, use_sqlite: bool) -> None:
+    """Add the one-row jobs_generation counter that writes to Jobs bump (see bump_jobs_generation)."""
+    ts_type = "TEXT" if use_sqlite else "TIMESTAMP WITH TIME ZONE"
+    cur = db.cursor()
+    try:
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS jobs_generation (
+                id INTEGER PRIMARY KEY,
+                generation BIGINT NOT NULL,
+                changed_at {ts_type}
+            )
+            """
+        )
+        cur.execute(
+            "INSERT INTO jobs_generation (id, generation, changed_at) VALUES (1, 0, %s) ON CONFLICT (id) DO NOTHING",
+            (_now_iso(),),
+        )
+    finally:
+        cur.close()
+
+def _migrate_pay_rank_backfill_check(db, use_sqlite: bool) -> None:
+    """Warn when existing jobs were never ranked (migration 6 added pay_rank empty).
+
+    Ranking every job here would hold the boot lock for a full-table update, so the
+    backfill is left to ``python -m app.cli rank-jobs``, which commits in batches.
+    Both probes are single index/row lookups.
+    """
+    cur = db.cursor()
+    try:
+        cur.execute("SELECT 1 FROM Jobs WHERE pay_rank IS NOT NULL LIMIT 1")
+        if cur.fetchone() is not None:
+            return
+        cur.execute("SELECT 1 FROM Jobs LIMIT 1")
+        if cur.fetchone() is not None:
+            logger.warning("Jobs have no pay_rank yet; run `python -m app.cli rank-jobs` to backfill it")
+    finally:
+        cur.close()
+
+# Ordered (version, description, migrate(db, use_sqlite)) steps. Append new steps with the
+# next version number; never edit or reorder a step that has shipped.
+_MIGRATIONS: List[Tuple[int, str, Callable[..., None]]] = [
+    (1, "baseline tables and analytics columns", _migrate_baseline),
+    (2, "analytics spool segment ledger", _migrate_analytics_segments),
+    (3, "derived job columns (country, summary, salary)", _migrate_job_derived_columns),
+    (4, "job content hashes", _migrate_job_change_tracking),
+    (5, "jobs archive tier", _migrate_jobs_archive),
+    (6, "job pay rank", _migrate_job_pay_rank),
+    (7, "jobs updated_at index", _migrate_jobs_updated_at_index),
+    (8, "jobs change generation", _migrate_jobs_generation),
+    (9, "job pay rank backfill check", _migrate_pay_rank_backfill_check),
+]
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+# Key for pg_advisory_xact_lock so concurrent workers serialize on migrations.
+_MIGRATION_LOCK_ID = 72430001
+
+def _schema_version(db) -> int:
+    """Return the applied schema version, or 0 before the first migration ran."""
+    cur = db.cursor()
+    try:
+        cur.execute("SELECT MAX(version) FROM schema_version")
+        row = cur.fetchone()
+        return int(row[0] or 0) if row else 0
+    except Exception:
+        return 0
+    finally:
+        cur.close()
+
+def _apply_migrations(db, use_sqlite: bool) -> int:
+    """Run pending migrations; the caller holds the migration lock and transaction."""
+    applied_at_type = "TEXT" if use_sqlite else "TIMESTAMP WITH TIME ZONE"
+    cur = db.cursor()
+    try:
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at {applied_at_type}
+            )
+            """
+        )
+        # Re-read under the lock: another worker may have migrated while we waited.
+        cur.execute("SELECT MAX(version) FROM schema_version")
+        row = cur.fetchone()
+        current = int(row[0] or 0) if row else 0
+        for version, description, migrate in _MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(db, use_sqlite)
+            cur.execute(
+                "INSERT INTO schema_version(version, description, applied_at) VALUES(%s, %s, %s)",
+                (version, description, _now_iso()),
+            )
+            logger.info("Applied schema migration %s: %s", version, description)
+            current = version
+    finally:
+        cur.close()
+    return current
+
+def migrate_db(db) -> int:
+    """Apply pending schema migrations on ``db`` and return the resulting version.
+
+    An up-to-date database costs one SELECT. Otherwise migrations run in a single
+    transaction under a lock (``BEGIN IMMEDIATE`` on SQLite, a transaction-scoped
+    advisory lock on Postgres, which is safe behind transaction-mode poolers), so
+    only one of several booting workers applies them.
+    """
+    current = _schema_version(db)
+    if current >= SCHEMA_VERSION:
+        return current
+    if is_sqlite_connection(db):
+        if db.in_transaction:
+            db.commit()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            version = _apply_migrations(db, True)
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return version
+    with db.transaction():
+        with db.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (_MIGRATION_LOCK_ID,))
+        return _apply_migrations(db, False)
+
+def init_db():
+    """Bring the database schema up to date (a version check when already current)."""
+    return migrate_db(get_db())
+
 # ------------------------- Analytics Helpers ---------------------------------
 
 def _now_iso():
@@ -743,6 +1363,27 @@ def normalize_country(q: str) -> str:
             return code
     return q.strip()
 
+def location_country_code(location: str) -> str:
+    """Resolve a free-text job location ('Lisbon, Portugal', 'Berlin, DE') to a country code."""
+    if not location:
+        return ""
+    t = location.strip().lower()
+    if t in LOCATION_COUNTRY_HINTS:
+        return LOCATION_COUNTRY_HINTS[t]
+    parts = [p.strip() for p in re.split(r"[,/()|]", t) if p.strip()]
+    for part in reversed(parts):
+        if part in COUNTRY_NORM:
+            return COUNTRY_NORM[part]
+        if part in LOCATION_COUNTRY_HINTS:
+            return LOCATION_COUNTRY_HINTS[part]
+    if parts and len(parts[-1]) == 2 and parts[-1].isalpha() and len(parts) > 1:
+        return parts[-1].upper()
+    # Short hints ('los', 'uk') would match inside unrelated words.
+    for hint, code in LOCATION_COUNTRY_HINTS.items():
+        if len(hint) > 3 and hint in t:
+            return code
+    return ""
+
 def normalize_title(q: str) -> str:
     """Normalize job title query."""
     if not q:
@@ -755,8 +1396,62 @@ def normalize_title(q: str) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s
 
+# ------------------------- Change Notifications ----------------------------
+
+JOBS_CHANGED_CHANNEL = "jobs_changed"
+
+def jobs_generation(db=None) -> int:
+    """Return the current jobs generation (bumped by every write to Jobs)."""
+    db = db or get_db()
+    cur = db.cursor()
+    try:
+        cur.execute("SELECT generation FROM jobs_generation WHERE id = 1")
+        row = cur.fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        cur.close()
+
+def bump_jobs_generation(db=None) -> Optional[int]:
+    """Record that Jobs changed: bump the generation and NOTIFY jobs_changed with it.
+
+    Call after the write committed. Best-effort: a failure is logged and returns None, since
+    caches then still expire on their TTL.
+    """
+    db = db or get_db()
+    try:
+        with db.cursor() as cur:
+            cur.execute(
+                "UPDATE jobs_generation SET generation = generation + 1, changed_at = %s WHERE id = 1 "
+                "RETURNING generation",
+                (_now_iso(),),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            generation = int(row[0])
+            if not is_sqlite_connection(db):
+                cur.execute("SELECT pg_notify(%s, %s)", (JOBS_CHANGED_CHANNEL, str(generation)))
+        return generation
+    except Exception as exc:
+        logger.warning("Unable to bump jobs generation: %s", exc)
+        return None
+
 # ------------------------- Job Model ----------------------------------------
 
+# Optional in-process read store answering Job.search/count (installed by create_app).
+_job_store = None
+
+def set_job_store(store) -> None:
+    """Route non-archive Job.search/count calls through ``store`` (None restores SQL)."""
+    global _job_store
+    _job_store = store
+
+def invalidate_job_store() -> None:
+    """Have the installed job store check for changes on the next search."""
+    store = _job_store
+    if store is not None:
+        store.invalidate()
+
 class Job:
     table = "Jobs"
     _EU_CODES: Set[str] = {
@@ -764,6 +1459,13 @@ class Job:
         "IT","LV","LT","LU","MT","NL","PL","PT","RO","SK","SI","ES","SE"
     }
     _EU_FILTER_CODES: Set[str] = {"DE", "ES", "NL"}
+    _TEXT_FIELDS: Tuple[str, ...] = ("job_title_norm", "job_title", "job_description")
+    # Archived descriptions are compressed, so historical text matches use the summary.
+    _ARCHIVE_TEXT_FIELDS: Tuple[str, ...] = ("job_title_norm", "job_title", "summary")
+    # Columns (and order) of every Job.search row.
+    SEARCH_COLUMNS: Tuple[str, ...] = (
+        "id", "job_title", "job_description", "link", "job_title_norm", "location", "job_date", "date", "pay_rank"
+    )
 
     @staticmethod
     def _normalize_title(value: Optional[str]) -> str:
@@ -819,15 +1521,32 @@ class Job:
         return patterns, sorted(equals)
 
     @staticmethod
-    def count(title: Optional[str] = None, country: Optional[str] = None) -> int:
+    def count(title: Optional[str] = None, country: Optional[str] = None, include_archived: bool = False) -> int:
         """Return number of jobs matching optional filters."""
+        store = _job_store
+        if store is not None and not include_archived:
+            try:
+                total = store.count(title, country)
+                if total is not None:  # None: still loading
+                    return total
+            except Exception as exc:
+                logger.warning("Job store count failed, using SQL: %s", exc)
         where_sql, params_sqlite, params_pg = Job._where(title, country)
-        db = get_db()
+        db = get_db() if include_archived else get_read_db()
         with db.cursor() as cur:
-            if is_sqlite_connection(db):
+            if include_archived:
+                arch_sql, arch_sqlite, arch_pg = Job._where(title, country, Job._ARCHIVE_TEXT_FIELDS)
+                backend = "sqlite" if is_sqlite_connection(db) else "pg"
+                params = (params_sqlite + arch_sqlite) if backend == "sqlite" else (params_pg + arch_pg)
+                cur.execute(
+                    f"SELECT (SELECT COUNT(1) FROM Jobs {where_sql[backend]})"
+                    f" + (SELECT COUNT(1) FROM jobs_archive {arch_sql[backend]})",
+                    params,
+                )
+            elif is_sqlite_connection(db):
                 cur.execute(f"SELECT COUNT(1) FROM Jobs {where_sql['sqlite']}", params_sqlite)
             else:
-                cur.execute(f"SELECT COUNT(1) FROM Jobs {where_sql['pg']}", params_pg)
+                _execute_hot(cur, db, f"SELECT COUNT(1) FROM Jobs {where_sql['pg']}", params_pg)
             row = cur.fetchone()
             return int(row[0] if row else 0)
 
@@ -837,53 +1556,552 @@ class Job:
         country: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
+        include_archived: bool = False,
+        sort: Optional[str] = None,
     ) -> List[Dict]:
-        """Return matching jobs ordered by recency."""
+        """Return matching jobs ordered by recency, or by pay_rank for ``sort="pay"``.
+
+        With ``include_archived`` jobs_archive is searched as well.
+        """
+        if include_archived:
+            return Job._search_with_archive(title, country, limit, offset, sort)
+        store = _job_store
+        if store is not None:
+            try:
+                rows = store.search(title, country, limit, offset, sort)
+                if rows is not None:  # None: still loading
+                    return rows
+            except Exception as exc:
+                logger.warning("Job store search failed, using SQL: %s", exc)
         where_sql, params_sqlite, params_pg = Job._where(title, country)
-        db = get_db()
+        db = get_read_db()
         use_sqlite = is_sqlite_connection(db)
         where_clause = where_sql["sqlite"] if use_sqlite else where_sql["pg"]
         params = list(params_sqlite if use_sqlite else params_pg)
         sql = f"""
-            SELECT id, job_title, job_description, link, job_title_norm, location, job_date, date
+            SELECT {', '.join(Job.SEARCH_COLUMNS)}
             FROM Jobs {where_clause}
-            {Job._order_by(country)}
+            {Job._order_by(country, sort)}
             LIMIT %s OFFSET %s
         """
         params.extend([int(limit), int(offset)])
         with db.cursor() as cur:
-            cur.execute(sql, params)
+            _execute_hot(cur, db, sql, params)
             cols = [desc[0] for desc in cur.description]
             return [dict(zip(cols, row)) for row in cur.fetchall()]
 
+    @staticmethod
+    def _search_with_archive(
+        title: Optional[str], country: Optional[str], limit: int, offset: int, sort: Optional[str] = None
+    ) -> List[Dict]:
+        where_sql, params_sqlite, params_pg = Job._where(title, country)
+        arch_sql, arch_sqlite, arch_pg = Job._where(title, country, Job._ARCHIVE_TEXT_FIELDS)
+        db = get_db()
+        use_sqlite = is_sqlite_connection(db)
+        backend = "sqlite" if use_sqlite else "pg"
+        params = list((params_sqlite + arch_sqlite) if use_sqlite else (params_pg + arch_pg))
+        blob_null = "NULL" if use_sqlite else "NULL::bytea"
+        # Wrapped in a subquery so _order_by may use expressions over the UNION output.
+        sql = f"""
+            SELECT * FROM (
+                SELECT id, job_title, job_description, {blob_null} AS job_description_z, link,
+                       job_title_norm, location, job_date, date, pay_rank, 0 AS archived
+                FROM Jobs {where_sql[backend]}
+                UNION ALL
+                SELECT id, job_title, NULL, job_description_z, link,
+                       job_title_norm, location, job_date, date, pay_rank, 1
+                FROM jobs_archive {arch_sql[backend]}
+            ) AS jobs_all
+            {Job._order_by(country, sort)}
+            LIMIT %s OFFSET %s
+        """
+        params.extend([int(limit), int(offset)])
+        with db.cursor() as cur:
+            cur.execute(sql, params)
+            cols = [desc[0] for desc in cur.description]
+            rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+        for row in rows:
+            blob = row.pop("job_description_z", None)
+            if blob is not None:
+                row["job_description"] = Job._decompress(blob)
+            row["archived"] = bool(row["archived"])
+        return rows
+
+    WRITE_COLUMNS: Tuple[str, ...] = (
+        "job_title",
+        "job_description",
+        "link",
+        "job_title_norm",
+        "location",
+        "job_date",
+        "date",
+        "country_code",
+        "summary",
+        "salary_min",
+        "salary_max",
+        "salary_currency",
+        "content_hash",
+        "updated_at",
+        "pay_rank",
+    )
+    # Written on every update but not part of "did the row change".
+    _UNCOMPARED_COLUMNS: Tuple[str, ...] = ("link", "updated_at")
+    BULK_BATCH_SIZE = 5000
+
+    @staticmethod
+    def _row_payload(row: Dict) -> tuple:
+        """Map an input row (scrape, CSV or API shaped) onto WRITE_COLUMNS."""
+        title = row.get("job_title") or row.get("title") or ""
+        return (
+            title,
+            row.get("job_description") or row.get("description") or "",
+            row.get("link") or "",
+            Job._normalize_title(row.get("job_title_norm") or title),
+            row.get("location") or row.get("country") or row.get("City") or "",
+            row.get("job_date") or row.get("date_posted") or "",
+            row.get("date") or row.get("created_at") or None,
+            row.get("country_code") or None,
+            row.get("summary") or None,
+            row.get("salary_min"),
+            row.get("salary_max"),
+            row.get("salary_currency") or None,
+            row.get("content_hash") or None,
+            row.get("updated_at") or _now_iso(),
+            row.get("pay_rank"),
+        )
+
     @staticmethod
     def insert_many(rows: List[Dict]) -> int:
         """Bulk insert jobs, ignoring duplicates by link."""
         if not rows:
             return 0
-        cols = ["job_title", "job_description", "link", "job_title_norm", "location", "job_date", "date"]
-        placeholders = ", ".join(["%s"] * len(cols))
-        sql = f"INSERT INTO Jobs ({', '.join(cols)}) VALUES ({placeholders}) ON CONFLICT (link) DO NOTHING"
+        return Job.bulk_upsert(rows)["inserted"]
 
-        payload = []
-        for row in rows:
-            title = row.get("job_title") or row.get("title") or ""
-            payload.append(
-                (
-                    title,
-                    row.get("job_description") or row.get("description") or "",
-                    row.get("link") or "",
-                    Job._normalize_title(row.get("job_title_norm") or title),
-                    row.get("location") or row.get("country") or row.get("City") or "",
-                    row.get("job_date") or row.get("date_posted") or "",
-                    row.get("date") or row.get("created_at") or None,
-                )
+    @staticmethod
+    def bulk_upsert(
+        rows: Iterable[Dict],
+        *,
+        update_existing: bool = False,
+        db=None,
+        batch_size: Optional[int] = None,
+        notify: bool = True,
+    ) -> Dict[str, int]:
+        """Load jobs set-based and return ``{"inserted", "updated", "skipped"}`` counts.
+
+        Postgres streams rows with ``COPY`` into a temporary staging table and merges them
+        with one ``INSERT ... SELECT ... ON CONFLICT (link)``; within one load the last row
+        for a link wins. SQLite runs ``executemany`` in large batches inside a single
+        transaction. With ``update_existing`` rows whose link exists but whose content
+        differs are updated; otherwise (and for identical rows) they count as skipped.
+        A load that changed rows bumps the jobs generation unless ``notify`` is False
+        (callers loading many batches bump once at the end).
+        """
+        db = db or get_db()
+        if is_sqlite_connection(db):
+            result = Job._bulk_upsert_sqlite(db, rows, update_existing, batch_size or Job.BULK_BATCH_SIZE)
+        else:
+            result = Job._bulk_upsert_pg(db, rows, update_existing)
+        if notify and (result["inserted"] or result["updated"]):
+            bump_jobs_generation(db)
+        return result
+
+    @staticmethod
+    def _bulk_upsert_sqlite(db, rows: Iterable[Dict], update_existing: bool, batch_size: int) -> Dict[str, int]:
+        cols = Job.WRITE_COLUMNS
+        sql = f"INSERT INTO Jobs ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))}) ON CONFLICT (link) "
+        if update_existing:
+            data_cols = [c for c in cols if c != "link"]
+            compared = [c for c in cols if c not in Job._UNCOMPARED_COLUMNS]
+            sql += (
+                "DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in data_cols)
+                + f" WHERE ({', '.join(compared)}) IS NOT ({', '.join('excluded.' + c for c in compared)})"
             )
+        else:
+            sql += "DO NOTHING"
 
-        db = get_db()
+        if db.in_transaction:
+            db.commit()
+        cur = db.cursor()
+        staged = 0
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            # New rows get ids above the current maximum (AUTOINCREMENT), so both counts come
+            # from the primary key instead of scanning Jobs.
+            max_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM Jobs").fetchone()[0]
+            changes_before = db.total_changes
+            batch: List[tuple] = []
+            for row in rows:
+                batch.append(Job._row_payload(row))
+                if len(batch) >= batch_size:
+                    cur.executemany(sql, batch)
+                    staged += len(batch)
+                    batch = []
+            if batch:
+                cur.executemany(sql, batch)
+                staged += len(batch)
+            changed = db.total_changes - changes_before
+            inserted = cur.execute("SELECT COUNT(1) FROM Jobs WHERE id > %s", (max_id,)).fetchone()[0]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cur.close()
+        updated = changed - inserted
+        return {"inserted": inserted, "updated": updated, "skipped": staged - inserted - updated}
+
+    @staticmethod
+    def _bulk_upsert_pg(db, rows: Iterable[Dict], update_existing: bool) -> Dict[str, int]:
+        cols = Job.WRITE_COLUMNS
+        col_list = ", ".join(cols)
+        if update_existing:
+            data_cols = [c for c in cols if c != "link"]
+            compared = [c for c in cols if c not in Job._UNCOMPARED_COLUMNS]
+            conflict = (
+                "DO UPDATE SET "
+                + ", ".join(f"{c} = EXCLUDED.{c}" for c in data_cols)
+                + f" WHERE ({', '.join('Jobs.' + c for c in compared)})"
+                + f" IS DISTINCT FROM ({', '.join('EXCLUDED.' + c for c in compared)})"
+            )
+        else:
+            conflict = "DO NOTHING"
+        merge_sql = f"""
+            WITH src AS (
+                SELECT DISTINCT ON (link) {col_list}
+                FROM jobs_stage
+                ORDER BY link, ord DESC
+            ), merged AS (
+                INSERT INTO Jobs ({col_list})
+                SELECT {col_list} FROM src
+                ON CONFLICT (link) {conflict}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM merged
+        """
+        staged = 0
+        with db.transaction():
+            with db.cursor() as cur:
+                # Bulk loads legitimately outlive the interactive 800 ms budget.
+                cur.execute("SET LOCAL statement_timeout = 0")
+                # Temporary tables are never WAL-logged and are private to this session,
+                # so concurrent loads cannot collide; ON COMMIT DROP cleans up.
+                staged = Job._stage_pg(cur, rows)
+                cur.execute(merge_sql)
+                inserted, updated = cur.fetchone()
+        inserted, updated = int(inserted or 0), int(updated or 0)
+        return {"inserted": inserted, "updated": updated, "skipped": staged - inserted - updated}
+
+    _PG_STAGE_DDL = """
+        CREATE TEMP TABLE jobs_stage (
+            ord BIGINT,
+            job_title TEXT,
+            job_description TEXT,
+            link TEXT,
+            job_title_norm TEXT,
+            location TEXT,
+            job_date TEXT,
+            date TIMESTAMP WITH TIME ZONE,
+            country_code TEXT,
+            summary TEXT,
+            salary_min INTEGER,
+            salary_max INTEGER,
+            salary_currency TEXT,
+            content_hash TEXT,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            pay_rank INTEGER
+        ) ON COMMIT DROP
+    """
+
+    @staticmethod
+    def _stage_pg(cur, rows: Iterable[Dict]) -> int:
+        """COPY rows into a transaction-scoped jobs_stage table; return how many."""
+        staged = 0
+        cur.execute(Job._PG_STAGE_DDL)
+        with cur.copy(f"COPY jobs_stage (ord, {', '.join(Job.WRITE_COLUMNS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row((staged,) + Job._row_payload(row))
+                staged += 1
+        return staged
+
+    @staticmethod
+    def _renamed_index(name: str, old_table: str, new_table: str) -> str:
+        """Carry an index name over to a renamed table (idx_jobs_date -> idx_jobs_prev_date)."""
+        return name.replace(f"{old_table}_", f"{new_table}_", 1)
+
+    @staticmethod
+    def _rename_table_pg(cur, old: str, new: str) -> None:
+        cur.execute(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+            (old,),
+        )
+        indexes = [row[0] for row in cur.fetchall()]
+        cur.execute(f"ALTER TABLE {old} RENAME TO {new}")
+        for index in indexes:
+            renamed = Job._renamed_index(index, old, new)
+            if renamed != index:
+                # Renames the PRIMARY KEY / UNIQUE constraint the index backs as well.
+                cur.execute(f"ALTER INDEX {index} RENAME TO {renamed}")
+
+    @staticmethod
+    def reload(rows: Iterable[Dict], db=None, *, keep_previous: bool = True) -> Dict[str, int]:
+        """Replace every job with ``rows`` through a blue/green table swap (Postgres only).
+
+        Rows are loaded into a fresh ``jobs_next`` table (links already in Jobs keep their
+        id, so apply links survive), which then gets Jobs' indexes and constraints and an
+        ``ANALYZE``. One short transaction renames Jobs to ``jobs_prev`` and ``jobs_next``
+        to Jobs, so readers see either the old or the new set, never a partial load.
+        ``Job.rollback_reload`` swaps ``jobs_prev`` back. Returns
+        ``{"inserted", "updated", "removed"}`` relative to the previous table.
+        """
+        db = db or get_db()
+        if is_sqlite_connection(db):
+            raise RuntimeError("Full reloads swap Postgres tables; on SQLite rebuild the serving database instead")
+        cols = ", ".join(Job.WRITE_COLUMNS)
+        with db.transaction():
+            with db.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = 0")
+                cur.execute("SELECT pg_get_serial_sequence('jobs', 'id')")
+                sequence = cur.fetchone()[0]
+                cur.execute("DROP TABLE IF EXISTS jobs_next")
+                cur.execute("CREATE TABLE jobs_next (LIKE jobs INCLUDING DEFAULTS)")
+                Job._stage_pg(cur, rows)
+                # Only links new to Jobs draw from the id sequence.
+                cur.execute(
+                    f"""
+                    INSERT INTO jobs_next (id, {cols})
+                    SELECT COALESCE(j.id, nextval(%s::regclass)), {', '.join('s.' + c for c in Job.WRITE_COLUMNS)}
+                    FROM (
+                        SELECT DISTINCT ON (link) * FROM jobs_stage ORDER BY link, ord DESC
+                    ) s
+                    LEFT JOIN jobs j ON j.link = s.link
+                    """,
+                    (sequence,),
+                )
+                cur.execute(
+                    "SELECT COUNT(*) FILTER (WHERE j.id IS NULL), COUNT(j.id) "
+                    "FROM jobs_next n LEFT JOIN jobs j ON j.id = n.id"
+                )
+                inserted, updated = cur.fetchone()
+                cur.execute("SELECT COUNT(*) FROM jobs")
+                removed = cur.fetchone()[0] - updated
+                # Same indexes and constraints as Jobs, built once over the loaded table.
+                cur.execute(
+                    "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'jobs'"
+                )
+                indexes = cur.fetchall()
+                cur.execute(
+                    "SELECT conname, contype FROM pg_constraint "
+                    "WHERE conrelid = 'jobs'::regclass AND contype IN ('p', 'u')"
+                )
+                constraints = dict(cur.fetchall())
+                for name, definition in indexes:
+                    next_name = Job._renamed_index(name, "jobs", "jobs_next")
+                    definition = definition.replace(f"INDEX {name} ON ", f"INDEX {next_name} ON ", 1)
+                    cur.execute(re.sub(r" ON (\w+\.)?jobs ", r" ON \1jobs_next ", definition, count=1))
+                    if name in constraints:
+                        kind = "PRIMARY KEY" if constraints[name] == "p" else "UNIQUE"
+                        cur.execute(f"ALTER TABLE jobs_next ADD CONSTRAINT {next_name} {kind} USING INDEX {next_name}")
+                cur.execute("ANALYZE jobs_next")
+        Job._swap_tables_pg(db, "jobs_next", sequence, keep_previous)
+        bump_jobs_generation(db)
+        logger.info("Reloaded jobs: %s new, %s kept, %s removed", inserted, updated, removed)
+        return {"inserted": int(inserted), "updated": int(updated), "removed": int(removed)}
+
+    @staticmethod
+    def rollback_reload(db=None) -> None:
+        """Swap ``jobs_prev`` (the table before the last reload) back in as Jobs."""
+        db = db or get_db()
+        if is_sqlite_connection(db):
+            raise RuntimeError("Full reloads swap Postgres tables; nothing to roll back on SQLite")
         with db.cursor() as cur:
-            cur.executemany(sql, payload)
-            return cur.rowcount or 0
+            cur.execute("SELECT pg_get_serial_sequence('jobs', 'id')")
+            sequence = cur.fetchone()[0]
+        Job._swap_tables_pg(db, "jobs_prev", sequence, True)
+        bump_jobs_generation(db)
+
+    @staticmethod
+    def _swap_tables_pg(db, incoming: str, sequence: str, keep_previous: bool, attempts: int = 5) -> None:
+        """Rename ``incoming`` to Jobs and Jobs to jobs_prev in one transaction."""
+        for attempt in range(1, attempts + 1):
+            try:
+                with db.transaction():
+                    with db.cursor() as cur:
+                        # Wait briefly for in-flight searches; retry rather than queue readers.
+                        cur.execute("SET LOCAL lock_timeout = '2s'")
+                        cur.execute("LOCK TABLE jobs IN ACCESS EXCLUSIVE MODE")
+                        Job._rename_table_pg(cur, "jobs", "jobs_swap")
+                        Job._rename_table_pg(cur, incoming, "jobs")
+                        if incoming != "jobs_prev":
+                            cur.execute("DROP TABLE IF EXISTS jobs_prev")
+                        Job._rename_table_pg(cur, "jobs_swap", "jobs_prev")
+                        # The id sequence belongs to whichever table is live.
+                        cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY jobs.id")
+                        if not keep_previous:
+                            cur.execute("DROP TABLE jobs_prev")
+                return
+            except Exception as exc:
+                if LockNotAvailable is None or not isinstance(exc, LockNotAvailable) or attempt == attempts:
+                    raise
+                logger.info("Jobs table busy, retrying swap (%s/%s)", attempt, attempts)
+                time.sleep(0.5 * attempt)
+
+    @staticmethod
+    def unchanged_links(pairs: Sequence[Tuple[str, str]], db=None) -> Set[str]:
+        """Return the links of ``(link, content_hash)`` pairs whose stored hash is identical.
+
+        The pairs are loaded into a temporary table and joined against Jobs in one query
+        (``COPY`` on Postgres), so a batch costs one round trip regardless of its size.
+        """
+        if not pairs:
+            return set()
+        db = db or get_db()
+        join_sql = (
+            "SELECT s.link FROM jobs_hash_stage s "
+            "JOIN Jobs j ON j.link = s.link AND j.content_hash = s.content_hash"
+        )
+        if is_sqlite_connection(db):
+            if db.in_transaction:
+                db.commit()
+            cur = db.cursor()
+            try:
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS jobs_hash_stage (link TEXT PRIMARY KEY, content_hash TEXT)")
+                cur.executemany("INSERT OR REPLACE INTO jobs_hash_stage (link, content_hash) VALUES (%s, %s)", pairs)
+                cur.execute(join_sql)
+                links = {row[0] for row in cur.fetchall()}
+                cur.execute("DELETE FROM jobs_hash_stage")
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                cur.close()
+            return links
+        with db.transaction():
+            with db.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE jobs_hash_stage (link TEXT, content_hash TEXT) ON COMMIT DROP")
+                with cur.copy("COPY jobs_hash_stage (link, content_hash) FROM STDIN") as copy:
+                    for pair in pairs:
+                        copy.write_row(pair)
+                cur.execute(join_sql)
+                return {row[0] for row in cur.fetchall()}
+
+    ARCHIVE_COLUMNS: Tuple[str, ...] = (
+        "id",
+        "job_title",
+        "link",
+        "job_title_norm",
+        "location",
+        "job_date",
+        "date",
+        "country_code",
+        "summary",
+        "salary_min",
+        "salary_max",
+        "salary_currency",
+        "content_hash",
+        "updated_at",
+        "pay_rank",
+    )
+
+    @staticmethod
+    def _compress(text: Optional[str]) -> Optional[bytes]:
+        return zlib.compress(text.encode("utf-8"), 6) if text else None
+
+    @staticmethod
+    def _decompress(blob) -> str:
+        return zlib.decompress(bytes(blob)).decode("utf-8") if blob else ""
+
+    @staticmethod
+    def archive_expired(
+        days: int = JOBS_RETENTION_DAYS,
+        *,
+        batch_size: int = 1000,
+        pause: float = 0.0,
+        db=None,
+    ) -> int:
+        """Move jobs posted more than ``days`` ago into jobs_archive; return how many moved.
+
+        Jobs are picked by ``date`` (or ``job_date`` when ``date`` is missing) and moved
+        ``batch_size`` at a time, each batch in its own short transaction, optionally with
+        ``pause`` seconds between batches, so live searches never queue behind one large
+        delete. Descriptions are stored zlib-compressed.
+        """
+        db = db or get_db()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        # Only 8-digit YYYYMMDD job_date values compare correctly as text ('2026-10-15' sorts
+        # before '20260718'); other formats are left for date to decide.
+        yyyymmdd = (
+            "CAST(job_date AS TEXT) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]'"
+            if is_sqlite_connection(db)
+            else "CAST(job_date AS TEXT) ~ '^[0-9]{8}$'"
+        )
+        predicates = (
+            ("date < %s", cutoff.isoformat(timespec="seconds")),
+            # The lower bound rejects zero-filled placeholders.
+            (
+                f"date IS NULL AND {yyyymmdd} AND CAST(job_date AS TEXT) BETWEEN '19000101' AND %s",
+                cutoff.strftime("%Y%m%d"),
+            ),
+        )
+        moved = 0
+        for predicate, bound in predicates:
+            while True:
+                count = Job._archive_batch(db, predicate, bound, max(1, int(batch_size)))
+                moved += count
+                if count < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+        if moved:
+            bump_jobs_generation(db)
+            logger.info("Archived %s jobs posted before %s", moved, cutoff.date().isoformat())
+        return moved
+
+    @staticmethod
+    def _archive_batch(db, predicate: str, bound: str, batch_size: int) -> int:
+        cols = Job.ARCHIVE_COLUMNS
+        select_sql = f"SELECT {', '.join(cols)}, job_description FROM Jobs WHERE {predicate} LIMIT %s"
+        archive_sql = (
+            f"INSERT INTO jobs_archive ({', '.join(cols)}, job_description_z, archived_at) "
+            f"VALUES ({', '.join(['%s'] * (len(cols) + 2))})"
+        )
+        archived_at = _now_iso()
+
+        def archive_rows(rows):
+            return [tuple(row[:-1]) + (Job._compress(row[-1]), archived_at) for row in rows]
+
+        if is_sqlite_connection(db):
+            if db.in_transaction:
+                db.commit()
+            cur = db.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                rows = cur.execute(select_sql, (bound, batch_size)).fetchall()
+                if rows:
+                    link_idx = cols.index("link")
+                    # A link archived before and re-ingested since: keep the newest copy.
+                    cur.executemany("DELETE FROM jobs_archive WHERE link = %s", [(row[link_idx],) for row in rows])
+                    cur.executemany(archive_sql, archive_rows(rows))
+                    cur.executemany("DELETE FROM Jobs WHERE id = %s", [(row[0],) for row in rows])
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                cur.close()
+            return len(rows)
+        with db.transaction():
+            with db.cursor() as cur:
+                # SKIP LOCKED leaves rows being updated by a concurrent ingest for the next run.
+                cur.execute(select_sql + " FOR UPDATE SKIP LOCKED", (bound, batch_size))
+                rows = cur.fetchall()
+                if rows:
+                    link_idx = cols.index("link")
+                    cur.execute("DELETE FROM jobs_archive WHERE link = ANY(%s)", ([row[link_idx] for row in rows],))
+                    cur.executemany(archive_sql, archive_rows(rows))
+                    cur.execute("DELETE FROM Jobs WHERE id = ANY(%s)", ([row[0] for row in rows],))
+        return len(rows)
 
     @staticmethod
     def get_link(job_id: Optional[str]) -> Optional[str]:
@@ -898,10 +2116,26 @@ class Job:
         except (TypeError, ValueError):
             return None
 
-        db = get_db()
-        with db.cursor() as cur:
-            cur.execute("SELECT link FROM Jobs WHERE id = %s", [value_param])
+        from flask import g
+
+        read_db = get_read_db()
+        with read_db.cursor() as cur:
+            _execute_hot(cur, read_db, "SELECT link FROM Jobs WHERE id = %s", [value_param])
             row = cur.fetchone()
+        if not row:
+            # Archived jobs keep their id, so old apply links still resolve; jobs newer than
+            # the serving copy are only in the main database. get_read_db() falls back to
+            # g.db itself, so a read copy is anything else (the primary may not be open yet).
+            on_primary = read_db is g.get("db")
+            db = get_db()
+            sql = "SELECT link FROM jobs_archive WHERE id = %s"
+            params = [value_param]
+            if not on_primary:
+                sql = "SELECT link FROM Jobs WHERE id = %s UNION ALL " + sql
+                params.append(value_param)
+            with db.cursor() as cur:
+                cur.execute(sql, params)
+                row = cur.fetchone()
         if not row:
             return None
 
@@ -920,11 +2154,24 @@ class Job:
         return link.strip() if isinstance(link, str) else None
 
     @staticmethod
-    def _where(title: Optional[str], country: Optional[str]) -> Tuple[Dict[str, str], Tuple[str, ...], Tuple[str, ...]]:
-        clauses_pg: List[str] = []
-        clauses_sqlite: List[str] = []
-        params_pg: List[str] = []
-        params_sqlite: List[str] = []
+    def filter_width(title: Optional[str], country: Optional[str]) -> int:
+        """How many field/LIKE pairs a search is OR-ed over (EU expands to well over 100)."""
+        return sum(len(fields) * len(patterns) for fields, patterns, _ in Job._filters(title, country))
+
+    @staticmethod
+    def _filters(
+        title: Optional[str],
+        country: Optional[str],
+        text_fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Tuple[Tuple[str, ...], List[str], Optional[List[str]]]]:
+        """Return AND-ed filter clauses as (fields, like_patterns, equals_values).
+
+        Within a clause every field is OR-ed against every pattern; ``equals_values`` is
+        ``None`` when the clause has no exact-match arm. Title terms match ``text_fields``
+        (default ``_TEXT_FIELDS``).
+        """
+        filters: List[Tuple[Tuple[str, ...], List[str], Optional[List[str]]]] = []
+        text_fields = text_fields or Job._TEXT_FIELDS
 
         if title:
             t_norm = Job._normalize_title(title)
@@ -937,46 +2184,16 @@ class Job:
                 core_query = " ".join(core_tokens).strip()
 
                 if core_query:
-                    like = f"%{Job._escape_like(core_query)}%"
-                    clause_pg = "(job_title_norm ILIKE %s ESCAPE '\\' OR LOWER(job_title) LIKE %s ESCAPE '\\' OR LOWER(job_description) LIKE %s ESCAPE '\\')"
-                    clause_sqlite = "(job_title_norm LIKE ? ESCAPE '\\' OR LOWER(job_title) LIKE ? ESCAPE '\\' OR LOWER(job_description) LIKE ? ESCAPE '\\')"
-                    clauses_pg.append(clause_pg)
-                    clauses_sqlite.append(clause_sqlite)
-                    params_pg.extend([like, like, like])
-                    params_sqlite.extend([like, like, like])
+                    filters.append((text_fields, [f"%{Job._escape_like(core_query)}%"], None))
 
                 if remote_flag:
                     remote_like = f"%{Job._escape_like('remote')}%"
-                    clause_pg_remote = "(job_title_norm ILIKE %s ESCAPE '\\' OR LOWER(job_title) LIKE %s ESCAPE '\\' OR LOWER(job_description) LIKE %s ESCAPE '\\' OR LOWER(location) LIKE %s ESCAPE '\\')"
-                    clause_sqlite_remote = "(job_title_norm LIKE ? ESCAPE '\\' OR LOWER(job_title) LIKE ? ESCAPE '\\' OR LOWER(job_description) LIKE ? ESCAPE '\\' OR LOWER(location) LIKE ? ESCAPE '\\')"
-                    clauses_pg.append(clause_pg_remote)
-                    clauses_sqlite.append(clause_sqlite_remote)
-                    params_pg.extend([remote_like, remote_like, remote_like, remote_like])
-                    params_sqlite.extend([remote_like, remote_like, remote_like, remote_like])
+                    filters.append((text_fields + ("location",), [remote_like], None))
 
                 if developer_flag:
                     dev_terms = ["developer", "programmer", "coder", "software developer", "software engineer"]
                     patterns = [f"%{Job._escape_like(term)}%" for term in dev_terms]
-                    clause_pg_terms: List[str] = []
-                    clause_sqlite_terms: List[str] = []
-                    for _ in dev_terms:
-                        clause_pg_terms.extend([
-                            "job_title_norm ILIKE %s ESCAPE '\\'",
-                            "LOWER(job_title) LIKE %s ESCAPE '\\'",
-                            "LOWER(job_description) LIKE %s ESCAPE '\\'",
-                        ])
-                        clause_sqlite_terms.extend([
-                            "job_title_norm LIKE ? ESCAPE '\\'",
-                            "LOWER(job_title) LIKE ? ESCAPE '\\'",
-                            "LOWER(job_description) LIKE ? ESCAPE '\\'",
-                        ])
-                    clause_pg_dev = "(" + " OR ".join(clause_pg_terms) + ")"
-                    clause_sqlite_dev = "(" + " OR ".join(clause_sqlite_terms) + ")"
-                    clauses_pg.append(clause_pg_dev)
-                    clauses_sqlite.append(clause_sqlite_dev)
-                    for pattern in patterns:
-                        params_pg.extend([pattern, pattern, pattern])
-                        params_sqlite.extend([pattern, pattern, pattern])
+                    filters.append((text_fields, patterns, None))
 
         if country:
             c_raw = (country or "").strip().lower()
@@ -987,10 +2204,8 @@ class Job:
                 code = upper if len(upper) == 2 and upper.isalpha() else None
 
                 if upper == "HIGH_PAY":
-                    high_pay_cities = ["new york", "san francisco", "zurich"]
-                    for city in high_pay_cities:
-                        patterns_like.append(f"%{Job._escape_like(city)}%")
-                        equals_exact.append(city)
+                    # Matched on pay_rank by _where, not on the location text.
+                    pass
                 elif upper == "EU":
                     patterns_like, equals_exact = Job._country_patterns(Job._EU_FILTER_CODES | {"EU"})
                 elif upper == "CH":
@@ -1000,44 +2215,79 @@ class Job:
                 else:
                     patterns_like = [f"%{Job._escape_like(c_raw)}%"]
 
-                subclauses_pg: List[str] = []
-                subclauses_sqlite: List[str] = []
-                if patterns_like:
-                    subclauses_pg.append("(" + " OR ".join(["LOWER(location) LIKE %s ESCAPE '\\'"] * len(patterns_like)) + ")")
-                    subclauses_sqlite.append("(" + " OR ".join(["LOWER(location) LIKE ? ESCAPE '\\'"] * len(patterns_like)) + ")")
-                if equals_exact:
-                    subclauses_pg.append("(" + " OR ".join(["LOWER(location) = %s"] * len(equals_exact)) + ")")
-                    subclauses_sqlite.append("(" + " OR ".join(["LOWER(location) = ?"] * len(equals_exact)) + ")")
-                if subclauses_pg:
-                    clause_pg = "(" + " OR ".join(subclauses_pg) + ")"
-                    clause_sqlite = "(" + " OR ".join(subclauses_sqlite) + ")"
-                    clauses_pg.append(clause_pg)
-                    clauses_sqlite.append(clause_sqlite)
-                    params_pg.extend(patterns_like)
-                    params_sqlite.extend(patterns_like)
-                    params_pg.extend([eq.lower() for eq in equals_exact])
-                    params_sqlite.extend([eq.lower() for eq in equals_exact])
+                if patterns_like or equals_exact:
+                    filters.append((("location",), patterns_like, [eq.lower() for eq in equals_exact]))
+
+        return filters
+
+    @staticmethod
+    def _where(
+        title: Optional[str],
+        country: Optional[str],
+        text_fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[Dict[str, str], tuple, tuple]:
+        """Build WHERE clauses for both backends from ``_filters``.
+
+        Postgres receives each pattern list as a single array parameter so the statement
+        text only depends on which filters are present, never on how many patterns they
+        carry, so the hot queries reduce to a handful of statement shapes.
+        SQLite has no array type and gets one placeholder per pattern instead.
+        """
+        clauses_pg: List[str] = []
+        clauses_sqlite: List[str] = []
+        params_pg: List = []
+        params_sqlite: List[str] = []
+
+        for fields, likes, equals in Job._filters(title, country, text_fields):
+            terms_pg: List[str] = []
+            terms_sqlite: List[str] = []
+            # Postgres LIKE already treats backslash as the escape character.
+            for field in fields:
+                if field == "job_title_norm":
+                    terms_pg.append("job_title_norm ILIKE ANY(%s::text[])")
+                    sqlite_term = "job_title_norm LIKE ? ESCAPE '\\'"
+                else:
+                    terms_pg.append(f"LOWER({field}) LIKE ANY(%s::text[])")
+                    sqlite_term = f"LOWER({field}) LIKE ? ESCAPE '\\'"
+                params_pg.append(list(likes))
+                terms_sqlite.extend([sqlite_term] * len(likes))
+                params_sqlite.extend(likes)
+            if equals is not None:
+                for field in fields:
+                    terms_pg.append(f"LOWER({field}) = ANY(%s::text[])")
+                    params_pg.append(list(equals))
+                    terms_sqlite.extend([f"LOWER({field}) = ?"] * len(equals))
+                    params_sqlite.extend(equals)
+            clauses_pg.append("(" + " OR ".join(terms_pg) + ")")
+            if terms_sqlite:
+                clauses_sqlite.append("(" + " OR ".join(terms_sqlite) + ")")
+
+        floor = Job._pay_rank_floor(country)
+        if floor is not None:
+            clauses_pg.append("pay_rank >= %s")
+            params_pg.append(floor)
+            clauses_sqlite.append("pay_rank >= ?")
+            params_sqlite.append(floor)
 
         where_pg = f"WHERE {' AND '.join(clauses_pg)}" if clauses_pg else ""
         where_sqlite = f"WHERE {' AND '.join(clauses_sqlite)}" if clauses_sqlite else ""
         return {"pg": where_pg, "sqlite": where_sqlite}, tuple(params_sqlite), tuple(params_pg)
 
     @staticmethod
-    def _order_by(country: Optional[str]) -> str:
-        if not country:
-            return "ORDER BY (date IS NULL) ASC, date DESC, id DESC"
-        code = country.strip().upper()
+    def _pay_rank_floor(country: Optional[str]) -> Optional[int]:
+        """Minimum pay_rank the country filter requires (HIGH_PAY only), else None."""
+        return HIGH_PAY_MIN_RANK if (country or "").strip().upper() == "HIGH_PAY" else None
+
+    SORTS: Tuple[str, ...] = ("date", "pay")
+
+    @staticmethod
+    def _order_by(country: Optional[str], sort: Optional[str] = None) -> str:
+        code = (country or "").strip().upper()
+        if sort == "pay" or code == "HIGH_PAY":
+            # Matches idx_jobs_pay_rank, so the first page is read straight off the index.
+            return "ORDER BY pay_rank DESC NULLS LAST, date DESC NULLS LAST, id DESC"
         if code == "EU":
             return "ORDER BY RANDOM()"
-        if code == "HIGH_PAY":
-            return (
-                "ORDER BY CASE "
-                "WHEN LOWER(location) LIKE '%san francisco%' THEN 0 "
-                "WHEN LOWER(location) LIKE '%new york%' THEN 1 "
-                "WHEN LOWER(location) LIKE '%zurich%' THEN 2 "
-                "ELSE 3 END, "
-                "(date IS NULL) ASC, date DESC, id DESC"
-            )
         return "ORDER BY (date IS NULL) ASC, date DESC, id DESC"
 
 # ------------------------- Salary Parsing Functions --------------------------
@@ -0,0 +1,645 @@
+# app/models/ingest.py - Streaming ingest pipeline for job exports
+
+import csv
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .db import (
+    Job,
+    bump_jobs_generation,
+    clean_job_description_text,
+    get_db,
+    location_country_code,
+    logger,
+    normalize_title,
+    parse_money_numbers,
+    summarize_two_sentences,
+)
+from .salary import salary_index
+
+
+class IngestContext:
+    """Per-run state shared by the stages: the connection, batch size and counters."""
+
+    def __init__(self, db, *, batch_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.counters: Dict[str, int] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+
+# A stage takes the upstream row iterator and the run context and yields (possibly fewer) rows.
+Stage = Callable[[Iterable[Dict], IngestContext], Iterator[Dict]]
+
+# Scraped descriptions can exceed csv's 128 KiB default field size.
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def _first(row: Dict, *keys: str):
+    """Return the first non-empty value among ``keys``."""
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------------------- Readers -------------------------------------------
+
+def _detect_delimiter(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters="\t,;|").delimiter
+    except csv.Error:
+        first_line = sample.split("\n", 1)[0]
+        return "\t" if "\t" in first_line else ","
+
+
+def read_delimited(path) -> Iterator[Dict]:
+    """Yield rows of a CSV/TSV export (delimiter sniffed, e.g. the tab-separated jobs.csv)."""
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as fh:
+        delimiter = _detect_delimiter(fh.read(8192))
+        fh.seek(0)
+        reader = csv.reader(fh, delimiter=delimiter)
+        try:
+            header = [h.replace("\ufeff", "").strip() for h in next(reader)]
+        except StopIteration:
+            return
+        for values in reader:
+            if not any(values):
+                continue
+            yield dict(zip(header, values))
+
+
+def _flatten(item: Dict, prefix: str = "", out: Optional[Dict] = None) -> Dict:
+    """Flatten nested objects: leaf keys are kept bare (first wins) and as ``parent_leaf``."""
+    out = {} if out is None else out
+    for key, value in item.items():
+        if isinstance(value, dict):
+            _flatten(value, f"{key}_", out)
+            continue
+        if isinstance(value, list) and all(not isinstance(v, (dict, list)) for v in value):
+            value = ", ".join(str(v) for v in value)
+        out.setdefault(key, value)
+        if prefix:
+            out.setdefault(prefix + key, value)
+    return out
+
+
+_JSON_WS = " \t\n\r"
+_DECODER = json.JSONDecoder()
+_NUMBER_END = re.compile(r"[\s,\]}]")
+
+
+class _JSONStream:
+    """Buffered cursor over a text stream that decodes one JSON value at a time."""
+
+    def __init__(self, fh, chunk_size: int):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self._fh.read(self._chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _JSON_WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the next complete value, reading more input until it is whole."""
+        if self.peek() in "-0123456789":
+            # A number is only complete once a delimiter follows it ("1" may be "1.5").
+            while not _NUMBER_END.search(self.buf, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+
+def _array_items(stream: _JSONStream) -> Iterator:
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def iter_json_items(
+    fh, keys: Optional[Sequence[str]] = None, chunk_size: int = 1 << 16, *, fallback: bool = False
+) -> Iterator:
+    """Yield the items of a large JSON array one at a time without loading the document.
+
+    Accepts a top-level array, or an object whose first array member (restricted to
+    ``keys`` when given, e.g. ``["generated_jobs"]``) is streamed; other members are
+    skipped. Memory stays at roughly one item plus ``chunk_size`` characters. With
+    ``fallback``, an object with no array under ``keys`` yields the items of its first
+    array member instead, or the object itself when it has none (those members are
+    held in memory until the end).
+    """
+    stream = _JSONStream(fh, chunk_size)
+    first = stream.peek()
+    if first == "[":
+        yield from _array_items(stream)
+        return
+    stream.expect("{")
+    members: Dict[str, object] = {}
+    first_list: Optional[list] = None
+    if stream.peek() != "}":
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if stream.peek() == "[" and (keys is None or key in keys):
+                yield from _array_items(stream)
+                return
+            value = stream.value()
+            if fallback:
+                if isinstance(value, list):
+                    first_list = value if first_list is None else first_list
+                else:
+                    members[key] = value
+            if stream.expect(",}") == "}":
+                break
+    if fallback:
+        yield from (first_list if first_list is not None else [members])
+
+
+# Where exports keep their job list; any other array is only used when none of these is present.
+_JSON_RECORD_KEYS = ("jobs", "generated_jobs", "data", "results", "items")
+
+
+def read_json(path) -> Iterator[Dict]:
+    """Yield flattened records from a JSON document (streamed) or a JSON-lines file."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as fh:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield _flatten(json.loads(line))
+            return
+        for item in iter_json_items(fh, _JSON_RECORD_KEYS, fallback=True):
+            if isinstance(item, dict):
+                yield _flatten(item)
+
+
+READERS: Dict[str, Callable[[object], Iterator[Dict]]] = {
+    "csv": read_delimited,
+    "tsv": read_delimited,
+    "txt": read_delimited,
+    "json": read_json,
+    "jsonl": read_json,
+    "ndjson": read_json,
+}
+
+
+def reader_for(path, fmt: Optional[str] = None) -> Callable[[object], Iterator[Dict]]:
+    key = (fmt or Path(path).suffix.lstrip(".")).lower()
+    if key not in READERS:
+        raise ValueError(f"Unsupported input format: {key or path}")
+    return READERS[key]
+
+
+# ------------------------- Stages --------------------------------------------
+
+def normalize(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    """Map source fields onto Jobs columns, normalize the title and resolve the country.
+
+    Rows without a link are dropped: ``link`` is the upsert key.
+    """
+    for row in rows:
+        link = _first(row, "link", "url", "job_url", "apply_url")
+        if not link:
+            ctx.count("rejected")
+            continue
+        title = str(_first(row, "job_title", "title", "position") or "").strip()
+        location = str(_first(row, "location", "job_location", "city", "City", "country") or "").strip()
+        country = _first(row, "country_code") or location_country_code(location)
+        if not country and row.get("country"):
+            country = location_country_code(str(row["country"]))
+        out = dict(row)
+        out.update(
+            link=str(link).strip(),
+            job_title=title,
+            job_title_norm=str(row.get("job_title_norm") or "").strip() or normalize_title(title),
+            location=location,
+            country_code=(country or "").upper() or None,
+        )
+        yield out
+
+
+def describe_row(row: Dict) -> Dict:
+    """Strip scraper prefixes from the description and derive the two-sentence summary."""
+    text = clean_job_description_text(_first(row, "job_description", "description", "body") or "")
+    row["job_description"] = text
+    row["summary"] = summarize_two_sentences(text) if text else (row.get("summary") or None)
+    return row
+
+
+def describe(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    for row in rows:
+        yield describe_row(row)
+
+
+_JOB_DATE_RE = re.compile(r"^\d{8}$")
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    s = str(value).strip()
+    if s.isdigit() and len(s) >= 10:
+        try:
+            return datetime.fromtimestamp(int(s[:10]), tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in ("%Y%m%d", "%d.%m.%Y", "%d/%m/%Y", "%Y/%m/%d", "%b %d, %Y", "%d %b %Y"):
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _to_int(value) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    nums = parse_money_numbers(str(value))
+    return nums[0] if nums else None
+
+
+def parse_row(row: Dict) -> Dict:
+    """Parse the posting date into ISO ``date`` / ``YYYYMMDD`` ``job_date`` and the salary range."""
+    posted = _parse_datetime(_first(row, "date", "created_at", "date_posted", "posted_at", "job_date"))
+    row["date"] = posted.isoformat(timespec="seconds") if posted else None
+    job_date = str(row.get("job_date") or "").strip()
+    if not _JOB_DATE_RE.match(job_date):
+        job_date = posted.strftime("%Y%m%d") if posted else ""
+    row["job_date"] = job_date
+
+    low = _to_int(_first(row, "salary_min", "salary_range_min", "min_salary"))
+    high = _to_int(_first(row, "salary_max", "salary_range_max", "max_salary"))
+    if low is None and high is None and isinstance(row.get("salary"), str):
+        nums = parse_money_numbers(row["salary"])
+        low, high = (nums[0], nums[-1]) if nums else (None, None)
+    if low is not None and high is not None and low > high:
+        low, high = high, low
+    currency = str(_first(row, "salary_currency", "currency", "salary_range_currency") or "").strip().upper()
+    row["salary_min"] = low
+    row["salary_max"] = high
+    row["salary_currency"] = currency[:3] or None
+    return row
+
+
+def parse(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    for row in rows:
+        yield parse_row(row)
+
+
+def dedupe(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    """Drop repeated links within one run; the first occurrence wins."""
+    seen = set()
+    for row in rows:
+        link = row.get("link")
+        if link in seen:
+            ctx.count("duplicates")
+            continue
+        seen.add(link)
+        yield row
+
+
+# Bump to rehash (and so rewrite) every job, e.g. after changing what describe/parse derive.
+HASH_VERSION = "1"
+_HASHED_FIELDS: Tuple[Tuple[str, ...], ...] = (
+    ("link",),
+    ("job_title",),
+    ("job_title_norm",),
+    ("location",),
+    ("country_code",),
+    ("job_description", "description", "body"),
+    ("date", "created_at", "date_posted", "posted_at"),
+    ("job_date",),
+    ("salary_min", "salary_range_min", "min_salary"),
+    ("salary_max", "salary_range_max", "max_salary"),
+    ("salary_currency", "currency", "salary_range_currency"),
+    ("salary",),
+    ("summary",),
+)
+
+
+def content_hash(row: Dict) -> str:
+    """Hash the source fields of a normalized row (before anything is derived from them)."""
+    values = [HASH_VERSION] + [_first(row, *keys) for keys in _HASHED_FIELDS]
+    payload = json.dumps(values, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def hash_rows(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    """Attach ``content_hash`` to each row."""
+    for row in rows:
+        row["content_hash"] = content_hash(row)
+        yield row
+
+
+def diff(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    """Drop rows whose link is stored with the same ``content_hash`` (one join per batch).
+
+    Placed before ``describe``/``parse`` so derived columns are only recomputed for new
+    or changed jobs.
+    """
+    for batch in _batches(rows, ctx.batch_size):
+        unchanged = Job.unchanged_links([(row["link"], row["content_hash"]) for row in batch], ctx.db)
+        ctx.count("unchanged", len(unchanged))
+        for row in batch:
+            if row["link"] not in unchanged:
+                yield row
+
+
+def rank(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+    """Set ``pay_rank`` from the in-memory salary reference (see app.models.salary).
+
+    The reference is refreshed when the pipeline is built, before any row flows: a full
+    reload streams the rows into COPY on ``ctx.db``, which cannot run other queries then.
+    """
+    salary_index.refresh(ctx.db)
+    return _ranked(rows)
+
+
+def _ranked(rows: Iterable[Dict]) -> Iterator[Dict]:
+    for row in rows:
+        row["pay_rank"] = salary_index.pay_rank(row.get("location"), row.get("country_code"))
+        yield row
+
+
+STAGES: Dict[str, Stage] = {
+    "normalize": normalize,
+    "dedupe": dedupe,
+    "hash": hash_rows,
+    "diff": diff,
+    "describe": describe,
+    "parse": parse,
+    "rank": rank,
+}
+DEFAULT_STAGES: Tuple[str, ...] = ("normalize", "dedupe", "hash", "diff", "describe", "parse", "rank")
+
+
+# Stages that are a pure function of one row. Consecutive ones can run in worker processes.
+ROW_TRANSFORMS: Dict[str, Callable[[Dict], Dict]] = {
+    "describe": describe_row,
+    "parse": parse_row,
+}
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _transform_chunk(names: Tuple[str, ...], rows: List[Dict]) -> List[Dict]:
+    """Worker entry point: apply the named row transforms to a chunk, in order."""
+    funcs = [ROW_TRANSFORMS[name] for name in names]
+    for row in rows:
+        for func in funcs:
+            func(row)
+    return rows
+
+
+def parallel_stage(names: Sequence[str], workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Stage:
+    """Fuse row transforms into one stage that runs chunks of rows on a process pool.
+
+    Output keeps input order. At most ``2 * workers`` chunks are in flight, so memory
+    stays bounded however large the input is.
+    """
+    names = tuple(names)
+    chunk_size = max(1, int(chunk_size))
+
+    def stage(rows: Iterable[Dict], ctx: IngestContext) -> Iterator[Dict]:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in _batches(rows, chunk_size):
+                pending.append(pool.submit(_transform_chunk, names, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    return stage
+
+
+def resolve_stages(
+    names: Optional[Iterable[str]] = None,
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Tuple[str, Stage]]:
+    """Look up stages by name; with ``workers > 1`` runs of ROW_TRANSFORMS share a process pool."""
+    names = list(DEFAULT_STAGES if names is None else names)
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown ingest stages: {', '.join(unknown)}")
+    if workers <= 1:
+        return [(name, STAGES[name]) for name in names]
+    resolved: List[Tuple[str, Stage]] = []
+    run: List[str] = []
+    for name in names + [None]:
+        if name in ROW_TRANSFORMS:
+            run.append(name)
+            continue
+        if run:
+            resolved.append(("+".join(run), parallel_stage(run, workers, chunk_size)))
+            run = []
+        if name is not None:
+            resolved.append((name, STAGES[name]))
+    return resolved
+
+
+# ------------------------- Pipeline ------------------------------------------
+
+class _Meter:
+    """Iterator wrapper counting rows and the time spent producing them (upstream included)."""
+
+    def __init__(self, iterable: Iterable[Dict]):
+        self._it = iter(iterable)
+        self.rows = 0
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Dict:
+        started = time.perf_counter()
+        try:
+            row = next(self._it)
+        finally:
+            self.seconds += time.perf_counter() - started
+        self.rows += 1
+        return row
+
+
+class IngestPipeline:
+    """Read -> stages -> batched ``Job.bulk_upsert``, streamed end to end.
+
+    Every stage is a generator over the previous one, so at most one write batch of
+    rows is held in memory. Links that already exist are updated when their content
+    changed. ``run`` returns the write counts and, per stage, the rows it emitted and
+    the time spent inside it (its upstream excluded).
+
+    With ``full_reload`` the rows replace Jobs outright through ``Job.reload`` (a
+    Postgres blue/green table swap); links missing from the input are removed.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[Sequence[Tuple[str, Stage]]] = None,
+        *,
+        batch_size: Optional[int] = None,
+        update_existing: bool = True,
+        full_reload: bool = False,
+    ):
+        self.stages = list(resolve_stages() if stages is None else stages)
+        if full_reload and any(name == "diff" for name, _stage in self.stages):
+            # diff queries Jobs per batch, on the connection the reload is streaming COPY on.
+            raise ValueError("The diff stage cannot run in a full reload")
+        self.batch_size = max(1, int(batch_size or Job.BULK_BATCH_SIZE))
+        self.update_existing = update_existing
+        self.full_reload = full_reload
+
+    def run(self, rows: Iterable[Dict], db=None) -> Dict:
+        ctx = IngestContext(db or get_db(), batch_size=self.batch_size)
+        started = time.perf_counter()
+        meters = [("read", _Meter(rows))]
+        for name, stage in self.stages:
+            meters.append((name, _Meter(stage(meters[-1][1], ctx))))
+
+        totals = {"inserted": 0, "updated": 0, "skipped": 0}
+        if self.full_reload:
+            totals.update(Job.reload(meters[-1][1], db=ctx.db))
+        else:
+            for batch in _batches(meters[-1][1], self.batch_size):
+                result = Job.bulk_upsert(batch, update_existing=self.update_existing, db=ctx.db, notify=False)
+                for key in totals:
+                    totals[key] += result[key]
+                logger.debug("ingest: wrote batch of %s rows (%s)", len(batch), result)
+            # One change notification per load, not per batch.
+            if totals["inserted"] or totals["updated"]:
+                bump_jobs_generation(ctx.db)
+        elapsed = time.perf_counter() - started
+
+        report_stages = []
+        upstream = 0.0
+        for name, meter in meters:
+            report_stages.append({"stage": name, "rows": meter.rows, "seconds": meter.seconds - upstream})
+            upstream = meter.seconds
+        report_stages.append(
+            {"stage": "write", "rows": meters[-1][1].rows, "seconds": max(elapsed - upstream, 0.0)}
+        )
+        report = {
+            "read": meters[0][1].rows,
+            "inserted": totals["inserted"],
+            "updated": totals["updated"],
+            "unchanged": totals["skipped"] + ctx.counters.get("unchanged", 0),
+            "duplicates": ctx.counters.get("duplicates", 0),
+            "rejected": ctx.counters.get("rejected", 0),
+            "seconds": elapsed,
+            "stages": report_stages,
+        }
+        if "removed" in totals:
+            report["removed"] = totals["removed"]
+        return report
+
+
+def ingest_file(
+    path,
+    db=None,
+    *,
+    fmt: Optional[str] = None,
+    stages: Optional[Iterable[str]] = None,
+    batch_size: Optional[int] = None,
+    update_existing: bool = True,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    full_reload: bool = False,
+) -> Dict:
+    """Ingest one export file (TSV/CSV or JSON) into Jobs and return the run report.
+
+    ``workers > 1`` runs the per-row CPU work (describe, parse) on that many processes.
+    ``full_reload`` replaces every job with the file's rows (Postgres only); the
+    ``diff`` stage is skipped since unchanged rows must still be loaded.
+    """
+    reader = reader_for(path, fmt)
+    if full_reload:
+        stages = [name for name in (DEFAULT_STAGES if stages is None else stages) if name != "diff"]
+    resolved = resolve_stages(stages, workers=workers, chunk_size=chunk_size)
+    pipeline = IngestPipeline(
+        resolved, batch_size=batch_size, update_existing=update_existing, full_reload=full_reload
+    )
+    return pipeline.run(reader(path), db)
+
+
+def format_report(report: Dict) -> List[str]:
+    """Render a run report as aligned text lines (one per stage)."""
+    lines = [
+        f"read {report['read']} rows: +{report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['unchanged']} unchanged, {report['duplicates']} duplicates, {report['rejected']} without link "
+        f"in {report['seconds']:.2f}s"
+    ]
+    if "removed" in report:
+        lines[0] += f" ({report['removed']} removed by full reload)"
+    for st in report["stages"]:
+        rate = st["rows"] / st["seconds"] if st["seconds"] > 0 else 0.0
+        lines.append(f"  {st['stage']:<14} {st['rows']:>9} rows {st['seconds']:>8.3f}s {rate:>12,.0f} rows/s")
+    return lines
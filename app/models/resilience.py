@@ -0,0 +1,300 @@
+# app/models/resilience.py - Circuit breaker, last-known-good results and admission control for searches
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Optional, Set, Tuple
+
+from .db import (
+    ADMISSION_LOCK_DIR,
+    ADMISSION_MAX_INFLIGHT,
+    DB_BREAKER_FAILURES,
+    DB_BREAKER_RESET_SECONDS,
+    SEARCH_LKG_MAX_AGE_SECONDS,
+    SEARCH_LKG_SIZE,
+    DeadlineExceeded,
+    deadline_remaining_ms,
+    logger,
+)
+
+try:
+    import psycopg  # psycopg v3
+except Exception:
+    psycopg = None  # optional, only required when SUPABASE_URL is set
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: admission is counted per worker
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the database while the breaker is open."""
+
+
+# SQLite errors that mean the file itself is unusable rather than the query being wrong.
+_SQLITE_DATABASE_ERRORS = ("unable to open database", "disk i/o error", "database is locked")
+# A statement_timeout cancel this close to the request deadline was set from the deadline.
+_DEADLINE_SLACK_MS = 50
+
+
+def _is_database_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the database is unwell: a connection error or server-side timeout.
+
+    Running out of the request's own budget (DeadlineExceeded before a query is sent, SQLite's
+    progress handler interrupting one, or a Postgres cancel by the statement_timeout derived
+    from it) and errors in the query itself (no such table/column, syntax) do not count.
+    """
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return any(text in message for text in _SQLITE_DATABASE_ERRORS)
+    if psycopg is None:
+        return False
+    if isinstance(exc, psycopg.errors.QueryCanceled):
+        remaining = deadline_remaining_ms()
+        return remaining is None or remaining > _DEADLINE_SLACK_MS
+    # OperationalError covers lost connections and server-side errors; query mistakes are
+    # ProgrammingError.
+    return isinstance(exc, (psycopg.OperationalError, psycopg.InterfaceError))
+
+
+class Overloaded(RuntimeError):
+    """The request was shed; answer 503 with ``Retry-After``."""
+
+    retry_after = 1
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed: calls go through; ``failure_threshold`` failures in a row open it. Open: calls
+    are refused for ``reset_seconds``. Half-open: up to ``half_open_probes`` calls at a time
+    probe the database; a success closes the breaker, a failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DB_BREAKER_FAILURES,
+        reset_seconds: float = DB_BREAKER_RESET_SECONDS,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the database now (half-open: claims a probe slot)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state, self._probes = self.HALF_OPEN, 0
+            if self._probes >= self.half_open_probes:
+                return False
+            self._probes += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self._state, self._failures, self._probes = self.CLOSED, 0, 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Circuit %s open after %s failures", self.name, self._failures)
+                self._state, self._opened_at, self._probes = self.OPEN, self._clock(), 0
+
+    def release(self) -> None:
+        """Give back a half-open probe slot whose call said nothing about the database."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+
+class LastKnownGood:
+    """Bounded LRU of the last successful result per key, served when the live call fails."""
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_LKG_SIZE,
+        max_age_seconds: float = SEARCH_LKG_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._clock() - stored_at > self.max_age_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+
+class GuardedReads:
+    """Run reads through a breaker, falling back to their last known good result.
+
+    ``call(key, fn)`` returns ``(value, stale)``. ``stale`` is True when the value came from
+    the cache because the breaker was open or ``fn`` failed; with nothing cached the
+    original error (or CircuitOpenError) is raised. Only connection errors and server-side
+    timeouts count as breaker failures; any other outcome just gives back the call's
+    half-open probe slot.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, cache: LastKnownGood):
+        self.breaker = breaker
+        self.cache = cache
+
+    def call(self, key: Hashable, fn: Callable[[], object]) -> Tuple[object, bool]:
+        if not self.breaker.allow():
+            return self._fallback(key, CircuitOpenError(f"circuit {self.breaker.name} is open"))
+        settled = False
+        try:
+            value = fn()
+            self.breaker.record_success()
+            settled = True
+        except Exception as exc:
+            if _is_database_failure(exc):
+                self.breaker.record_failure()
+                settled = True
+            return self._fallback(key, exc)
+        finally:
+            if not settled:
+                self.breaker.release()
+        self.cache.put(key, value)
+        return value, False
+
+    def _fallback(self, key: Hashable, exc: Exception) -> Tuple[object, bool]:
+        cached = self.cache.get(key)
+        if cached is None:
+            raise exc
+        return cached, True
+
+
+class AdmissionController:
+    """In-flight limit for searches, shared by the workers of a host.
+
+    ``slot(expensive)`` yields ``ADMIT``, ``DOWNGRADE`` or ``SHED``. Below ``max_inflight``
+    searches everything is admitted. Up to twice that, cheap requests are admitted and
+    expensive ones are downgraded (run smaller, or answered from cache). Beyond that,
+    everything is shed. The slot counts as in flight until the block exits.
+
+    With ``lock_dir`` each search holds an exclusive ``flock`` on one of ``2 * max_inflight``
+    slot files there, taking the lowest free one, so the slot number is how many searches
+    the host already runs; locks die with their process. Without it (or without fcntl) the
+    count is per worker, which only ever exceeds one with threaded workers.
+    """
+
+    ADMIT, DOWNGRADE, SHED = "admit", "downgrade", "shed"
+
+    def __init__(self, max_inflight: int = ADMISSION_MAX_INFLIGHT, lock_dir: Optional[str] = None):
+        self.max_inflight = max(1, max_inflight)
+        self.lock_dir = lock_dir if lock_dir and fcntl is not None else None
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self._fds: Dict[int, int] = {}
+        self._held: Set[int] = set()
+        self._pid: Optional[int] = None
+
+    def _slot_fd(self, number: int) -> int:
+        if self._pid != os.getpid():
+            # Inherited descriptors share their locks with the parent; open our own.
+            self._fds, self._held, self._pid = {}, set(), os.getpid()
+        fd = self._fds.get(number)
+        if fd is None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            path = os.path.join(self.lock_dir, f"search-{number}.lock")
+            fd = self._fds[number] = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        return fd
+
+    def _claim(self) -> Optional[int]:
+        """Lock the lowest free slot file; None when all are taken."""
+        for number in range(2 * self.max_inflight):
+            if number in self._held:
+                continue
+            try:
+                fcntl.flock(self._slot_fd(number), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            self._held.add(number)
+            return number
+        return None
+
+    @contextmanager
+    def slot(self, expensive: bool) -> Iterator[str]:
+        claimed: Optional[int] = None
+        with self._lock:
+            busy = self.inflight
+            if self.lock_dir is not None:
+                try:
+                    claimed = self._claim()
+                    busy = 2 * self.max_inflight if claimed is None else claimed
+                except OSError as exc:
+                    logger.warning("Admission lock dir %s unusable (%s); counting per worker", self.lock_dir, exc)
+                    self.lock_dir = None
+            if busy < self.max_inflight:
+                verdict = self.ADMIT
+            elif busy < 2 * self.max_inflight:
+                verdict = self.DOWNGRADE if expensive else self.ADMIT
+            else:
+                verdict = self.SHED
+            self.inflight += 1
+        try:
+            yield verdict
+        finally:
+            with self._lock:
+                self.inflight -= 1
+                if claimed is not None and claimed in self._held:
+                    self._held.discard(claimed)
+                    fcntl.flock(self._fds[claimed], fcntl.LOCK_UN)
+
+
+# Shared by the search endpoints of this worker (admission: of every worker on the host).
+search_reads = GuardedReads(CircuitBreaker("db-search"), LastKnownGood())
+search_admission = AdmissionController(lock_dir=ADMISSION_LOCK_DIR or None)
@@ -0,0 +1,253 @@
+# app/models/salary.py - In-memory salary reference index built from the salary/regions tables
+
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .db import (
+    SALARY_REFERENCE_REFRESH_SECONDS,
+    _now_iso,
+    bump_jobs_generation,
+    get_db,
+    is_sqlite_connection,
+    location_country_code,
+    logger,
+    normalize_country,
+)
+from .resilience import CircuitBreaker, search_reads
+
+# (city, country, median, min, currency) per reference table; city is empty for country rows.
+_SOURCES: Tuple[Tuple[str, str], ...] = (
+    ("regions", "SELECT location, country, med_sal, min_sal, curr FROM regions"),
+    ("salary", "SELECT City, Country, MedianSalary, MinSalary, CurrencyTicker FROM salary"),
+)
+_LOCATION_SPLIT = re.compile(r"[,/()|]")
+# Approximate USD per unit, only used to put regional medians on one scale for pay_rank.
+USD_PER_UNIT: Dict[str, float] = {
+    "USD": 1.0, "EUR": 1.08, "GBP": 1.27, "CHF": 1.12, "CAD": 0.73, "AUD": 0.66,
+    "SEK": 0.095, "NOK": 0.093, "DKK": 0.145, "PLN": 0.25, "CZK": 0.043, "HUF": 0.0027,
+}
+
+
+def _to_int(value) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _country_key(value: str) -> str:
+    return normalize_country(value or "").strip().upper()
+
+
+class SalaryIndex:
+    """Salary bands keyed by (city, country), city alone and country, held in memory.
+
+    ``refresh`` checks a change marker of the reference tables at most every
+    ``refresh_seconds`` and re-reads them only when it moved, so lookups never query the
+    database and a quiet check is one small query. On Postgres the marker is the tables'
+    insert/update/delete counters; on SQLite it is row count and max rowid, so an in-place
+    UPDATE there is only picked up by a forced refresh (``rank-jobs``) or a restart.
+    Countries without an explicit row fall back to their middle city by median.
+    """
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._marker: Optional[tuple] = None
+        self._maps: Tuple[Dict, Dict, Dict] = ({}, {}, {})
+
+    def __len__(self) -> int:
+        return len(self._maps[0]) + len(self._maps[2])
+
+    def _load_rows(self, db) -> List[tuple]:
+        rows: List[tuple] = []
+        for table, sql in _SOURCES:
+            cur = db.cursor()
+            try:
+                if not is_sqlite_connection(db):
+                    # A failed SELECT would abort the caller's transaction (e.g. a migration).
+                    cur.execute("SELECT to_regclass(%s)", (table,))
+                    if cur.fetchone()[0] is None:
+                        continue
+                cur.execute(sql)
+                rows.extend((table,) + tuple(row) for row in cur.fetchall())
+            except Exception as exc:
+                # Reference tables are optional (fresh dev databases do not have them).
+                logger.debug("Salary reference table %s unavailable: %s", table, exc)
+            finally:
+                cur.close()
+        return rows
+
+    @staticmethod
+    def _change_marker(db) -> tuple:
+        tables = [table for table, _sql in _SOURCES]
+        cur = db.cursor()
+        try:
+            if not is_sqlite_connection(db):
+                cur.execute(
+                    "SELECT relname, n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables "
+                    "WHERE relname = ANY(%s) ORDER BY relname",
+                    (tables,),
+                )
+                return tuple(tuple(row) for row in cur.fetchall())
+            marker = []
+            for table in tables:
+                try:
+                    cur.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table}")
+                    marker.append((table,) + tuple(cur.fetchone()))
+                except Exception:
+                    marker.append((table, None, None))
+            return tuple(marker)
+        finally:
+            cur.close()
+
+    def refresh(self, db=None, force: bool = False) -> bool:
+        """Reload when the reference tables changed; return True if the maps were rebuilt.
+
+        ``db`` defaults to get_db(), which is only called once a check is due.
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self._refresh_seconds:
+            return False
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self._refresh_seconds:
+                return False
+            # A check that fails (e.g. cannot connect) waits out refresh_seconds too.
+            self._checked_at = time.monotonic()
+            db = db or get_db()
+            try:
+                marker = self._change_marker(db)
+            except Exception as exc:
+                logger.debug("Salary reference change marker unavailable: %s", exc)
+                marker = None
+            if not force and marker is not None and marker == self._marker:
+                self._checked_at = time.monotonic()
+                return False
+            rows = self._load_rows(db)
+            self._checked_at = time.monotonic()
+            self._maps = self._build(rows)
+            self._marker = marker
+            logger.info("Loaded salary reference index (%s rows)", len(rows))
+            return True
+
+    @staticmethod
+    def _build(rows: Iterable[tuple]) -> Tuple[Dict, Dict, Dict]:
+        by_city: Dict[Tuple[str, str], Dict] = {}
+        by_city_any: Dict[str, Dict] = {}
+        by_country: Dict[str, Dict] = {}
+        city_bands: Dict[str, List[Dict]] = {}
+        for _table, city, country, median, minimum, currency in rows:
+            country_key = _country_key(country)
+            if not country_key:
+                continue
+            city_key = (city or "").strip().lower()
+            band = {
+                "median": _to_int(median),
+                "min": _to_int(minimum),
+                "currency": (currency or "").strip().upper() or "USD",
+                "label": (city or country or "").strip(),
+            }
+            if city_key:
+                # regions is read first, so its city rows win over salary duplicates.
+                by_city.setdefault((city_key, country_key), band)
+                by_city_any.setdefault(city_key, band)
+                city_bands.setdefault(country_key, []).append(band)
+            else:
+                by_country.setdefault(country_key, band)
+        for country_key, bands in city_bands.items():
+            if country_key not in by_country:
+                ranked = sorted(bands, key=lambda b: b["median"] or 0)
+                by_country[country_key] = dict(ranked[len(ranked) // 2], label=country_key)
+        return by_city, by_city_any, by_country
+
+    def lookup(self, location: Optional[str], country_code: Optional[str] = None) -> Optional[Dict]:
+        """Return the reference band for a job location, or None when nothing matches."""
+        by_city, by_city_any, by_country = self._maps
+        text = (location or "").strip().lower()
+        country = (country_code or location_country_code(text) or "").upper()
+        candidates = [text] + [p.strip() for p in _LOCATION_SPLIT.split(text) if p.strip()]
+        for candidate in candidates:
+            band = by_city.get((candidate, country)) if country else by_city_any.get(candidate)
+            if band:
+                return dict(band, match="city")
+        band = by_country.get(country) if country else None
+        return dict(band, match="country") if band else None
+
+    def pay_rank(self, location: Optional[str], country_code: Optional[str] = None) -> Optional[int]:
+        """Regional median in thousands of USD for city-level matches, else None.
+
+        Country-wide fallbacks are not ranked so HIGH_PAY stays limited to actual hubs.
+        """
+        band = self.lookup(location, country_code)
+        if not band or band["match"] != "city" or not band["median"]:
+            return None
+        rate = USD_PER_UNIT.get(band["currency"])
+        return int(round(band["median"] * rate / 1000)) if rate else None
+
+
+salary_index = SalaryIndex(SALARY_REFERENCE_REFRESH_SECONDS)
+
+
+def rank_jobs(db=None, batch_size: int = 1000, *, commit: bool = True) -> int:
+    """Recompute pay_rank for every job (after the reference tables changed); return rows changed.
+
+    Jobs are read in id order ``batch_size`` at a time, each batch's changes written (and,
+    with ``commit``, committed) before the next is read. ``commit=False`` leaves the
+    transaction and the change notification to the caller (the backfill migration).
+    """
+    db = db or get_db()
+    salary_index.refresh(db, force=True)
+    batch_size = max(1, int(batch_size))
+    # updated_at moves too, so the job store (app/models/store.py) picks the change up.
+    updated_at = _now_iso()
+    changed = 0
+    last_id = 0
+    cur = db.cursor()
+    try:
+        while True:
+            cur.execute(
+                "SELECT id, location, country_code, pay_rank FROM Jobs WHERE id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            changes = []
+            for job_id, location, country_code, current in rows:
+                rank = salary_index.pay_rank(location, country_code)
+                if rank != current:
+                    changes.append((rank, updated_at, job_id))
+            if changes:
+                cur.executemany("UPDATE Jobs SET pay_rank = %s, updated_at = %s WHERE id = %s", changes)
+                changed += len(changes)
+                if commit:
+                    db.commit()
+    finally:
+        cur.close()
+    if changed:
+        if commit:
+            bump_jobs_generation(db)
+        logger.info("Updated pay_rank for %s jobs", changed)
+    return changed
+
+
+def enrich_salary_reference(rows: List[Dict], db=None) -> List[Dict]:
+    """Attach ``salary_reference`` (a band or None) to each job row, in place.
+
+    The index is refreshed only while the search breaker is closed, so an unreachable
+    database is not dialled once per search on top of the failed searches.
+    """
+    if search_reads.breaker.state == CircuitBreaker.CLOSED:
+        try:
+            salary_index.refresh(db)
+        except Exception as exc:
+            logger.debug("Salary reference refresh failed: %s", exc)
+    for row in rows:
+        row["salary_reference"] = salary_index.lookup(row.get("location"), row.get("country_code"))
+    return rows
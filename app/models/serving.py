@@ -0,0 +1,73 @@
+# app/models/serving.py - Build the read-only SQLite serving database for job reads
+
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from .db import Job, _SQLiteConnection, get_db, logger, migrate_db, stream_query
+
+# All Jobs columns, so the serving copy can answer any job read.
+SERVING_COLUMNS = ("id",) + Job.WRITE_COLUMNS
+
+
+def _sqlite_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def build_serving_db(path: str, db=None, batch_size: int = 5000) -> Dict:
+    """Copy Jobs into a fresh SQLite file and publish it at ``path`` by atomic rename.
+
+    The copy is built beside the target with the app's own schema (``migrate_db``), then
+    analyzed and renamed over the previous version. Workers open it with
+    ``mode=ro&immutable=1`` (see ``get_read_db``) and switch on their next request.
+    Returns ``{"version", "jobs", "path"}``.
+    """
+    started = time.perf_counter()
+    source = db or get_db()
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    version = str(time.time_ns())
+    conn = sqlite3.connect(tmp, factory=_SQLiteConnection)
+    try:
+        migrate_db(conn)
+        conn.execute("PRAGMA synchronous = OFF")
+        insert = (
+            f"INSERT INTO Jobs ({', '.join(SERVING_COLUMNS)}) "
+            f"VALUES ({', '.join(['?'] * len(SERVING_COLUMNS))})"
+        )
+        copied = 0
+        batch: List[tuple] = []
+        for row in stream_query(source, f"SELECT {', '.join(SERVING_COLUMNS)} FROM Jobs"):
+            batch.append(tuple(_sqlite_value(v) for v in row))
+            if len(batch) >= batch_size:
+                conn.executemany(insert, batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(insert, batch)
+            copied += len(batch)
+        conn.execute("CREATE TABLE serving_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany(
+            "INSERT INTO serving_meta (key, value) VALUES (?, ?)",
+            [("version", version), ("jobs", str(copied)), ("built_at", datetime.now().astimezone().isoformat())],
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    conn.close()
+    with open(tmp, "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, target)
+    logger.info("Published serving database %s (version %s, %s jobs) in %.2fs",
+                target, version, copied, time.perf_counter() - started)
+    return {"version": version, "jobs": copied, "path": str(target)}
+
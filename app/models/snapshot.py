@@ -0,0 +1,291 @@
+# app/models/snapshot.py - Versioned, memory-mapped job search snapshot shared by all workers
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .db import JOB_SNAPSHOT_CHECK_SECONDS, get_db, logger
+from .store import JobStore, _Columns, _View
+
+SNAPSHOT_MAGIC = b"CATJOBS\x00"
+SNAPSHOT_FORMAT = 1
+# File layout: 8-byte aligned sections, then a JSON header describing them, then this
+# trailer (header length + magic) so the header can be written last in one pass.
+_TRAILER = struct.Struct("<Q8s")
+_STRING_COLUMNS: Tuple[str, ...] = ("titles", "descriptions", "links", "norms", "job_dates", "dates", "updated")
+
+
+# ------------------------- Writing -------------------------------------------
+
+class _SectionWriter:
+    def __init__(self, fh):
+        self._fh = fh
+        self._offset = 0
+        self.sections: Dict[str, list] = {}
+
+    def add(self, name: str, chunks: Iterable[bytes], typecode: str = "B") -> None:
+        pad = -self._offset % 8
+        if pad:
+            self._fh.write(b"\x00" * pad)
+            self._offset += pad
+        start = self._offset
+        for chunk in chunks:
+            self._fh.write(chunk)
+            self._offset += len(chunk)
+        self.sections[name] = [start, self._offset - start, typecode]
+
+    def add_array(self, name: str, values: array) -> None:
+        self.add(name, [values.tobytes()], values.typecode)
+
+    def add_strings(self, name: str, values: Iterable, encode: Callable = str) -> None:
+        """A string column: UTF-8 data, n+1 offsets and a NULL flag per value."""
+        offsets = array("Q", [0])
+        nulls = bytearray()
+
+        def chunks() -> Iterator[bytes]:
+            total = 0
+            for value in values:
+                nulls.append(value is None)
+                if value is not None:
+                    data = encode(value).encode("utf-8")
+                    total += len(data)
+                    yield data
+                offsets.append(total)
+
+        self.add(f"{name}.data", chunks())
+        self.add_array(f"{name}.offsets", offsets)
+        self.add(f"{name}.nulls", [bytes(nulls)])
+
+
+def _as_text(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _kind(values: Iterable) -> str:
+    """"int", "datetime" or "text": how a column's values are restored when read back."""
+    kinds = {type(v) for v in values if v is not None}
+    if kinds and kinds <= {int}:
+        return "int"
+    if kinds and all(issubclass(k, datetime) for k in kinds):
+        return "datetime"
+    return "text"
+
+
+def write_snapshot(path: str, db=None) -> Dict:
+    """Build the search snapshot for the current Jobs table and publish it at ``path``.
+
+    The file is written next to ``path`` and renamed over it, so readers either see the
+    previous complete snapshot or the new one. Returns the header (``version`` is a
+    nanosecond timestamp workers compare to notice the swap).
+    """
+    started = time.perf_counter()
+    columns = JobStore.load_columns(db or get_db())
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    kinds = {"ids": _kind(columns.ids), "dates": _kind(columns.dates), "updated": _kind(columns.updated)}
+    postings = columns.view.postings
+    vocabulary = sorted(postings)
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": time.time_ns(),
+        "count": len(columns),
+        "byteorder": sys.byteorder,
+        "kinds": kinds,
+    }
+    try:
+        with open(tmp, "wb") as fh:
+            writer = _SectionWriter(fh)
+            if kinds["ids"] == "int":
+                writer.add_array("ids", array("q", columns.ids))
+            else:
+                writer.add_strings("ids", columns.ids, _as_text)
+            for name in _STRING_COLUMNS:
+                writer.add_strings(name, getattr(columns, name), _as_text)
+            writer.add_strings("locations", columns.locations)
+            writer.add_array("location_ids", columns.location_ids)
+            writer.add_array("date_keys", columns.date_keys)
+            writer.add_array("pay_ranks", columns.pay_ranks)
+            writer.add_array("by_date", columns.view.by_date)
+            writer.add_array("by_pay", columns.view.by_pay)
+            writer.add_strings("vocabulary", vocabulary)
+            bounds = array("Q", [0])
+            for token in vocabulary:
+                bounds.append(bounds[-1] + len(postings[token]))
+            writer.add("postings", (postings[token].tobytes() for token in vocabulary), "I")
+            writer.add_array("postings.offsets", bounds)
+            header["sections"] = writer.sections
+            payload = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            fh.write(payload)
+            fh.write(_TRAILER.pack(len(payload), SNAPSHOT_MAGIC))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    logger.info(
+        "Wrote job snapshot %s (%s jobs, %s bytes) in %.2fs",
+        target, len(columns), target.stat().st_size, time.perf_counter() - started,
+    )
+    header.pop("sections")
+    return header
+
+
+# ------------------------- Reading -------------------------------------------
+
+class _StringColumn:
+    """Read-only view of a string column; values are decoded on access."""
+
+    __slots__ = ("_data", "_offsets", "_nulls", "_restore")
+
+    def __init__(self, data: memoryview, offsets: memoryview, nulls: memoryview, restore: Optional[Callable] = None):
+        self._data = data
+        self._offsets = offsets
+        self._nulls = nulls
+        self._restore = restore
+
+    def __len__(self) -> int:
+        return len(self._nulls)
+
+    def __getitem__(self, index: int):
+        if self._nulls[index]:
+            return None
+        text = str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+        return self._restore(text) if self._restore else text
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class _MappedPostings:
+    """token -> positions, read straight from the mapping (``items`` is all the store uses)."""
+
+    def __init__(self, vocabulary: _StringColumn, offsets: memoryview, postings: memoryview):
+        self._vocabulary = vocabulary
+        self._offsets = offsets
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    def items(self):
+        for i, token in enumerate(self._vocabulary):
+            yield token, self._postings[self._offsets[i]:self._offsets[i + 1]]
+
+
+class _AllLive:
+    """A snapshot has no superseded rows."""
+
+    def __getitem__(self, index: int) -> int:
+        return 1
+
+
+class _MappedColumns(_Columns):
+    """The store's columns backed by a read-only mapping of a snapshot file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        size, magic = _TRAILER.unpack_from(buf, len(buf) - _TRAILER.size)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a job snapshot")
+        end = len(buf) - _TRAILER.size
+        self.header = json.loads(bytes(buf[end - size:end]))
+        if self.header["format"] != SNAPSHOT_FORMAT or self.header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path}: unsupported snapshot format")
+        sections = self.header["sections"]
+        kinds = self.header["kinds"]
+
+        def section(name: str) -> memoryview:
+            start, length, typecode = sections[name]
+            return buf[start:start + length].cast(typecode)
+
+        def strings(name: str, kind: str = "text") -> _StringColumn:
+            restore = datetime.fromisoformat if kind == "datetime" else None
+            return _StringColumn(section(f"{name}.data"), section(f"{name}.offsets"), section(f"{name}.nulls"), restore)
+
+        self.ids = section("ids") if kinds["ids"] == "int" else strings("ids")
+        self.titles = strings("titles")
+        self.descriptions = strings("descriptions")
+        self.links = strings("links")
+        self.norms = strings("norms")
+        self.job_dates = strings("job_dates")
+        self.dates = strings("dates", kinds["dates"])
+        self.updated = strings("updated", kinds["updated"])
+        self.locations = strings("locations")
+        self.location_ids = section("location_ids")
+        self.date_keys = section("date_keys")
+        self.pay_ranks = section("pay_ranks")
+        postings = _MappedPostings(strings("vocabulary"), section("postings.offsets"), section("postings"))
+        self.view = _View(_AllLive(), section("by_date"), section("by_pay"), postings)
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def append(self, row):
+        raise TypeError("job snapshots are read-only")
+
+
+class SnapshotStore(JobStore):
+    """JobStore answering from a snapshot file mapped read-only.
+
+    Every worker maps the same file, so the data lives once in the page cache and a worker
+    starts serving without loading anything. ``refresh`` stats the file (at most every
+    ``check_seconds``) and maps the new one when ``write_snapshot`` renamed a snapshot with
+    a different version over it; the previous mapping stays valid for queries in flight.
+    Matching a query word decodes the whole mapped vocabulary, so the matched positions are
+    kept per mapping in an LRU of ``word_cache_size`` words.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        check_seconds: float = JOB_SNAPSHOT_CHECK_SECONDS,
+        cache_size: int = 256,
+        word_cache_size: int = 1024,
+    ):
+        super().__init__(refresh_seconds=check_seconds, cache_size=cache_size, word_cache_size=word_cache_size)
+        self.path = path
+        self.version: Optional[int] = None
+        self._file_key: Optional[tuple] = None
+
+    def refresh(self, db=None, force: bool = False, background: bool = False) -> int:
+        """Map a newly published snapshot; return its job count, or 0 when unchanged.
+
+        Mapping is cheap, so it always happens inline (``background`` is ignored).
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self._refresh_seconds:
+            return 0
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self._refresh_seconds:
+                return 0
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self._columns is None:
+                    raise
+                logger.warning("Job snapshot %s disappeared; serving version %s", self.path, self.version)
+                self._checked_at = time.monotonic()
+                return 0
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            loaded = 0
+            if key != self._file_key:
+                columns = _MappedColumns(self.path)
+                if columns.header["version"] != self.version:
+                    self._columns = columns
+                    self.version = columns.header["version"]
+                    loaded = len(columns)
+                    logger.info("Mapped job snapshot %s version %s (%s jobs)", self.path, self.version, loaded)
+                self._file_key = key
+            self._checked_at = time.monotonic()
+            return loaded
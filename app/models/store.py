@@ -0,0 +1,519 @@
+# app/models/store.py - In-process columnar copy of Jobs that serves search/count without SQL
+
+import random
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .db import JOB_STORE_REFRESH_SECONDS, Job, logger, open_db, stream_query
+
+# Sort keys for NULL and for non-NULL dates that are not timestamps; both sort below
+# every real value, which is where DESC ... NULLS LAST puts them.
+_NULL = -(2 ** 63)
+_UNPARSED = _NULL + 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Query words shorter than this match too many vocabulary tokens to be worth pruning on.
+_MIN_PRUNE_WORD = 3
+_LOAD_COLUMNS: Tuple[str, ...] = Job.SEARCH_COLUMNS + ("updated_at",)
+_FETCH_SIZE = 5000
+# (row count, id sum), as app/models/sync.py compares copies: moves when a row is removed
+# even if as many were inserted.
+_CHECKSUM_SQL = "SELECT COUNT(1), COALESCE(SUM(id), 0) FROM Jobs"
+
+
+def _epoch_us(value) -> int:
+    """Return a timestamp (datetime or ISO text) as UTC epoch microseconds; naive is UTC."""
+    if value is None:
+        return _NULL
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            return _UNPARSED
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _like_segments(pattern: str) -> List[str]:
+    """Split a LIKE pattern (backslash escapes) into its literal runs between wildcards."""
+    segments, current, i = [], [], 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            current.append(pattern[i + 1])
+            i += 2
+            continue
+        if ch in "%_":
+            segments.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    segments.append("".join(current))
+    return segments
+
+
+def _like_matcher(pattern: str) -> Callable[[str], bool]:
+    """Compile a LIKE pattern into a predicate over already lowercased text."""
+    regex, i = [], 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        regex.append(".*" if ch == "%" else "." if ch == "_" else re.escape(ch))
+        i += 1
+    segments = _like_segments(pattern)
+    # '%literal%' (the common title/remote filters) is a plain substring test.
+    if len(segments) == 3 and regex[0] == regex[-1] == ".*" and not segments[0] and not segments[2]:
+        literal = segments[1]
+        return lambda text: literal in text
+    compiled = re.compile("".join(regex), re.S)
+    return lambda text: compiled.fullmatch(text) is not None
+
+
+def _value_check(likes: Sequence[str], equals: Optional[Sequence[str]]) -> Callable[[Optional[str]], bool]:
+    matchers = [_like_matcher(p) for p in likes]
+    exact = set(equals or ())
+
+    def check(value: Optional[str]) -> bool:
+        if value is None:
+            return False
+        text = value.lower()
+        return text in exact or any(match(text) for match in matchers)
+
+    return check
+
+
+def _lru_get(cache: OrderedDict, key):
+    value = cache.get(key)
+    if value is not None:
+        try:
+            cache.move_to_end(key)
+        except KeyError:  # evicted by another thread meanwhile
+            pass
+    return value
+
+
+def _lru_put(cache: OrderedDict, key, value, size: int) -> None:
+    cache[key] = value
+    while len(cache) > size:
+        try:
+            cache.popitem(last=False)
+        except KeyError:
+            break
+
+
+class _View:
+    """Live positions, their result orders and the postings, swapped in whole on every refresh.
+
+    Nothing reachable from a view is mutated once it is published: ``refresh`` builds the
+    next view's alive flags and postings beside it, so queries in flight keep a consistent
+    picture (the shared columns only grow past the positions an older view can reach).
+    """
+
+    __slots__ = ("alive", "by_date", "by_pay", "postings", "words", "results")
+
+    def __init__(self, alive: bytearray, by_date: array, by_pay: array, postings):
+        self.alive = alive
+        self.by_date = by_date
+        self.by_pay = by_pay
+        self.postings = postings
+        self.words: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self.results: "OrderedDict[tuple, List[int]]" = OrderedDict()
+
+
+class _Columns:
+    """Append-only parallel columns; a row's position indexes every column."""
+
+    def __init__(self):
+        self.ids: List = []
+        self.titles: List[Optional[str]] = []
+        self.descriptions: List[Optional[str]] = []
+        self.links: List[Optional[str]] = []
+        self.norms: List[Optional[str]] = []
+        self.job_dates: List = []
+        self.dates: List = []
+        self.updated: List = []
+        self.date_keys = array("q")
+        self.pay_ranks = array("q")
+        self.location_ids = array("I")
+        self.locations: List[Optional[str]] = []
+        self._location_index: Dict[Optional[str], int] = {}
+        self.positions: Dict = {}
+        self.watermark = None
+        self.id_sum = 0
+        self.view = _View(bytearray(), array("I"), array("I"), {})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(
+        self, row: Sequence, postings: Dict[str, array], copied: Optional[Set[str]] = None
+    ) -> Tuple[int, Optional[int]]:
+        """Store one row (in ``_LOAD_COLUMNS`` order); return (position, replaced position).
+
+        Its tokens are indexed into ``postings``. With ``copied`` (the tokens whose arrays
+        ``postings`` already owns) the other arrays are treated as shared with a published
+        view and copied before their first append.
+        """
+        job_id, title, description, link, norm, location, job_date, date, pay_rank, updated = row
+        pos = len(self.ids)
+        self.ids.append(job_id)
+        self.titles.append(title)
+        self.descriptions.append(description)
+        self.links.append(link)
+        self.norms.append(norm)
+        self.job_dates.append(job_date)
+        self.dates.append(date)
+        self.updated.append(updated)
+        self.date_keys.append(_epoch_us(date))
+        self.pay_ranks.append(_NULL if pay_rank is None else int(pay_rank))
+        loc_id = self._location_index.get(location)
+        if loc_id is None:
+            loc_id = self._location_index[location] = len(self.locations)
+            self.locations.append(location)
+        self.location_ids.append(loc_id)
+        text = " ".join(v for v in (title, norm, description, location) if v).lower()
+        for token in set(_TOKEN.findall(text)):
+            current = postings.get(token)
+            if current is None:
+                current = postings[token] = array("I")
+            elif copied is not None and token not in copied:
+                current = postings[token] = array("I", current)
+            if copied is not None:
+                copied.add(token)
+            current.append(pos)
+        if updated is not None and (self.watermark is None or updated > self.watermark):
+            self.watermark = updated
+        replaced = self.positions.get(job_id)
+        if replaced is None:
+            self.id_sum += job_id
+        self.positions[job_id] = pos
+        return pos, replaced
+
+    def date_key(self, pos: int):
+        return self.date_keys[pos], self.ids[pos]
+
+    def pay_key(self, pos: int):
+        return self.pay_ranks[pos], self.date_keys[pos], self.ids[pos]
+
+    def build_view(
+        self, alive: bytearray, postings, previous: Optional[_View] = None, added: Iterable[int] = ()
+    ) -> _View:
+        """Order the live positions; reuses ``previous`` orders so timsort sees long runs."""
+        if previous is None:
+            live = [pos for pos in range(len(alive)) if alive[pos]]
+            by_date, by_pay = live, live
+        else:
+            added = list(added)
+            by_date = [pos for pos in previous.by_date if alive[pos]] + added
+            by_pay = [pos for pos in previous.by_pay if alive[pos]] + added
+        return _View(
+            alive,
+            array("I", sorted(by_date, key=self.date_key, reverse=True)),
+            array("I", sorted(by_pay, key=self.pay_key, reverse=True)),
+            postings,
+        )
+
+    def field_getter(self, field: str) -> Callable[[int], Optional[str]]:
+        if field == "location":
+            return lambda pos: self.locations[self.location_ids[pos]]
+        column = {
+            "job_title": self.titles,
+            "job_title_norm": self.norms,
+            "job_description": self.descriptions,
+            "link": self.links,
+        }[field]
+        return column.__getitem__
+
+    def stored(self, pos: int) -> tuple:
+        """The row at ``pos`` as loaded, in ``_LOAD_COLUMNS`` order."""
+        pay_rank = self.pay_ranks[pos]
+        return (
+            self.ids[pos],
+            self.titles[pos],
+            self.descriptions[pos],
+            self.links[pos],
+            self.norms[pos],
+            self.locations[self.location_ids[pos]],
+            self.job_dates[pos],
+            self.dates[pos],
+            None if pay_rank == _NULL else pay_rank,
+            self.updated[pos],
+        )
+
+    def row(self, pos: int) -> Dict:
+        return dict(zip(Job.SEARCH_COLUMNS, self.stored(pos)))
+
+
+class JobStore:
+    """Columnar in-process copy of Jobs answering Job.search/count without SQL.
+
+    Jobs are held in parallel columns: dates as epoch microseconds and pay ranks in int64
+    arrays, locations interned, and postings from every title/description/location token
+    to row positions. Queries evaluate the same ``Job._filters`` spec as the SQL path:
+    postings prune the candidates, then each LIKE pattern is checked exactly, so results
+    match SQL row for row (dates order as timestamps, as on Postgres). ``refresh`` applies
+    rows whose ``updated_at`` reached the watermark and reloads in full when rows were
+    removed (archived) behind its back, which the (count, id sum) checksum shows.
+
+    Refreshes use a connection of their own, outside the request deadline. When a query
+    finds a full load due, the load runs on a background thread. Meanwhile queries use the
+    previous view, or return None (the caller falls back to SQL) before the first load
+    completes. Result lists (``cache_size``) and the positions
+    matched by each query word (``word_cache_size``) are kept per view in LRU caches.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = JOB_STORE_REFRESH_SECONDS,
+        cache_size: int = 256,
+        word_cache_size: int = 1024,
+    ):
+        self._refresh_seconds = refresh_seconds
+        self._cache_size = cache_size
+        self._word_cache_size = word_cache_size
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._columns: Optional[_Columns] = None
+        self._loading = False
+
+    def __len__(self) -> int:
+        columns = self._columns
+        return len(columns.view.by_date) if columns else 0
+
+    # ------------------------------------------------------------------ loading
+
+    @staticmethod
+    def _fetch(db, where: str = "", params: tuple = ()) -> Iterable[tuple]:
+        return stream_query(db, f"SELECT {', '.join(_LOAD_COLUMNS)} FROM Jobs {where}", params, _FETCH_SIZE)
+
+    @staticmethod
+    def _checksum(db) -> Tuple[int, int]:
+        # Through stream_query: a full scan, so not under the 800 ms statement budget.
+        count, total = list(stream_query(db, _CHECKSUM_SQL))[0]
+        return int(count), int(total)
+
+    @classmethod
+    def load_columns(cls, db) -> _Columns:
+        """Read every job into fresh columns with their views built."""
+        columns = _Columns()
+        postings: Dict[str, array] = {}
+        for row in cls._fetch(db):
+            columns.append(row, postings)
+        # A job id appears once, so every stored position is live.
+        columns.view = columns.build_view(bytearray(b"\x01" * len(columns)), postings)
+        return columns
+
+    def _load(self, db) -> int:
+        started = time.perf_counter()
+        columns = self.load_columns(db)
+        self._columns = columns
+        logger.info("Job store loaded %s jobs in %.2fs", len(columns), time.perf_counter() - started)
+        return len(columns)
+
+    def _apply_changes(self, db, columns: _Columns) -> int:
+        view = columns.view
+        alive = bytearray(view.alive)
+        # Queries keep reading view.postings; changed rows go into a copy that is
+        # published with the next view.
+        postings: Optional[Dict[str, array]] = None
+        copied: Set[str] = set()
+        added: List[int] = []
+        # >= so rows written in the watermark's own second are not missed; rows already
+        # stored as-is are skipped.
+        for row in self._fetch(db, "WHERE updated_at >= %s", (columns.watermark,)):
+            known = columns.positions.get(row[0])
+            if known is not None and columns.stored(known) == tuple(row):
+                continue
+            if postings is None:
+                postings = dict(view.postings)
+            pos, replaced = columns.append(row, postings, copied)
+            alive.append(1)
+            added.append(pos)
+            if replaced is not None:
+                alive[replaced] = 0
+        if added:
+            columns.view = columns.build_view(alive, postings, view, added)
+        return len(added)
+
+    def invalidate(self) -> None:
+        """Make the next ``refresh`` check for changes regardless of ``refresh_seconds``."""
+        self._checked_at = None
+
+    def _due(self) -> bool:
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= self._refresh_seconds
+
+    def _needs_load(self, db, columns: Optional[_Columns]) -> bool:
+        if columns is None or columns.watermark is None:
+            return True
+        live = len(columns.view.by_date)
+        # Mostly superseded rows: compact.
+        return (live, columns.id_sum) != self._checksum(db) or len(columns) > 2 * live + 1000
+
+    def refresh(self, db=None, force: bool = False, background: bool = False) -> int:
+        """Bring the store up to date (at most every ``refresh_seconds``); return rows applied.
+
+        ``db`` defaults to a connection opened for the refresh. With ``background`` a full
+        load is handed to a thread and 0 returned right away.
+        """
+        if not force and not self._due():
+            return 0
+        with self._lock:
+            if not force and not self._due():
+                return 0
+            own = db is None
+            db = db or open_db()
+            try:
+                columns = self._columns
+                applied = 0
+                if columns is not None and columns.watermark is not None:
+                    applied = self._apply_changes(db, columns)
+                if self._needs_load(db, columns):
+                    if background:
+                        self._load_in_background()
+                        self._checked_at = time.monotonic()
+                        return 0
+                    applied = self._load(db)
+                self._checked_at = time.monotonic()
+                return applied
+            finally:
+                if own:
+                    db.close()
+
+    def _load_in_background(self) -> None:
+        """Start a full load on its own thread and connection (caller holds the lock)."""
+        if self._loading:
+            return
+        self._loading = True
+        threading.Thread(target=self._background_load, name="job-store-load", daemon=True).start()
+
+    def _background_load(self) -> None:
+        try:
+            db = open_db()
+            try:
+                columns = self.load_columns(db)
+            finally:
+                db.close()
+            with self._lock:
+                self._columns = columns
+                self._checked_at = time.monotonic()
+            logger.info("Job store loaded %s jobs in the background", len(columns))
+        except Exception:
+            logger.exception("Job store load failed")
+        finally:
+            self._loading = False
+
+    def _serving(self) -> Optional[_Columns]:
+        """Columns queries read, refreshed first when due; None before the first load."""
+        self.refresh(background=True)
+        return self._columns
+
+    # ------------------------------------------------------------------ queries
+
+    def _word_positions(self, view: _View, word: str) -> Optional[Set[int]]:
+        """Positions whose tokens contain ``word``; None when it is too short to prune on."""
+        if len(word) < _MIN_PRUNE_WORD:
+            return None
+        positions = _lru_get(view.words, word)
+        if positions is None:
+            positions = set()
+            for token, postings in view.postings.items():
+                if word in token:
+                    positions.update(postings)
+            _lru_put(view.words, word, positions, self._word_cache_size)
+        return positions
+
+    def _candidates(self, columns: _Columns, view: _View, values: Iterable[str]) -> Optional[Set[int]]:
+        """Superset of the positions any of ``values`` (LIKE patterns) can match, or None."""
+        union: Set[int] = set()
+        for value in values:
+            narrowed: Optional[Set[int]] = None
+            for segment in _like_segments(value):
+                for word in _TOKEN.findall(segment):
+                    positions = self._word_positions(view, word)
+                    if positions is not None:
+                        narrowed = positions if narrowed is None else narrowed & positions
+            if narrowed is None:
+                return None
+            union |= narrowed
+        return union
+
+    def _matches(self, columns: _Columns, view: _View, title, country, pay_sort: bool) -> List[int]:
+        key = (title, country, pay_sort)
+        cached = _lru_get(view.results, key)
+        if cached is not None:
+            return cached
+
+        checks: List[Callable[[int], bool]] = []
+        candidates: Optional[Set[int]] = None
+        for fields, likes, equals in Job._filters(title, country):
+            check_value = _value_check(likes, equals)
+            if fields == ("location",):
+                # Few distinct locations: decide each once.
+                allowed = {i for i, loc in enumerate(columns.locations) if check_value(loc)}
+                checks.append(lambda pos, allowed=allowed: columns.location_ids[pos] in allowed)
+                continue
+            getters = [columns.field_getter(field) for field in fields]
+            checks.append(lambda pos, g=getters, c=check_value: any(c(get(pos)) for get in g))
+            narrowed = self._candidates(columns, view, list(likes) + list(equals or ()))
+            if narrowed is not None:
+                candidates = narrowed if candidates is None else candidates & narrowed
+        floor = Job._pay_rank_floor(country)
+        if floor is not None:
+            checks.append(lambda pos: columns.pay_ranks[pos] >= floor)
+
+        order = view.by_pay if pay_sort else view.by_date
+        if candidates is None:
+            source: Iterable[int] = order
+        else:
+            live = [pos for pos in candidates if view.alive[pos]]
+            source = sorted(live, key=columns.pay_key if pay_sort else columns.date_key, reverse=True)
+        if checks:
+            result = [pos for pos in source if all(check(pos) for check in checks)]
+        else:
+            result = list(source)
+
+        _lru_put(view.results, key, result, self._cache_size)
+        return result
+
+    def count(self, title: Optional[str] = None, country: Optional[str] = None) -> Optional[int]:
+        columns = self._serving()
+        if columns is None:
+            return None
+        return len(self._matches(columns, columns.view, title, country, False))
+
+    def search(
+        self,
+        title: Optional[str] = None,
+        country: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        sort: Optional[str] = None,
+    ) -> Optional[List[Dict]]:
+        """Same rows, columns and order as the SQL ``Job.search`` (EU is shuffled, as there).
+
+        None before the first load completed.
+        """
+        columns = self._serving()
+        if columns is None:
+            return None
+        code = (country or "").strip().upper()
+        pay_sort = sort == "pay" or code == "HIGH_PAY"
+        matches = self._matches(columns, columns.view, title, country, pay_sort)
+        if code == "EU" and not pay_sort:
+            matches = random.sample(matches, len(matches))
+        start = max(0, int(offset))
+        return [columns.row(pos) for pos in matches[start:start + int(limit)]]
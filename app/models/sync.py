@@ -0,0 +1,124 @@
+# app/models/sync.py - Keep a local SQLite copy of Jobs in step with Postgres
+
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .db import _SQLiteConnection, get_db, is_sqlite_connection, logger, stream_query
+from .serving import SERVING_COLUMNS, _sqlite_value, build_serving_db
+
+_UPSERT = (
+    f"INSERT OR REPLACE INTO Jobs ({', '.join(SERVING_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * len(SERVING_COLUMNS))})"
+)
+_UPDATED_AT = SERVING_COLUMNS.index("updated_at")
+
+
+def _meta(conn, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM serving_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn, values: Dict[str, str]) -> None:
+    conn.executemany("INSERT OR REPLACE INTO serving_meta (key, value) VALUES (?, ?)", list(values.items()))
+
+
+# (row count, id sum): differs between the copies once a job was removed from the source.
+_CHECKSUM_SQL = "SELECT COUNT(1), COALESCE(SUM(id), 0) FROM Jobs"
+
+
+def _source_checksum(db) -> tuple:
+    with db.cursor() as cur:
+        cur.execute(_CHECKSUM_SQL)
+        count, total = cur.fetchone()
+        return int(count), int(total)
+
+
+def _open_local(path: str):
+    conn = sqlite3.connect(path, factory=_SQLiteConnection)
+    # WAL: request threads keep reading the previous state while a sync commits.
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def _first_copy(path: str, source) -> Dict:
+    # A WAL left behind by an earlier file of this name must not be applied to the new one.
+    for suffix in ("-wal", "-shm"):
+        Path(path + suffix).unlink(missing_ok=True)
+    built = build_serving_db(path, source)
+    conn = _open_local(path)
+    try:
+        watermark = conn.execute("SELECT MAX(updated_at) FROM Jobs").fetchone()[0]
+        _set_meta(conn, {"watermark": watermark or ""})
+        conn.commit()
+    finally:
+        conn.close()
+    return {"upserted": built["jobs"], "deleted": 0, "full": True, "watermark": watermark}
+
+
+def sync_local_jobs(path: str, db=None, batch_size: int = 5000, full: bool = False) -> Dict:
+    """Bring the local SQLite copy at ``path`` up to date with Jobs in ``db``.
+
+    The first run builds the copy with ``build_serving_db``. Later runs pull only rows whose
+    ``updated_at`` reached the stored watermark (every row with ``full``) and replace them
+    locally in one transaction; when row count or id sum still differ from the source
+    afterwards, ids the source no longer has (archived, removed by a full reload) are
+    deleted. Returns ``{"upserted", "deleted", "full", "watermark"}``.
+    """
+    started = time.perf_counter()
+    source = db or get_db()
+    if not Path(path).exists():
+        result = _first_copy(path, source)
+    else:
+        conn = _open_local(path)
+        try:
+            watermark = None if full else _meta(conn, "watermark")
+            result = _apply_changes(conn, source, watermark, batch_size)
+        finally:
+            conn.close()
+    logger.info(
+        "Synced local jobs copy %s: %s upserted, %s deleted%s in %.2fs",
+        path, result["upserted"], result["deleted"], " (full copy)" if result["full"] else "",
+        time.perf_counter() - started,
+    )
+    return result
+
+
+def _apply_changes(conn, source, watermark: Optional[str], batch_size: int) -> Dict:
+    since = watermark
+    if since and not is_sqlite_connection(source):
+        since = datetime.fromisoformat(since)
+    where = "WHERE updated_at >= %s" if since else ""
+    params = (since,) if since else ()
+    newest = watermark or None
+    upserted = 0
+    batch: List[tuple] = []
+    # >= so rows written in the watermark's own second are not missed; replacing a row
+    # with itself is harmless.
+    for row in stream_query(source, f"SELECT {', '.join(SERVING_COLUMNS)} FROM Jobs {where}", params):
+        values = tuple(_sqlite_value(v) for v in row)
+        updated = values[_UPDATED_AT]
+        if updated is not None and (newest is None or updated > newest):
+            newest = updated
+        batch.append(values)
+        if len(batch) >= batch_size:
+            conn.executemany(_UPSERT, batch)
+            upserted += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(_UPSERT, batch)
+        upserted += len(batch)
+
+    deleted = 0
+    # conn.execute, not a cursor block: that would commit half-way through the sync.
+    if tuple(conn.execute(_CHECKSUM_SQL).fetchone()) != _source_checksum(source):
+        live = {row[0] for row in stream_query(source, "SELECT id FROM Jobs")}
+        stale = [(job_id,) for (job_id,) in conn.execute("SELECT id FROM Jobs") if job_id not in live]
+        conn.executemany("DELETE FROM Jobs WHERE id = ?", stale)
+        deleted = len(stale)
+    _set_meta(conn, {"watermark": newest or "", "synced_at": datetime.now().astimezone().isoformat()})
+    conn.commit()
+    return {"upserted": upserted, "deleted": deleted, "full": not watermark, "watermark": newest}
@@ -1,53 +1,96 @@
-import json
-import pandas as pd
+"""Flatten a generated_jobs JSON export into CSV and print value counts.
 
-# === Load the JSON file ===
-with open("jobs.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+The export is streamed one job at a time (stdlib only), so memory does not grow with
+the file size. To load the jobs into the database instead, use
+``python -m app.cli ingest jobs.json``.
 
-# === Extract jobs from structure ===
-jobs = data.get("generated_jobs", [])
+Usage:
+  python parse-jobs.py [jobs.json] [--out jobs_flat.csv] [--top 20]
+"""
 
-# === Flatten each job into a single dictionary row ===
-rows = []
-for item in jobs:
-    meta = item.get("metadata", {})
-    post = item.get("job_post", {})
+import argparse
+import csv
+import sys
+from collections import Counter
+from itertools import islice
+from pathlib import Path
 
-    row = {
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.ingest import iter_json_items  # noqa: E402
+
+FIELDS = [
+    "job_title", "location", "industry", "employment_type", "tone",
+    "salary_min", "salary_max", "currency", "keywords", "benefits",
+    "summary", "created_at", "status", "uuid",
+]
+COUNTED = ("industry", "location", "job_title")
+
+
+def flatten(item):
+    """Flatten one generated_jobs item into a single row."""
+    meta = item.get("metadata") or {}
+    salary = meta.get("salary_range") or {}
+    return {
         "job_title": meta.get("job_title"),
         "location": meta.get("location"),
         "industry": meta.get("industry"),
         "employment_type": meta.get("employment_type"),
         "tone": meta.get("tone"),
-        "salary_min": meta.get("salary_range", {}).get("min"),
-        "salary_max": meta.get("salary_range", {}).get("max"),
-        "currency": meta.get("salary_range", {}).get("currency"),
-        "keywords": ", ".join(meta.get("keywords", [])),
-        "benefits": ", ".join(meta.get("benefits", [])),
+        "salary_min": salary.get("min"),
+        "salary_max": salary.get("max"),
+        "currency": salary.get("currency"),
+        "keywords": ", ".join(meta.get("keywords") or []),
+        "benefits": ", ".join(meta.get("benefits") or []),
         "summary": meta.get("summary"),
         "created_at": meta.get("created_at"),
         "status": meta.get("status"),
         "uuid": meta.get("uuid"),
     }
-    rows.append(row)
 
-# === Create a DataFrame ===
-df = pd.DataFrame(rows)
 
-# === Basic exploration ===
-print("\n=== Sample of parsed data ===")
-print(df.head())
+def print_counts(title, counter, top):
+    print(f"\n=== Count of jobs by {title} ===")
+    for value, count in counter.most_common(top):
+        print(f"{count:>8}  {value}")
+    if len(counter) > top:
+        print(f"  ... {len(counter) - top} more")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Flatten generated_jobs JSON into CSV")
+    ap.add_argument("source", nargs="?", default="jobs.json")
+    ap.add_argument("--out", default="jobs_flat.csv")
+    ap.add_argument("--top", type=int, default=20, help="Values shown per count")
+    args = ap.parse_args()
 
-print("\n=== Count of jobs by industry ===")
-print(df["industry"].value_counts())
+    counts = {field: Counter() for field in COUNTED}
+    sample = []
+    total = 0
+    with open(args.source, "r", encoding="utf-8") as src, open(args.out, "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        items = iter_json_items(src, keys=["generated_jobs"])
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            row = flatten(item)
+            writer.writerow(row)
+            for field in COUNTED:
+                counts[field][row[field]] += 1
+            if len(sample) < 5:
+                sample.append(row)
+            total += 1
 
-print("\n=== Count of jobs by location ===")
-print(df["location"].value_counts())
+    print("\n=== Sample of parsed data ===")
+    for row in islice(sample, 5):
+        print({k: row[k] for k in ("job_title", "location", "industry", "salary_min", "salary_max", "currency")})
+    for field in COUNTED:
+        print_counts(field.replace("_", " "), counts[field], args.top)
+    print(f"\nSaved {total} rows to {args.out}")
 
-print("\n=== Count of jobs by job title ===")
-print(df["job_title"].value_counts())
 
-# Optional: export to CSV for further analysis
-df.to_csv("jobs_flat.csv", index=False, encoding="utf-8")
-print("\n✅ Saved to jobs_flat.csv")
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,48 @@
 #!/usr/bin/env python3
 """
-Import all .csv and .txt files from ./data into ./data/catalitium.db as new tables,
+Import all .csv and .txt files from ./data into ./data/catalitium.db as tables,
 then move the files into ./data/archive/.
 
 Rules:
 - Table name = filename stem (lowercased), e.g. salary.csv -> salary
-- Columns are taken from header row; created as TEXT for safety
+- Columns are taken from the header row; INTEGER/REAL/TEXT types are inferred from the
+  first --sample-rows rows ('' and 'NULL' count as missing values)
 - Delimiter is auto-detected between [\t, ',', ';', '|']
-- If a table already exists with the same name, it will be dropped and recreated
+- Files are streamed in --chunk-size row batches, so memory use does not grow with file size
+- A file whose SHA-256 matches the last import of that name is skipped
+- If the table exists with the same columns and a unique key (an 'id'/'*Id' column), rows are
+  upserted incrementally on that key; otherwise the table is rebuilt under a temporary name,
+  indexed after the load and swapped in with one transaction
 
 Usage:
-  python scripts/import_data_files.py
+  python scripts/tests/import_data_files.py [--force] [--no-archive]
 """
 
-import os
+import argparse
 import csv
+import hashlib
+import re
 import sqlite3
 import shutil
+import sys
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / "data"
 DB_PATH = DATA_DIR / "catalitium.db"
 ARCHIVE_DIR = DATA_DIR / "archive"
 
+MANIFEST_TABLE = "_import_manifest"
+NULL_MARKERS = {"", "null", "none", "nan"}
+INDEXED_COLUMNS = {"location", "country", "city"}
+_INT_RE = re.compile(r"^[+-]?\d+$")
+_REAL_RE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+# Individual fields in exports (job descriptions) can exceed csv's 128 KiB default.
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
 
 def detect_delimiter(sample: str, default: str = ",") -> str:
     try:
@@ -37,20 +56,12 @@ def detect_delimiter(sample: str, default: str = ",") -> str:
         return default
 
 
-def read_rows(path: Path):
-    with path.open("r", encoding="utf-8", errors="replace", newline="") as f:
-        head = f.read(4096)
-        f.seek(0)
-        delim = detect_delimiter(head)
-        reader = csv.reader(f, delimiter=delim)
-        try:
-            headers = next(reader)
-        except StopIteration:
-            return [], []
-        # Normalize headers: strip BOM/whitespace
-        headers = [h.replace("\ufeff", "").strip() for h in headers]
-        rows = [r for r in reader]
-        return headers, rows
+def sha256_file(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 def sanitize_ident(s: str) -> str:
@@ -70,45 +81,219 @@ def sanitize_ident(s: str) -> str:
     return ident
 
 
-def ensure_archive():
-    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+def column_names(headers):
+    cols, seen = [], set()
+    for i, h in enumerate(headers):
+        name = sanitize_ident(h) or f"col{i}"
+        base, n = name, 2
+        while name.lower() in seen:
+            name = f"{base}_{n}"
+            n += 1
+        seen.add(name.lower())
+        cols.append(name)
+    return cols
+
+
+def is_missing(value) -> bool:
+    return value is None or value.strip().lower() in NULL_MARKERS
+
+
+def infer_types(sample_rows, n_cols):
+    """Return the narrowest of INTEGER/REAL/TEXT that fits every sampled value per column."""
+    types = []
+    for i in range(n_cols):
+        kind = None
+        for row in sample_rows:
+            value = row[i] if i < len(row) else None
+            if is_missing(value):
+                continue
+            v = value.strip()
+            if _INT_RE.match(v):
+                kind = kind or "INTEGER"
+            elif _REAL_RE.match(v):
+                kind = "REAL" if kind in (None, "INTEGER", "REAL") else kind
+            else:
+                kind = "TEXT"
+                break
+        types.append(kind or "TEXT")
+    return types
+
+
+def convert(value, kind):
+    if is_missing(value):
+        return None
+    if kind == "INTEGER":
+        try:
+            return int(value.strip())
+        except ValueError:
+            return value  # later rows may not match the sample; SQLite keeps the text
+    if kind == "REAL":
+        try:
+            return float(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def pick_key(cols, sample_rows):
+    """Return the first id-like column whose sampled values are present and unique."""
+    for i, col in enumerate(cols):
+        lower = col.lower()
+        if lower == "id" or lower.endswith("_id") or (lower.endswith("id") and col[-2:] == "Id"):
+            values = [row[i] if i < len(row) else None for row in sample_rows]
+            if all(not is_missing(v) for v in values) and len(set(values)) == len(values):
+                return col
+    return None
+
+
+def existing_columns(conn: sqlite3.Connection, table: str):
+    rows = conn.execute(f"PRAGMA table_info('{table}')").fetchall()
+    return [(r[1], (r[2] or "").upper()) for r in rows]
+
 
+def has_unique_index_on(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    for idx in conn.execute(f"PRAGMA index_list('{table}')").fetchall():
+        if not idx[2]:
+            continue
+        cols = [r[2] for r in conn.execute(f"PRAGMA index_info('{idx[1]}')").fetchall()]
+        if cols == [column]:
+            return True
+    return False
 
-def import_file(conn: sqlite3.Connection, file_path: Path):
-    table = file_path.stem.lower()
-    headers, rows = read_rows(file_path)
-    if not headers:
-        print(f"- Skipping {file_path.name}: empty or no header")
-        return False
 
-    # Build schema
-    cols = [(sanitize_ident(h) or f"col{i}") for i, h in enumerate(headers)]
-    col_defs = ", ".join([f"{c} TEXT" for c in cols])
-    cur = conn.cursor()
-    # Drop existing table to ensure fresh import
-    cur.execute("DROP TABLE IF EXISTS " + table)
-    cur.execute("CREATE TABLE IF NOT EXISTS " + table + " (" + col_defs + ")")
+def ensure_manifest(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            file_name TEXT PRIMARY KEY,
+            table_name TEXT,
+            sha256 TEXT,
+            size INTEGER,
+            row_count INTEGER,
+            imported_at TEXT
+        )
+        """
+    )
+    conn.commit()
+
+
+def create_indexes(conn: sqlite3.Connection, table: str, cols, key):
+    if key:
+        try:
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_{key.lower()}_unique ON {table}({key})")
+        except sqlite3.IntegrityError:
+            # Duplicates beyond the sample: keep a plain index and rebuild on the next import.
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key.lower()} ON {table}({key})")
+    for col in cols:
+        if col.lower() in INDEXED_COLUMNS and col != key:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col.lower()} ON {table}({col})")
+
+
+def import_file(conn: sqlite3.Connection, file_path: Path, chunk_size: int, sample_rows: int, force: bool = False):
+    table = sanitize_ident(file_path.stem.lower())
+    checksum = sha256_file(file_path)
+    if not force:
+        row = conn.execute(f"SELECT sha256 FROM {MANIFEST_TABLE} WHERE file_name = ?", (file_path.name,)).fetchone()
+        if row and row[0] == checksum:
+            print(f"- Skipping {file_path.name}: unchanged since last import")
+            return True
 
-    if rows:
+    with file_path.open("r", encoding="utf-8", errors="replace", newline="") as f:
+        head = f.read(4096)
+        f.seek(0)
+        reader = csv.reader(f, delimiter=detect_delimiter(head))
+        try:
+            headers = next(reader)
+        except StopIteration:
+            print(f"- Skipping {file_path.name}: empty or no header")
+            return False
+        # Normalize headers: strip BOM/whitespace
+        headers = [h.replace("\ufeff", "").strip() for h in headers]
+        cols = column_names(headers)
         n = len(cols)
-        norm_rows = []
-        for r in rows:
-            if len(r) < n:
-                r = list(r) + [None] * (n - len(r))
-            elif len(r) > n:
-                r = r[:n]
-            norm_rows.append(r)
-        placeholders = ",".join(["?"] * n)
-        cur.executemany(
-            f"INSERT INTO {table} (" + ",".join(cols) + ") VALUES (" + placeholders + ")",
-            norm_rows,
+        sample = list(islice(reader, sample_rows))
+        types = infer_types(sample, n)
+        key = pick_key(cols, sample)
+
+        def chunks():
+            batch = []
+            for source in (sample, reader):
+                for r in source:
+                    if len(r) < n:
+                        r = list(r) + [None] * (n - len(r))
+                    elif len(r) > n:
+                        r = r[:n]
+                    batch.append([convert(v, t) for v, t in zip(r, types)])
+                    if len(batch) >= chunk_size:
+                        yield batch
+                        batch = []
+            if batch:
+                yield batch
+
+        current = existing_columns(conn, table)
+        incremental = (
+            key is not None
+            and [c for c, _ in current] == cols
+            and [t for _, t in current] == types
+            and has_unique_index_on(conn, table, key)
         )
+        col_list = ",".join(cols)
+        placeholders = ",".join(["?"] * n)
+        total = 0
+        if incremental:
+            updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != key)
+            sql = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders}) ON CONFLICT({key}) DO "
+            sql += f"UPDATE SET {updates}" if updates else "NOTHING"
+            for batch in chunks():
+                conn.executemany(sql, batch)
+                conn.commit()
+                total += len(batch)
+            mode = f"upserted on {key}"
+        else:
+            staging = f"{table}__import"
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+            conn.execute(f"CREATE TABLE {staging} (" + ", ".join(f"{c} {t}" for c, t in zip(cols, types)) + ")")
+            sql = f"INSERT INTO {staging} ({col_list}) VALUES ({placeholders})"
+            for batch in chunks():
+                conn.executemany(sql, batch)
+                total += len(batch)
+            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+            create_indexes(conn, table, cols, key)
+            conn.commit()
+            mode = "rebuilt"
+
+    conn.execute(
+        f"""
+        INSERT INTO {MANIFEST_TABLE}(file_name, table_name, sha256, size, row_count, imported_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(file_name) DO UPDATE SET
+            table_name = excluded.table_name, sha256 = excluded.sha256, size = excluded.size,
+            row_count = excluded.row_count, imported_at = excluded.imported_at
+        """,
+        (file_path.name, table, checksum, file_path.stat().st_size, total,
+         datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
     conn.commit()
-    print(f"- Imported {file_path.name} -> table '{table}' ({len(rows)} rows)")
+    typed = ", ".join(f"{c}:{t}" for c, t in zip(cols, types))
+    print(f"- Imported {file_path.name} -> table '{table}' ({total} rows, {mode}; {typed})")
     return True
 
 
+def ensure_archive():
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+
 def main():
+    ap = argparse.ArgumentParser(description="Import data/*.csv|*.txt into the SQLite database")
+    ap.add_argument("--chunk-size", type=int, default=5000, help="Rows per executemany batch")
+    ap.add_argument("--sample-rows", type=int, default=1000, help="Rows sampled for type inference")
+    ap.add_argument("--force", action="store_true", help="Import even if the file checksum is unchanged")
+    ap.add_argument("--no-archive", action="store_true", help="Leave imported files in data/")
+    args = ap.parse_args()
+
     if not DATA_DIR.exists():
         raise SystemExit("data/ directory not found")
     ensure_archive()
@@ -117,8 +302,9 @@ def main():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(DB_PATH))
     try:
+        ensure_manifest(conn)
         targets = []
-        for p in DATA_DIR.iterdir():
+        for p in sorted(DATA_DIR.iterdir()):
             if p.name.lower() in {"archive", DB_PATH.name.lower()}:
                 continue
             if p.is_file() and p.suffix.lower() in {".csv", ".txt"}:
@@ -130,8 +316,8 @@ def main():
 
         print(f"Importing into {DB_PATH}...")
         for fp in targets:
-            ok = import_file(conn, fp)
-            if ok:
+            ok = import_file(conn, fp, max(1, args.chunk_size), max(1, args.sample_rows), force=args.force)
+            if ok and not args.no_archive:
                 dest = ARCHIVE_DIR / fp.name
                 try:
                     if dest.exists():
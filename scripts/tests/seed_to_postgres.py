@@ -3,17 +3,30 @@
 Seed selected tables from local SQLite (data/catalitium.db) into Postgres (DATABASE_URL).
 
 Usage:
-  python scripts/seed_to_postgres.py --tables salary,jobs --truncate
+  python scripts/tests/seed_to_postgres.py --tables salary,regions,jobs --truncate
+  python scripts/tests/seed_to_postgres.py --tables jobs --resume
 
 Notes:
-- Creates table 'salary' in Postgres if missing (compatible with CSV columns).
-- Assumes Postgres 'Jobs' table already created by init_db(); inserts with ON CONFLICT(link) DO NOTHING.
+- Streams each SQLite table in rowid order (--chunk-size rows at a time); nothing is loaded
+  fully into memory.
+- Every chunk is COPY'd into a temporary staging table and merged with one set-based
+  INSERT ... SELECT, in its own transaction. Rows already present (same link for Jobs, same
+  key for salary/regions) are skipped, so replaying a chunk is harmless.
+- Tables are seeded concurrently, one thread and one Postgres connection per table.
+- After each committed chunk the last rowid is written to the checkpoint file; --resume
+  continues from there after an interruption.
+- Creates 'salary'/'regions' in Postgres if missing (compatible with the CSV columns) and
+  assumes 'Jobs' exists (created by init_db()) or creates it without the unique index.
 - Requires psycopg (v3) and access to DATABASE_URL (sslmode=require recommended).
 """
 
 import argparse
+import json
 import os
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 try:
@@ -27,65 +40,65 @@ try:
 except Exception:
     pass
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "data" / "catalitium.db"
+CHECKPOINT_PATH = PROJECT_ROOT / "data" / "seed_checkpoint.json"
 
-
-def pg_connect(url: str):
-    if not psycopg:
-        raise RuntimeError("psycopg is required to seed Postgres. Install it and retry.")
-    if url.startswith("postgres") and "sslmode=" not in url:
-        sep = "&" if "?" in url else "?"
-        url = url + sep + "sslmode=require"
-    return psycopg.connect(url, autocommit=True)
-
-
-def ensure_salary_table_pg(cur):
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS salary (
-            GeoSalaryId TEXT,
-            Location TEXT,
-            MedianSalary TEXT,
-            MinSalary TEXT,
-            CurrencyTicker TEXT,
-            City TEXT,
-            Country TEXT,
-            Region TEXT,
-            RemoteType TEXT
-        );
-        """
-    )
-
-
-def seed_salary(sqlite_conn: sqlite3.Connection, pg_conn, truncate: bool = False):
-    rows = sqlite_conn.execute(
-        "SELECT GeoSalaryId,Location,MedianSalary,MinSalary,CurrencyTicker,City,Country,Region,RemoteType FROM salary"
-    ).fetchall()
-    with pg_conn.cursor() as cur:
-        ensure_salary_table_pg(cur)
-        if truncate:
-            cur.execute("TRUNCATE TABLE salary")
-        before = cur.execute("SELECT COUNT(1) FROM salary").fetchone()[0]
-        q = (
-            "INSERT INTO salary(GeoSalaryId,Location,MedianSalary,MinSalary,CurrencyTicker,City,Country,Region,RemoteType)"
-            " VALUES(%s,%s,%s,%s,%s,%s,%s,%s,%s)"
-        )
-        for r in rows:
-            cur.execute(q, r)
-        after = cur.execute("SELECT COUNT(1) FROM salary").fetchone()[0]
-    print(f"Seeded salary: +{after - before} rows (from {len(rows)} candidates)")
-
-
-def seed_jobs(sqlite_conn: sqlite3.Connection, pg_conn):
-    # Pull from SQLite Jobs table
-    rows = sqlite_conn.execute(
-        "SELECT job_title, job_description, link, job_title_norm, location, job_date, date FROM Jobs"
-    ).fetchall()
-    with pg_conn.cursor() as cur:
+# name -> source table, columns, DDL for the Postgres target, merge statement
+TABLES = {
+    "salary": {
+        "source": "salary",
+        "columns": ["GeoSalaryId", "Location", "MedianSalary", "MinSalary", "CurrencyTicker",
+                    "City", "Country", "Region", "RemoteType"],
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS salary (
+                GeoSalaryId TEXT,
+                Location TEXT,
+                MedianSalary TEXT,
+                MinSalary TEXT,
+                CurrencyTicker TEXT,
+                City TEXT,
+                Country TEXT,
+                Region TEXT,
+                RemoteType TEXT
+            );
+        """,
+        "merge": """
+            INSERT INTO salary (GeoSalaryId, Location, MedianSalary, MinSalary, CurrencyTicker,
+                                City, Country, Region, RemoteType)
+            SELECT DISTINCT ON (s.GeoSalaryId) s.GeoSalaryId, s.Location, s.MedianSalary, s.MinSalary,
+                   s.CurrencyTicker, s.City, s.Country, s.Region, s.RemoteType
+            FROM seed_stage s
+            WHERE NOT EXISTS (SELECT 1 FROM salary t WHERE t.GeoSalaryId = s.GeoSalaryId)
+            ORDER BY s.GeoSalaryId, s.ord
+        """,
+    },
+    "regions": {
+        "source": "regions",
+        "columns": ["loc_id", "location", "country", "med_sal", "min_sal", "curr"],
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS regions (
+                loc_id TEXT,
+                location TEXT,
+                country TEXT,
+                med_sal TEXT,
+                min_sal TEXT,
+                curr TEXT
+            );
+        """,
+        "merge": """
+            INSERT INTO regions (loc_id, location, country, med_sal, min_sal, curr)
+            SELECT DISTINCT ON (s.loc_id) s.loc_id, s.location, s.country, s.med_sal, s.min_sal, s.curr
+            FROM seed_stage s
+            WHERE NOT EXISTS (SELECT 1 FROM regions t WHERE t.loc_id = s.loc_id)
+            ORDER BY s.loc_id, s.ord
+        """,
+    },
+    "jobs": {
+        "source": "Jobs",
+        "columns": ["job_title", "job_description", "link", "job_title_norm", "location", "job_date", "date"],
         # Ensure Jobs exists (do not enforce unique index here to avoid failing on existing duplicates)
-        cur.execute(
-            """
+        "ddl": """
             CREATE TABLE IF NOT EXISTS Jobs (
                 id SERIAL PRIMARY KEY,
                 job_title TEXT NULL,
@@ -96,43 +109,142 @@ def seed_jobs(sqlite_conn: sqlite3.Connection, pg_conn):
                 job_date TEXT NULL,
                 date TIMESTAMP WITH TIME ZONE
             );
-            """
-        )
-        # Insert rows additively, skip if link already exists (without requiring a unique index)
-        before = cur.execute("SELECT COUNT(1) FROM Jobs").fetchone()[0]
-        # Normalize job_date for potential bigint schemas: keep numeric else NULL
-        norm_rows = []
-        for r in rows:
-            jdate = r[5]
-            if isinstance(jdate, str):
-                jdate_norm = int(jdate) if jdate.isdigit() else None
-            else:
-                try:
-                    jdate_norm = int(jdate) if jdate is not None else None
-                except Exception:
-                    jdate_norm = None
-            # rebuild row with normalized jdate
-            r2 = (r[0], r[1], r[2], r[3], r[4], jdate_norm, r[6])
-            norm_rows.append(r2)
-
-        base_q = (
-            "INSERT INTO Jobs(job_title, job_description, link, job_title_norm, location, job_date, date) "
-            "SELECT %s,%s,%s,%s,%s,%s,%s WHERE NOT EXISTS (SELECT 1 FROM Jobs j WHERE j.link = %s)"
-        )
-        for i, r2 in enumerate(norm_rows):
-            q = base_q + f" /*seed_{i}*/"
-            cur.execute(q, tuple(list(r2) + [r2[2]]))
-        after = cur.execute("SELECT COUNT(1) FROM Jobs").fetchone()[0]
-    print(f"Seeded Jobs: +{after - before} rows (from {len(rows)} candidates)")
+        """,
+        # Skip links that already exist (without requiring a unique index)
+        "merge": """
+            INSERT INTO Jobs (job_title, job_description, link, job_title_norm, location, job_date, date)
+            SELECT DISTINCT ON (s.link) s.job_title, s.job_description, s.link, s.job_title_norm, s.location,
+                   s.job_date, NULLIF(s.date, '')::timestamptz
+            FROM seed_stage s
+            WHERE s.link IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM Jobs j WHERE j.link = s.link)
+            ORDER BY s.link, s.ord
+        """,
+    },
+}
+
+_print_lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    with _print_lock:
+        print(msg, flush=True)
+
+
+def pg_connect(url: str):
+    if not psycopg:
+        raise RuntimeError("psycopg is required to seed Postgres. Install it and retry.")
+    if url.startswith("postgres") and "sslmode=" not in url:
+        sep = "&" if "?" in url else "?"
+        url = url + sep + "sslmode=require"
+    return psycopg.connect(url, autocommit=True)
+
+
+class Checkpoint:
+    """Last committed SQLite rowid per table, persisted atomically after each chunk."""
+
+    def __init__(self, path: Path, resume: bool):
+        self.path = path
+        self._lock = threading.Lock()
+        self.positions = {}
+        if resume and path.exists():
+            self.positions = json.loads(path.read_text(encoding="utf-8"))
+
+    def get(self, table: str) -> int:
+        return int(self.positions.get(table, 0))
+
+    def set(self, table: str, rowid: int) -> None:
+        with self._lock:
+            self.positions[table] = rowid
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.positions, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def normalize_job_date(jdate):
+    # Normalize job_date for potential bigint schemas: keep numeric else NULL
+    if isinstance(jdate, str):
+        return int(jdate) if jdate.isdigit() else None
+    try:
+        return int(jdate) if jdate is not None else None
+    except Exception:
+        return None
+
+
+def iter_chunks(sqlite_conn: sqlite3.Connection, source: str, columns, start_rowid: int, chunk_size: int):
+    """Yield (last_rowid, rows) using keyset pagination on rowid."""
+    sql = f"SELECT rowid, {', '.join(columns)} FROM {source} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+    last = start_rowid
+    while True:
+        rows = sqlite_conn.execute(sql, (last, chunk_size)).fetchall()
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield last, rows
+
+
+def seed_table(name: str, url: str, checkpoint: Checkpoint, chunk_size: int, truncate: bool) -> dict:
+    spec = TABLES[name]
+    columns = spec["columns"]
+    sqlite_conn = sqlite3.connect(str(DB_PATH))
+    pg_conn = pg_connect(url)
+    stats = {"table": name, "read": 0, "inserted": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    try:
+        with pg_conn.cursor() as cur:
+            cur.execute(spec["ddl"])
+            cur.execute("SET statement_timeout = 0")
+            if truncate and checkpoint.get(name) == 0:
+                cur.execute(f"TRUNCATE TABLE {spec['source']}")
+            col_defs = ", ".join(f"{c} TEXT" for c in columns)
+            cur.execute(f"CREATE TEMP TABLE seed_stage (ord BIGINT, {col_defs})")
+        copy_sql = f"COPY seed_stage (ord, {', '.join(columns)}) FROM STDIN"
+        job_date_idx = columns.index("job_date") if name == "jobs" else None
+
+        for last_rowid, rows in iter_chunks(sqlite_conn, spec["source"], columns, checkpoint.get(name), chunk_size):
+            chunk_started = time.perf_counter()
+            with pg_conn.transaction():
+                with pg_conn.cursor() as cur:
+                    cur.execute("TRUNCATE seed_stage")
+                    with cur.copy(copy_sql) as copy:
+                        for row in rows:
+                            values = [None if v is None else str(v) for v in row[1:]]
+                            if job_date_idx is not None:
+                                jdate = normalize_job_date(row[1 + job_date_idx])
+                                values[job_date_idx] = None if jdate is None else str(jdate)
+                            copy.write_row([row[0]] + values)
+                    cur.execute(spec["merge"])
+                    inserted = cur.rowcount or 0
+            checkpoint.set(name, last_rowid)
+            stats["read"] += len(rows)
+            stats["inserted"] += inserted
+            elapsed = time.perf_counter() - started
+            chunk_rate = len(rows) / max(time.perf_counter() - chunk_started, 1e-9)
+            log(
+                f"[{name}] rowid<={last_rowid}: +{inserted} of {len(rows)} rows "
+                f"({chunk_rate:,.0f} rows/s chunk, {stats['read'] / max(elapsed, 1e-9):,.0f} rows/s overall)"
+            )
+    finally:
+        stats["seconds"] = time.perf_counter() - started
+        pg_conn.close()
+        sqlite_conn.close()
+    return stats
 
 
 def main():
     ap = argparse.ArgumentParser(description="Seed tables from SQLite to Postgres")
-    ap.add_argument("--tables", default="salary", help="Comma-separated list: salary,jobs")
-    ap.add_argument("--truncate", action="store_true", help="Truncate target tables before insert (where applicable)")
+    ap.add_argument("--tables", default="salary", help="Comma-separated list: " + ",".join(TABLES))
+    ap.add_argument("--truncate", action="store_true", help="Truncate target tables before insert (not when resuming mid-table)")
+    ap.add_argument("--chunk-size", type=int, default=20000, help="Rows per COPY/merge transaction")
+    ap.add_argument("--checkpoint", default=str(CHECKPOINT_PATH), help="Checkpoint file (default: %(default)s)")
+    ap.add_argument("--resume", action="store_true", help="Continue from the checkpoint file")
+    ap.add_argument("--workers", type=int, default=0, help="Tables seeded concurrently (default: all)")
     args = ap.parse_args()
 
-    tables = {t.strip().lower() for t in args.tables.split(",") if t.strip()}
+    tables = [t.strip().lower() for t in args.tables.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in TABLES]
+    if unknown:
+        raise SystemExit(f"Unknown tables: {', '.join(unknown)}")
     db_url = os.getenv("DATABASE_URL") or os.getenv("SUPABASE_URL")
     if not db_url:
         raise SystemExit("DATABASE_URL (or SUPABASE_URL) is required for Postgres destination")
@@ -140,20 +252,30 @@ def main():
     if not DB_PATH.exists():
         raise SystemExit(f"SQLite DB not found: {DB_PATH}")
 
-    print(f"Connecting to SQLite: {DB_PATH}")
-    sqlite_conn = sqlite3.connect(str(DB_PATH))
-    try:
-        print("Connecting to Postgres...")
-        pg_conn = pg_connect(db_url)
-        try:
-            if "salary" in tables:
-                seed_salary(sqlite_conn, pg_conn, truncate=args.truncate)
-            if "jobs" in tables:
-                seed_jobs(sqlite_conn, pg_conn)
-        finally:
-            pg_conn.close()
-    finally:
-        sqlite_conn.close()
+    checkpoint = Checkpoint(Path(args.checkpoint), resume=args.resume)
+    print(f"Seeding {', '.join(tables)} from {DB_PATH}" + (f" (resuming: {checkpoint.positions})" if args.resume else ""))
+    started = time.perf_counter()
+    failed = False
+    with ThreadPoolExecutor(max_workers=args.workers or len(tables)) as pool:
+        futures = {
+            pool.submit(seed_table, t, db_url, checkpoint, max(1, args.chunk_size), args.truncate): t
+            for t in tables
+        }
+        for fut in as_completed(futures):
+            table = futures[fut]
+            try:
+                st = fut.result()
+            except Exception as exc:
+                failed = True
+                log(f"[{table}] failed: {exc} (rerun with --resume to continue)")
+                continue
+            log(
+                f"Seeded {table}: +{st['inserted']} rows (from {st['read']} candidates) in {st['seconds']:.1f}s, "
+                f"{st['read'] / max(st['seconds'], 1e-9):,.0f} rows/s"
+            )
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    if failed:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
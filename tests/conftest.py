@@ -0,0 +1,39 @@
+import pytest
+
+import app.app as app_module
+from app.app import create_app
+from app.models.cache import ResultCache
+from app.models.db import Job, set_job_store
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_cache(monkeypatch):
+    """Each test starts with an empty search result cache and no jobs_changed listener."""
+    monkeypatch.setattr(app_module, "search_cache", ResultCache(prefix="search:"))
+    # Tests drive app/models/changes.py directly instead of a background listener.
+    monkeypatch.setattr(app_module, "JOBS_CHANGED_LISTENER", False)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "jobs.db"
+
+
+@pytest.fixture
+def seed_jobs():
+    """Rows the ``app`` fixture loads; override it in a module or parametrize it."""
+    return []
+
+
+@pytest.fixture
+def app(db_path, seed_jobs, monkeypatch):
+    """The app on a fresh SQLite database at ``db_path``, seeded with ``seed_jobs``."""
+    monkeypatch.setenv("SECRET_KEY", "test-secret")
+    monkeypatch.setenv("FORCE_SQLITE", "1")
+    monkeypatch.setenv("DB_PATH", str(db_path))
+    app = create_app()
+    if seed_jobs:
+        with app.app_context():
+            Job.bulk_upsert(seed_jobs)
+    yield app
+    set_job_store(None)
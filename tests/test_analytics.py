@@ -0,0 +1,90 @@
+import os
+import shutil
+import threading
+import time
+
+from app.models import db as db_module
+from app.models.analytics import AnalyticsWriter, SpoolSink, closed_segments, load_spool
+
+
+class RecordingSink:
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def write(self, sql, rows):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append((sql, list(rows)))
+
+    def close(self):
+        pass
+
+
+def test_writer_batches_by_statement_and_flushes():
+    sink = RecordingSink()
+    writer = AnalyticsWriter(sink, batch_size=50, flush_interval=10)
+    for i in range(3):
+        writer.submit("INSERT A", (i,))
+    writer.submit("INSERT B", ("b",))
+    writer.flush()
+    assert sink.batches == [("INSERT A", [(0,), (1,), (2,)]), ("INSERT B", [("b",)])]
+    assert writer.stats()["written"] == 4
+    writer.close()
+
+
+def test_writer_drops_and_counts_under_backpressure():
+    gate = threading.Event()
+    sink = RecordingSink(gate=gate)
+    writer = AnalyticsWriter(sink, max_queue=2, batch_size=1, flush_interval=0.01)
+    results = [writer.submit("INSERT", (i,)) for i in range(10)]
+    assert not all(results)
+    assert writer.stats()["dropped"] == results.count(False)
+    gate.set()
+    writer.close()
+    written = sum(len(rows) for _, rows in sink.batches)
+    assert written == results.count(True)
+
+
+def test_spool_segments_load_once(tmp_path, monkeypatch):
+    spool = tmp_path / "spool"
+    sink = SpoolSink(spool, max_bytes=10**6, max_age=3600)
+    writer = AnalyticsWriter(sink, batch_size=10, flush_interval=0.05)
+    row = ("2024-01-01T00:00:00+00:00", "hash", "ok", "ua", "", "ip", "sid", "form")
+    for _ in range(3):
+        writer.submit("subscribe_events", row)
+    writer.close()
+    segments = closed_segments(spool)
+    assert len(segments) == 1
+    backup = tmp_path / segments[0].name
+    shutil.copy(segments[0], backup)
+
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "spool.db"))
+    conn = db_module._sqlite_connect()
+    try:
+        db_module.migrate_db(conn)
+        first = load_spool(conn, spool, db_module.EVENT_COLUMNS)
+        shutil.copy(backup, spool / backup.name)  # crash before the segment was deleted
+        second = load_spool(conn, spool, db_module.EVENT_COLUMNS)
+        count = conn.execute("SELECT COUNT(*) FROM subscribe_events").fetchone()[0]
+    finally:
+        conn.close()
+    assert first == {"segments": 1, "rows": 3, "skipped": 0}
+    assert second == {"segments": 0, "rows": 0, "skipped": 1}
+    assert count == 3
+    assert closed_segments(spool) == []
+
+
+def test_open_segments_wait_for_the_stale_window(tmp_path):
+    spool = tmp_path / "spool"
+    sink = SpoolSink(spool, max_bytes=10**6, max_age=600)
+    sink.write("subscribe_events", [("2024-01-01T00:00:00+00:00", "hash", "ok", "ua", "", "ip", "sid", "form")])
+    (segment,) = spool.glob("*.jsonl.open")
+    idle = time.time() - 400
+    os.utime(segment, (idle, idle))
+    # Idle for 400s but younger than the writer's 600s rotation: its writer may still append.
+    assert closed_segments(spool) == []
+    assert closed_segments(spool, stale_after=2 * 600 + 60) == []
+    assert closed_segments(spool, stale_after=300) == [segment]
+    sink.close()
+    assert [p.name for p in closed_segments(spool)] == [segment.name[: -len(".open")]]
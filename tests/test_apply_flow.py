@@ -2,7 +2,7 @@ import re
 import pytest
 
 from app.app import create_app
-from app.models.db import get_db, Job
+from app.models.db import get_db, flush_analytics, Job
 
 
 @pytest.fixture
@@ -103,6 +103,7 @@ def test_events_apply_records_status(app_with_job):
     }
     resp = client.post("/events/apply", json=payload)
     assert resp.status_code == 200
+    flush_analytics()
     with app.app_context():
         db = get_db()
         with db.cursor() as cur:
@@ -0,0 +1,216 @@
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app.models.cache import (
+    LocalCache,
+    RedisCache,
+    ResultCache,
+    SingleFlight,
+    SQLiteCache,
+    cache_backend_from_url,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_local_cache_ttl_and_add():
+    clock = Clock()
+    cache = LocalCache(max_entries=2, clock=clock)
+    assert cache.add("lock", "a", ttl=5)
+    assert not cache.add("lock", "b", ttl=5)
+    clock.now += 5
+    assert cache.get("lock") is None
+    assert cache.add("lock", "b", ttl=5)
+    cache.set("x", 1, ttl=60)
+    cache.set("y", 2, ttl=60)
+    assert cache.get("lock") is None  # evicted, least recently used
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+    results = []
+    gate = threading.Event()
+
+    def slow():
+        calls.append(1)
+        gate.wait(1)
+        return {"total": 3}
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("q", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"total": 3}] * 8
+
+
+def test_expired_entry_is_served_while_another_worker_recomputes():
+    clock = Clock()
+    backend = LocalCache(clock=clock)
+    worker_a = ResultCache(backend, ttl=30, stale_seconds=300, clock=clock)
+    worker_b = ResultCache(backend, ttl=30, stale_seconds=300, clock=clock)
+    assert worker_a.fetch("q", lambda: "v1") == "v1"
+    clock.now += 31
+    assert worker_a.get("q") is None
+    # Worker A holds the refresh lock; B answers with the expired value instead of computing.
+    assert backend.add("lock:0:q", "worker-a", ttl=10)
+    assert worker_b.fetch("q", lambda: "from-b") == "v1"
+    backend.delete("lock:0:q")
+    assert worker_b.fetch("q", lambda: "v2") == "v2"
+    assert worker_a.fetch("q", lambda: "unused") == "v2"
+
+
+def test_waits_for_the_lock_holder_on_a_cold_key():
+    backend = LocalCache()
+    cache = ResultCache(backend, ttl=30, wait_seconds=1)
+    backend.add("lock:0:q", "other-worker", ttl=10)
+    timer = threading.Timer(0.1, lambda: ResultCache(backend, ttl=30).set("q", "theirs"))
+    timer.start()
+    assert cache.fetch("q", lambda: "mine") == "theirs"
+    timer.join()
+
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol (GET, SET [NX] PX, DEL) to exercise RedisCache."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def _args(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self._args()
+            if args is None:
+                return
+            cmd, key = args[0].upper(), args[1]
+            now = time.monotonic()
+            with server.lock:
+                entry = server.data.get(key)
+                if entry and entry[1] <= now:
+                    entry = server.data.pop(key)
+                    entry = None
+                if cmd == b"GET":
+                    reply = b"$-1\r\n" if entry is None else b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+                elif cmd == b"SET":
+                    opts = [a.upper() for a in args[3:]]
+                    ttl = int(args[3 + opts.index(b"PX") + 1]) / 1000.0
+                    if b"NX" in opts and entry is not None:
+                        reply = b"$-1\r\n"
+                    else:
+                        server.data[key] = (args[2], now + ttl)
+                        reply = b"+OK\r\n"
+                elif cmd == b"DEL":
+                    reply = b":%d\r\n" % (server.data.pop(key, None) is not None)
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def resp_server():
+    server = _RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _check_backend(make):
+    """Two handles on the same store behave like two workers."""
+    a, b = make(), make()
+    a.set("k", {"rows": [1, 2]}, ttl=30)
+    assert b.get("k") == {"rows": [1, 2]}
+    assert b.get("missing") is None
+    assert a.add("lock", "a", ttl=30)
+    assert not b.add("lock", "b", ttl=30)
+    assert b.get("lock") == "a"
+    a.delete("lock")
+    assert b.add("lock", "b", ttl=30)
+
+
+def test_sqlite_cache_is_shared_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.db")
+    _check_backend(lambda: SQLiteCache(path))
+    clock = Clock()
+    small = SQLiteCache(str(tmp_path / "small.db"), max_entries=3, clock=clock)
+    for i in range(5):
+        clock.now += 10
+        small.set(f"e{i}", i, ttl=60)
+    small.set("short", 0, ttl=1)
+    clock.now += 2
+    small.evict()
+    assert [small.get(f"e{i}") for i in range(5)] == [None, None, 2, 3, 4]
+    assert small.add("short", 1, ttl=5)
+
+
+def test_redis_cache_against_stand_in(resp_server):
+    port = resp_server.server_address[1]
+    _check_backend(lambda: RedisCache(f"redis://127.0.0.1:{port}/0"))
+    cache = RedisCache(f"redis://127.0.0.1:{port}")
+    cache.set("ttl", 1, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("ttl") is None
+    # A dropped connection is reopened on the next command.
+    cache.close()
+    assert cache.get("k") == {"rows": [1, 2]}
+
+
+def test_redis_outage_is_skipped_until_retry():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    cache = RedisCache(f"redis://127.0.0.1:{port}", retry_seconds=60)
+    with pytest.raises(ConnectionRefusedError):
+        cache.get("k")
+    with pytest.raises(ConnectionError, match="unavailable"):
+        cache.get("k")
+    result = ResultCache(cache, ttl=30)
+    assert result.fetch("q", lambda: "computed") == "computed"
+
+
+def test_result_cache_coordinates_workers_through_shared_backend(tmp_path):
+    path = str(tmp_path / "cache.db")
+    worker_a = ResultCache(SQLiteCache(path), ttl=30)
+    worker_b = ResultCache(SQLiteCache(path), ttl=30)
+    assert worker_a.fetch("q", lambda: (1, [{"id": 1}])) == (1, [{"id": 1}])
+    assert worker_b.fetch("q", lambda: pytest.fail("recomputed")) == (1, [{"id": 1}])
+
+
+def test_backend_from_url(tmp_path):
+    assert isinstance(cache_backend_from_url("memory://"), LocalCache)
+    assert cache_backend_from_url(f"sqlite:///{tmp_path}/c.db").path == f"{tmp_path}/c.db"
+    assert cache_backend_from_url("redis://cache:6380/2").port == 6380
+    with pytest.raises(ValueError):
+        cache_backend_from_url("memcached://x")
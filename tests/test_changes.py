@@ -0,0 +1,131 @@
+import queue
+import threading
+from types import SimpleNamespace
+
+import app.app as app_module
+import app.models.db as db_module
+from app.models.changes import JobsChangeListener
+from app.models.db import Job, get_db, jobs_generation, set_job_store
+from app.models.ingest import IngestPipeline
+from app.models.store import JobStore
+
+
+def _job(i, title="Backend Engineer"):
+    return {"job_title": title, "link": f"https://example.com/{i}", "location": "Berlin, DE"}
+
+
+def _wait(seen, generation):
+    for _ in range(200):
+        if seen and seen[-1] == generation:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"listener saw {seen}, expected {generation}")
+
+
+def test_writes_bump_generation_once_per_load(app):
+    with app.app_context():
+        db = get_db()
+        assert jobs_generation(db) == 0
+        Job.insert_many([_job(1)])
+        assert jobs_generation(db) == 1
+        Job.bulk_upsert([_job(1)])  # nothing changed
+        assert jobs_generation(db) == 1
+        report = IngestPipeline([], batch_size=2).run([_job(i) for i in range(2, 9)], db)
+        assert report["inserted"] == 7
+        assert jobs_generation(db) == 2
+
+
+def test_sqlite_listener_polls_and_reconnects(app, tmp_path):
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("database is restarting")
+        return db_module._sqlite_connect()
+
+    listener = JobsChangeListener(connect, poll_seconds=0.02, max_backoff=0.05)
+    seen = []
+    listener.on_change(seen.append)
+    listener.ensure_running()
+    try:
+        _wait(seen, 0)
+        with app.app_context():
+            Job.insert_many([_job(1)])
+        _wait(seen, 1)
+    finally:
+        listener.stop()
+    assert len(attempts) == 2
+
+
+class _FakePg:
+    """Postgres-shaped connection: LISTEN, queued notifications and the generation row."""
+
+    def __init__(self):
+        self.generation = 3
+        self.notes = queue.Queue()
+        self.listening = []
+
+    def execute(self, sql):
+        self.listening.append(sql)
+
+    def notifies(self, timeout):
+        try:
+            yield self.notes.get(timeout=timeout)
+        except queue.Empty:
+            return
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                pass
+
+            def fetchone(self):
+                return (conn.generation,)
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+    def close(self):
+        pass
+
+
+def test_postgres_listener_follows_notifications():
+    conn = _FakePg()
+    listener = JobsChangeListener(lambda: conn, poll_seconds=60)
+    seen = []
+    listener.on_change(seen.append)
+    listener.ensure_running()
+    try:
+        _wait(seen, 3)
+        conn.generation = 4
+        conn.notes.put(SimpleNamespace(payload="4"))
+        # Handled on arrival, well before the next poll.
+        _wait(seen, 4)
+    finally:
+        listener.stop(timeout=0)
+    assert conn.listening == ["LISTEN jobs_changed"]
+
+
+def test_generation_change_retires_cached_searches(app):
+    store = JobStore(refresh_seconds=3600)
+    set_job_store(store)
+    try:
+        with app.app_context():
+            Job.insert_many([_job(1)])
+            store.refresh(get_db())
+        client = app.test_client()
+        assert client.get("/api/jobs").get_json()["meta"]["total"] == 1
+        with app.app_context():
+            Job.insert_many([_job(2, "Data Engineer")])
+        # Cached (and the store not due to refresh) until the listener reports the change.
+        assert client.get("/api/jobs").get_json()["meta"]["total"] == 1
+        app_module._drop_job_caches(2)
+        assert app_module.search_cache.generation == 2
+        assert client.get("/api/jobs").get_json()["meta"]["total"] == 2
+    finally:
+        set_job_store(None)
@@ -0,0 +1,183 @@
+import io
+import json
+
+import pytest
+
+from app.models.db import Job, get_db, location_country_code
+from app.models.ingest import (
+    IngestContext, IngestPipeline, ingest_file, iter_json_items, read_json, resolve_stages,
+)
+from app.models.salary import SalaryIndex
+
+TSV = (
+    "id\tjob_title\tjob_description\tlink\tjob_title_norm\tlocation\tjob_date\tdate\n"
+    "1\tJava Engineer\t10 hours ago — Build payment services. Java and Kafka.\thttps://example.com/1\tSoftware\tAmsterdam\t20251009\t2025-10-09 20:32:25.749+02\n"
+    "2\tJava Engineer\tduplicate row\thttps://example.com/1\tSoftware\tAmsterdam\t20251009\t2025-10-09 20:32:25.749+02\n"
+    "3\tNo Link\tdropped\t\t\tBerlin\t\t\n"
+)
+
+
+def _jobs(app):
+    with app.app_context():
+        cur = get_db().execute(
+            "SELECT link, job_description, job_title_norm, country_code, job_date, date, "
+            "salary_min, salary_max, salary_currency, summary FROM Jobs ORDER BY link"
+        )
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def test_location_country_code():
+    assert location_country_code("Lisbon, Portugal") == "PT"
+    assert location_country_code("Berlin, DE") == "DE"
+    assert location_country_code("Hyderabad, Telangana, India") == ""
+
+
+def test_iter_json_items_streams_across_chunk_boundaries():
+    doc = {
+        "meta": {"note": "skip [me]", "ids": [1, 2]},
+        "generated_jobs": [{"metadata": {"n": i, "pay": 1234.5, "s": 'a"]}'}} for i in range(50)],
+        "tail": [0],
+    }
+    text = json.dumps(doc, indent=2)
+    for chunk_size in (1, 7, 4096):
+        items = list(iter_json_items(io.StringIO(text), keys=["generated_jobs"], chunk_size=chunk_size))
+        assert items == doc["generated_jobs"]
+    assert list(iter_json_items(io.StringIO("[12, -3e2, true]"), chunk_size=1)) == [12, -300.0, True]
+    with pytest.raises(ValueError):
+        list(iter_json_items(io.StringIO("[1, 2")))
+
+
+@pytest.mark.parametrize(
+    "doc, titles",
+    [
+        ({"meta": [{"v": 1}], "jobs": [{"job_title": "A"}, {"job_title": "B"}]}, ["A", "B"]),
+        ({"meta": {"v": 1}, "rows": [{"job_title": "A"}]}, ["A"]),
+        ({"job_title": "Solo", "link": "https://example.com/solo"}, ["Solo"]),
+        ({"jobs": [], "other": [{"job_title": "X"}]}, []),
+    ],
+)
+def test_read_json_picks_the_job_list(tmp_path, doc, titles):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    assert [row.get("job_title") for row in read_json(path)] == titles
+
+
+def test_ingest_tsv_normalizes_and_dedupes(app, tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(TSV, encoding="utf-8")
+    with app.app_context():
+        report = ingest_file(path)
+        again = ingest_file(path)
+    assert report["read"] == 3
+    assert (report["inserted"], report["updated"], report["duplicates"], report["rejected"]) == (1, 0, 1, 1)
+    assert [st["stage"] for st in report["stages"]] == [
+        "read", "normalize", "dedupe", "hash", "diff", "describe", "parse", "rank", "write"
+    ]
+    assert [st["rows"] for st in report["stages"]] == [3, 2, 1, 1, 1, 1, 1, 1, 1]
+    assert (again["inserted"], again["updated"], again["unchanged"]) == (0, 0, 1)
+    (job,) = _jobs(app)
+    assert job["job_description"] == "Build payment services. Java and Kafka."
+    assert job["job_title_norm"] == "software"
+    assert job["country_code"] == "NL"
+    assert (job["job_date"], job["date"]) == ("20251009", "2025-10-09T20:32:25+02:00")
+
+
+def test_ingest_rewrites_only_changed_rows(app, tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(TSV, encoding="utf-8")
+    with app.app_context():
+        ingest_file(path)
+        path.write_text(
+            TSV.replace("Java and Kafka.", "Java and Flink.")
+            + "4\tData Engineer\tSpark.\thttps://example.com/4\t\tZurich\t20251010\t\n",
+            encoding="utf-8",
+        )
+        report = ingest_file(path)
+        path.write_text(TSV, encoding="utf-8")
+        partial = ingest_file(path)
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (1, 1, 0)
+    assert (partial["inserted"], partial["updated"], partial["unchanged"]) == (0, 1, 0)
+    describe = next(st for st in partial["stages"] if st["stage"] == "describe")
+    assert describe["rows"] == 1
+    descriptions = [job["job_description"] for job in _jobs(app)]
+    assert descriptions == ["Build payment services. Java and Kafka.", "Spark."]
+
+
+def test_ingest_nested_json_with_salary(app, tmp_path):
+    path = tmp_path / "generated.json"
+    doc = {
+        "generated_jobs": [
+            {
+                "metadata": {
+                    "job_title": "Data Engineer",
+                    "location": "Lisbon, Portugal",
+                    "salary_range": {"min": 70000, "max": 50000, "currency": "eur"},
+                    "created_at": "2025-10-05T01:51:32+00:00",
+                },
+                "job_post": {"url": "https://example.com/json", "description": "Build pipelines."},
+            }
+        ]
+    }
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    with app.app_context():
+        report = ingest_file(path)
+    assert report["inserted"] == 1
+    (job,) = _jobs(app)
+    assert job["country_code"] == "PT"
+    assert (job["salary_min"], job["salary_max"], job["salary_currency"]) == (50000, 70000, "EUR")
+    assert job["job_date"] == "20251005"
+    assert job["summary"] == "Build pipelines."
+
+
+def test_parallel_stage_matches_serial_and_keeps_order():
+    rows = [
+        {"link": f"https://example.com/{i}", "job_description": f"2 days ago - Role {i}. Team {i}.",
+         "date": "2025-10-0%d" % (1 + i % 9), "salary": "%dk - %dk" % (40 + i, 60 + i)}
+        for i in range(25)
+    ]
+    ctx = IngestContext(None, batch_size=10)
+    (_, describe), (_, parse) = resolve_stages(["describe", "parse"])
+    expected = list(parse(describe([dict(r) for r in rows], ctx), ctx))
+    parallel = resolve_stages(["describe", "parse"], workers=2, chunk_size=3)
+    assert [name for name, _ in parallel] == ["describe+parse"]
+    assert list(parallel[0][1]([dict(r) for r in rows], ctx)) == expected
+
+
+def test_full_reload_is_postgres_only(app, tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(TSV, encoding="utf-8")
+    with app.app_context():
+        with pytest.raises(RuntimeError, match="serving database"):
+            ingest_file(path, full_reload=True)
+        assert _jobs(app) == []
+
+
+def test_full_reload_ranks_before_the_load_starts(app, tmp_path, monkeypatch):
+    path = tmp_path / "jobs.csv"
+    path.write_text(TSV, encoding="utf-8")
+    loaded = []
+
+    def reload(rows, db=None, **kwargs):
+        db.close()  # streaming COPY from here on: the connection runs nothing else
+        loaded.extend(rows)
+        return {"inserted": len(loaded), "updated": 0, "removed": 0}
+
+    monkeypatch.setattr("app.models.ingest.salary_index", SalaryIndex(refresh_seconds=3600))
+    monkeypatch.setattr(Job, "reload", staticmethod(reload))
+    with app.app_context():
+        db = get_db()
+        db.execute("CREATE TABLE regions (location TEXT, country TEXT, med_sal TEXT, min_sal TEXT, curr TEXT)")
+        db.execute("INSERT INTO regions VALUES ('Amsterdam', 'Netherlands', '70000', '50000', 'EUR')")
+        db.commit()
+        ingest_file(path, full_reload=True)
+    assert [row["pay_rank"] for row in loaded] == [76]
+    with pytest.raises(ValueError, match="diff"):
+        IngestPipeline(resolve_stages(), full_reload=True)
+
+
+def test_reload_index_names_follow_the_table():
+    assert Job._renamed_index("jobs_pkey", "jobs", "jobs_next") == "jobs_next_pkey"
+    assert Job._renamed_index("idx_jobs_date", "jobs", "jobs_prev") == "idx_jobs_prev_date"
+    assert Job._renamed_index("idx_jobs_next_pay_rank", "jobs_next", "jobs") == "idx_jobs_pay_rank"
+    assert Job._renamed_index("jobs_link_key", "jobs_swap", "jobs_prev") == "jobs_link_key"
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.db import Job
+
+
+@pytest.fixture
+def seed_jobs():
+    return [
+        {
+            "job_title": "Backend Engineer",
+            "job_description": "Python services",
+            "link": "https://example.com/berlin",
+            "location": "Berlin, DE",
+            "date": "2024-10-03T00:00:00",
+        },
+        {
+            "job_title": "Software Engineer",
+            "job_description": "Remote friendly team",
+            "link": "https://example.com/zurich",
+            "location": "Zurich",
+            "date": "2024-10-02T00:00:00",
+        },
+        {
+            "job_title": "100% Growth Marketer",
+            "job_description": "Own acquisition",
+            "link": "https://example.com/madrid",
+            "location": "Madrid, Spain",
+            "date": "2024-10-01T00:00:00",
+        },
+    ]
+
+
+def test_pg_where_shape_is_independent_of_pattern_count():
+    shapes = {Job._where("engineer", code)[0]["pg"] for code in ("DE", "CH", "US", "EU", "berlin")}
+    assert len(shapes) == 1
+    # HIGH_PAY filters on the indexed pay_rank instead of location patterns.
+    assert "pay_rank >= %s" in Job._where("engineer", "HIGH_PAY")[0]["pg"]
+    _, _, params_pg = Job._where("remote developer", "EU")
+    assert all(isinstance(param, list) for param in params_pg)
+
+
+def test_sqlite_params_match_placeholders():
+    where_sql, params_sqlite, _ = Job._where("remote developer", "DE")
+    assert where_sql["sqlite"].count("?") == len(params_sqlite)
+
+
+def test_search_filters_by_country_and_title(app):
+    with app.app_context():
+        de_rows = Job.search(None, "DE")
+        dev_rows = Job.search("developer", None)
+        assert Job.count(None, "CH") == 1
+    assert [row["link"] for row in de_rows] == ["https://example.com/berlin"]
+    assert [row["link"] for row in dev_rows] == ["https://example.com/zurich"]
+
+
+def test_search_escapes_like_wildcards(app):
+    with app.app_context():
+        assert [row["link"] for row in Job.search("100%", None)] == ["https://example.com/madrid"]
+        assert Job.count("1_0", None) == 0
+
+
+def test_bulk_upsert_reports_inserted_updated_skipped(app):
+    rows = [
+        {"job_title": "Backend Engineer", "job_description": "Go services", "link": "https://example.com/berlin",
+         "location": "Berlin, DE", "date": "2024-10-03T00:00:00"},
+        {"job_title": "Software Engineer", "job_description": "Remote friendly team", "link": "https://example.com/zurich",
+         "location": "Zurich", "date": "2024-10-02T00:00:00"},
+        {"job_title": "Designer", "link": "https://example.com/new", "location": "Paris"},
+    ]
+    with app.app_context():
+        stats = Job.bulk_upsert(rows, update_existing=True)
+        again = Job.bulk_upsert(rows, update_existing=True)
+        berlin = Job.search("engineer", "DE")[0]
+    assert stats == {"inserted": 1, "updated": 1, "skipped": 1}
+    assert again == {"inserted": 0, "updated": 0, "skipped": 3}
+    assert berlin["job_description"] == "Go services"
+
+
+def test_archive_expired_moves_old_jobs_in_batches(app):
+    old = [
+        {"job_title": f"Legacy Engineer {i}", "job_description": "Maintain COBOL. Long nights.",
+         "summary": "Maintain COBOL.", "link": f"https://example.com/old/{i}", "location": "Berlin, DE",
+         "date": "2020-01-0%dT00:00:00" % (i + 1)}
+        for i in range(3)
+    ]
+    with app.app_context():
+        Job.insert_many(old)
+        old_id = Job.search("legacy engineer 0", None)[0]["id"]
+        moved = Job.archive_expired(1500, batch_size=2)
+        hot = Job.count("legacy", None)
+        total = Job.count("legacy", None, include_archived=True)
+        rows = Job.search("legacy", "DE", include_archived=True)
+        link = Job.get_link(str(old_id))
+    assert moved == 3
+    assert hot == 0 and total == 3
+    assert [row["link"] for row in rows] == [f"https://example.com/old/{i}" for i in (2, 1, 0)]
+    assert all(row["archived"] for row in rows)
+    assert rows[0]["job_description"] == "Maintain COBOL. Long nights."
+    assert link == "https://example.com/old/0"
+
+
+def test_archive_only_compares_yyyymmdd_job_dates(app):
+    recent = (datetime.now(timezone.utc) - timedelta(days=2)).date()
+    rows = [
+        {"job_title": "Dated Job", "link": "https://example.com/dashed", "job_date": recent.isoformat()},
+        {"job_title": "Dated Job", "link": "https://example.com/dotted", "job_date": recent.strftime("%d.%m.%Y")},
+        {"job_title": "Dated Job", "link": "https://example.com/compact-old", "job_date": "20200105"},
+    ]
+    with app.app_context():
+        Job.insert_many(rows)
+        Job.archive_expired(30)
+        left = sorted(row["link"] for row in Job.search("dated job", None))
+    assert left == ["https://example.com/dashed", "https://example.com/dotted"]
+
+
+def test_api_jobs_include_archived(app):
+    with app.app_context():
+        Job.insert_many([{"job_title": "Archivist", "link": "https://example.com/archivist",
+                          "location": "Madrid", "date": "2019-05-01T00:00:00"}])
+        Job.archive_expired(1500)
+    client = app.test_client()
+    live = client.get("/api/jobs?title=archivist").get_json()
+    historical = client.get("/api/jobs?title=archivist&include_archived=1").get_json()
+    assert live["meta"]["total"] == 0
+    assert historical["meta"]["total"] == 1
+    assert historical["items"][0]["archived"] is True
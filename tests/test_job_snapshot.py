@@ -0,0 +1,64 @@
+import pytest
+
+from app.models.db import Job, get_db, set_job_store
+from app.models.snapshot import SnapshotStore, write_snapshot
+
+JOBS = [
+    {"job_title": "Senior Python Developer", "job_description": "Django and SQL", "link": "https://example.com/1",
+     "location": "Berlin, DE", "date": "2024-10-03T00:00:00", "pay_rank": 92},
+    {"job_title": "Data Engineer", "job_description": "Kafka pipelines", "link": "https://example.com/2",
+     "location": "Zurich", "date": "2024-10-01T00:00:00", "pay_rank": 146},
+    {"job_title": "Remote QA Tester", "job_description": None, "link": "https://example.com/3",
+     "location": "Remote", "date": None},
+    {"job_title": "Backend Engineer", "job_description": "Go services", "link": "https://example.com/4",
+     "location": "Madrid, Spain", "date": "2024-10-02T00:00:00"},
+]
+QUERIES = [(None, None), ("engineer", None), ("developer", "DE"), ("remote", None), (None, "HIGH_PAY"), (None, "ES")]
+
+
+@pytest.fixture
+def seed_jobs():
+    return JOBS
+
+
+def test_snapshot_store_matches_sql(app, tmp_path):
+    path = tmp_path / "jobs.snapshot"
+    with app.app_context():
+        header = write_snapshot(str(path), get_db())
+        assert header["count"] == 4
+        store = SnapshotStore(str(path))
+        for title, country in QUERIES:
+            for sort in (None, "pay"):
+                set_job_store(None)
+                expected = Job.search(title, country, sort=sort)
+                total = Job.count(title, country)
+                set_job_store(store)
+                assert Job.search(title, country, sort=sort) == expected, (title, country, sort)
+                assert Job.count(title, country) == total
+
+
+def test_snapshot_swap_is_picked_up_by_version(app, tmp_path):
+    path = str(tmp_path / "jobs.snapshot")
+    with app.app_context():
+        write_snapshot(path, get_db())
+        store = SnapshotStore(path, check_seconds=3600)
+        assert store.refresh() == 4
+        first = store.version
+        Job.bulk_upsert([{"job_title": "Platform Engineer", "link": "https://example.com/5", "location": "Lisbon"}])
+        write_snapshot(path, get_db())
+        assert store.refresh() == 0  # throttled
+        assert store.refresh(force=True) == 5
+        assert store.version != first
+        assert store.count("engineer") == 3
+        assert store.search("platform")[0]["location"] == "Lisbon"
+
+
+def test_snapshot_word_cache_is_bounded(app, tmp_path):
+    path = str(tmp_path / "jobs.snapshot")
+    with app.app_context():
+        write_snapshot(path, get_db())
+        store = SnapshotStore(path, word_cache_size=2)
+        for word in ("engineer", "python", "kafka", "remote"):
+            store.count(word)
+        assert list(store._columns.view.words) == ["kafka", "remote"]
+        assert store.count("engineer") == 2
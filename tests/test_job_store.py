@@ -0,0 +1,130 @@
+import random
+import threading
+
+import pytest
+
+from app.models.db import Job, get_db, set_job_store
+from app.models.store import JobStore
+
+TITLES = [
+    "Senior Python Developer", "Data Engineer", "Backend Engineer (Java)", "100% Remote QA Tester",
+    "Machine Learning Engineer", "Software Engineer_II", "Product Manager", "Growth Marketer",
+]
+LOCATIONS = [
+    "Berlin, DE", "Zurich", "Madrid, Spain", "Remote", "London, UK", "San Francisco, CA",
+    "Lisbon, Portugal", "Paris (FR)", "Remote - EU", None,
+]
+QUERIES = [
+    (None, None), ("engineer", None), ("python developer", None), ("remote", None),
+    ("developer", "DE"), ("100%", None), ("engineer_ii", None), (None, "ES"), (None, "UK"),
+    (None, "CH"), ("data", "berlin"), (None, "HIGH_PAY"), ("engineer", "HIGH_PAY"), ("zz", None),
+]
+
+
+def _rows(rng, start, count):
+    rows = []
+    for i in range(start, start + count):
+        day = rng.randint(1, 28)
+        rows.append(
+            {
+                "job_title": rng.choice(TITLES),
+                "job_description": rng.choice(["Python and SQL.", "Kafka pipelines", "Remote-first team", ""]),
+                "link": f"https://example.com/job/{i}",
+                "location": rng.choice(LOCATIONS),
+                "date": None if i % 11 == 0 else f"2024-09-{day:02d}T0{i % 10}:00:00",
+                "pay_rank": rng.choice([None, 60, 92, 146, 150]),
+            }
+        )
+    return rows
+
+
+@pytest.fixture
+def seed_jobs():
+    return _rows(random.Random(7), 0, 120)
+
+
+def _assert_same_as_sql(store):
+    for title, country in QUERIES:
+        for sort in (None, "pay"):
+            set_job_store(None)
+            expected = Job.search(title, country, limit=500, sort=sort)
+            total = Job.count(title, country)
+            set_job_store(store)
+            assert Job.search(title, country, limit=500, sort=sort) == expected, (title, country, sort)
+            assert Job.search(title, country, limit=7, offset=5, sort=sort) == expected[5:12]
+            assert Job.count(title, country) == total
+    set_job_store(None)
+    expected = sorted(row["id"] for row in Job.search(None, "EU", limit=500))
+    set_job_store(store)
+    assert sorted(row["id"] for row in Job.search(None, "EU", limit=500)) == expected
+
+
+def test_store_matches_sql(app):
+    with app.app_context():
+        store = JobStore(refresh_seconds=3600)
+        store.refresh(get_db())
+        assert len(store) == 120
+        _assert_same_as_sql(store)
+
+
+def test_store_refreshes_incrementally_and_after_deletes(app):
+    with app.app_context():
+        db = get_db()
+        store = JobStore(refresh_seconds=3600)
+        store.refresh(db)
+        changed = _rows(random.Random(8), 100, 40)  # 20 rewritten, 20 new
+        Job.bulk_upsert(changed, update_existing=True)
+        assert store.refresh(db, force=True) == 40
+        assert store.refresh(db, force=True) == 0
+        assert len(store) == 140
+        _assert_same_as_sql(store)
+
+        db.execute("DELETE FROM Jobs WHERE id % 3 = 0")
+        db.commit()
+        store.refresh(db, force=True)
+        _assert_same_as_sql(store)
+
+
+def test_store_reloads_when_rows_were_swapped_behind_the_watermark(app):
+    with app.app_context():
+        db = get_db()
+        store = JobStore(refresh_seconds=3600)
+        store.refresh(db)
+        # As many rows gone as arrived, the arrivals older than the watermark: only the id
+        # sum shows it.
+        db.execute("UPDATE Jobs SET id = id + 1000, updated_at = '2000-01-01' WHERE id % 3 = 0")
+        db.commit()
+        store.refresh(db, force=True)
+        assert len(store) == 120
+        _assert_same_as_sql(store)
+
+
+def test_first_search_loads_in_the_background_and_uses_sql_meanwhile(app):
+    with app.app_context():
+        store = JobStore(refresh_seconds=3600)
+        expected = Job.search("engineer", None, limit=500)
+        set_job_store(store)
+        assert Job.search("engineer", None, limit=500) == expected
+        for thread in threading.enumerate():
+            if thread.name == "job-store-load":
+                thread.join(5)
+        assert len(store) == 120
+        assert store.search("engineer", None, limit=500) == expected
+
+
+def test_refresh_leaves_the_published_view_untouched(app):
+    with app.app_context():
+        db = get_db()
+        store = JobStore(refresh_seconds=3600, word_cache_size=2)
+        store.refresh(db)
+        old = store._columns.view
+        postings = {token: list(positions) for token, positions in old.postings.items()}
+        Job.bulk_upsert(_rows(random.Random(9), 100, 40), update_existing=True)
+        store.refresh(db, force=True)
+        # Queries still running on the old view see exactly what it was published with.
+        assert store._columns.view is not old
+        assert {token: list(positions) for token, positions in old.postings.items()} == postings
+        assert len(store._matches(store._columns, old, "engineer", None, False)) <= len(old.by_date)
+        for word in ("engineer", "python", "remote", "kafka"):
+            store._word_positions(store._columns.view, word)
+        assert list(store._columns.view.words) == ["remote", "kafka"]
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import app.models.db as db_module
+from app.models.db import Job, get_db, get_read_db
+from app.models.sync import sync_local_jobs
+
+JOBS = [
+    {"job_title": "Backend Engineer", "link": "https://example.com/berlin", "location": "Berlin, DE",
+     "date": "2024-10-03T00:00:00", "updated_at": "2024-10-03T00:00:00+00:00"},
+    {"job_title": "Data Engineer", "link": "https://example.com/zurich", "location": "Zurich",
+     "date": "2024-10-02T00:00:00", "updated_at": "2024-10-03T00:00:00+00:00"},
+]
+
+
+@pytest.fixture
+def seed_jobs():
+    return JOBS
+
+
+def _local_jobs(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT link, job_title FROM Jobs").fetchall())
+    finally:
+        conn.close()
+
+
+def test_sync_pulls_changes_and_drops_removed_jobs(app, tmp_path):
+    local = str(tmp_path / "local.db")
+    with app.app_context():
+        db = get_db()
+        first = sync_local_jobs(local, db)
+        assert (first["upserted"], first["full"]) == (2, True)
+
+        Job.bulk_upsert([
+            {"job_title": "Senior Backend Engineer", "link": "https://example.com/berlin",
+             "location": "Berlin, DE", "updated_at": "2024-10-05T00:00:00+00:00"},
+            {"job_title": "QA Engineer", "link": "https://example.com/qa", "location": "Remote",
+             "updated_at": "2024-10-05T00:00:00+00:00"},
+        ], update_existing=True)
+        with db.cursor() as cur:
+            cur.execute("DELETE FROM Jobs WHERE link = %s", ("https://example.com/zurich",))
+        second = sync_local_jobs(local, db)
+
+    assert (second["upserted"], second["deleted"], second["full"]) == (2, 1, False)
+    assert second["watermark"] == "2024-10-05T00:00:00+00:00"
+    assert _local_jobs(local) == {
+        "https://example.com/berlin": "Senior Backend Engineer",
+        "https://example.com/qa": "QA Engineer",
+    }
+
+
+def test_postgres_mode_reads_local_copy(app, db_path, tmp_path, monkeypatch):
+    local = str(tmp_path / "local.db")
+    with app.app_context():
+        sync_local_jobs(local, get_db())
+    primary = db_path
+    monkeypatch.setattr(db_module, "_should_use_sqlite", lambda: False)
+    monkeypatch.setattr(db_module, "_pg_connect", lambda *a, **kw: db_module._sqlite_connect())
+    monkeypatch.setattr(db_module, "LOCAL_JOBS_DB_PATH", local)
+    monkeypatch.setattr(db_module, "_serving", db_module.threading.local())
+    with app.app_context():
+        assert get_read_db() is not get_db()
+        primary.unlink()
+        # Searches no longer need the primary at all.
+        assert Job.count() == 2
+        assert [row["link"] for row in Job.search(limit=5)] == [
+            "https://example.com/berlin", "https://example.com/zurich"
+        ]
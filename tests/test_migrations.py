@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from app.models import db as db_module
+
+
+def _connect(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "migrations.db"))
+    return db_module._sqlite_connect()
+
+
+def test_migrate_db_records_version_and_creates_tables(tmp_path, monkeypatch):
+    conn = _connect(tmp_path, monkeypatch)
+    try:
+        assert db_module.migrate_db(conn) == db_module.SCHEMA_VERSION
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    finally:
+        conn.close()
+    assert {"Jobs", "subscribers", "search_events", "subscribe_events"} <= tables
+    assert versions == [version for version, _, _ in db_module._MIGRATIONS]
+
+
+def test_migrate_db_is_a_version_check_when_current(tmp_path, monkeypatch):
+    conn = _connect(tmp_path, monkeypatch)
+    try:
+        db_module.migrate_db(conn)
+        with patch.object(db_module, "_apply_migrations") as apply_mock:
+            assert db_module.migrate_db(conn) == db_module.SCHEMA_VERSION
+    finally:
+        conn.close()
+    apply_mock.assert_not_called()
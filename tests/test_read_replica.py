@@ -0,0 +1,68 @@
+import pytest
+
+import app.app as app_module
+import app.models.db as db_module
+from app.models.db import get_db, get_read_db
+
+REPLICA_URL = "postgresql://replica.invalid/catalitium"
+
+
+@pytest.fixture
+def app(app, db_path, tmp_path, monkeypatch):
+    # Route as on Postgres; both "servers" are SQLite files so the routing can be observed.
+    state = {"replica_up": True, "lag": 0.0, "replica_connects": 0}
+
+    def connect(url=None, connect_timeout=None, statement_timeout_ms=None):
+        if url == REPLICA_URL:
+            state["replica_connects"] += 1
+            if not state["replica_up"]:
+                raise OSError("connection refused")
+            monkeypatch.setenv("DB_PATH", str(tmp_path / "replica.db"))
+        else:
+            monkeypatch.setenv("DB_PATH", str(db_path))
+        return db_module._sqlite_connect()
+
+    monkeypatch.setattr(db_module, "_should_use_sqlite", lambda: False)
+    monkeypatch.setattr(db_module, "_pg_connect", connect)
+    monkeypatch.setattr(db_module, "replica_lag", lambda conn: state["lag"])
+    monkeypatch.setattr(db_module, "DATABASE_READ_URL", REPLICA_URL)
+    monkeypatch.setattr(app_module, "DATABASE_READ_URL", REPLICA_URL)
+    monkeypatch.setattr(db_module, "_replica_health", db_module._ReplicaHealth(max_lag=5, check_seconds=60))
+    app.replica_state = state
+    return app
+
+
+def test_reads_use_replica_and_writes_the_primary(app):
+    with app.app_context():
+        read_db = get_read_db()
+        assert read_db is not get_db()
+        assert get_read_db() is read_db
+
+
+def test_reads_fall_back_while_replica_is_down(app):
+    state = app.replica_state
+    state["replica_up"] = False
+    with app.app_context():
+        assert get_read_db() is get_db()
+    with app.app_context():
+        assert get_read_db() is get_db()
+    # One failed connect per check interval, not one per request.
+    assert state["replica_connects"] == 1
+
+
+def test_reads_fall_back_when_replica_lags(app):
+    app.replica_state["lag"] = 12.0
+    with app.app_context():
+        assert get_read_db() is get_db()
+    db_module._replica_health._checked_at -= 60
+    app.replica_state["lag"] = 1.0
+    with app.app_context():
+        assert get_read_db() is not get_db()
+
+
+def test_health_reports_read_target(app):
+    client = app.test_client()
+    assert client.get("/health").get_json()["read_db"] == "replica"
+    app.replica_state["replica_up"] = False
+    db_module._replica_health._checked_at -= 60
+    assert client.get("/health").get_json() == {"status": "ok", "db": "connected", "read_db": "primary"}
@@ -0,0 +1,263 @@
+import sqlite3
+import time
+from unittest.mock import patch
+
+import psycopg
+import pytest
+from flask import g
+
+import app.app as app_module
+from app.models.cache import ResultCache
+from app.models.db import (
+    STATEMENT_TIMEOUT_MS,
+    DeadlineExceeded,
+    _open_pg_for_request,
+    _request_start_age,
+    get_db,
+    start_request_deadline,
+)
+from app.models.resilience import (
+    AdmissionController,
+    CircuitBreaker,
+    CircuitOpenError,
+    GuardedReads,
+    LastKnownGood,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_half_opens_with_one_probe():
+    clock = Clock()
+    breaker = CircuitBreaker("t", failure_threshold=3, reset_seconds=10, clock=clock)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is in flight
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_guarded_reads_serve_last_known_good():
+    clock = Clock()
+    reads = GuardedReads(CircuitBreaker("t", failure_threshold=2, reset_seconds=10, clock=clock),
+                         LastKnownGood(max_age_seconds=60, clock=clock))
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise TimeoutError("statement timeout")
+
+    assert reads.call("q", lambda: [1, 2]) == ([1, 2], False)
+    assert reads.call("q", down) == ([1, 2], True)
+    assert reads.call("q", down) == ([1, 2], True)
+    # Open: the database is not called at all.
+    assert reads.call("q", down) == ([1, 2], True)
+    assert len(calls) == 2
+    with pytest.raises(CircuitOpenError):
+        reads.call("other", down)
+    # Half-open probe fails and the cached result has expired.
+    clock.now = 61
+    with pytest.raises(TimeoutError):
+        reads.call("q", down)
+
+
+def test_own_deadline_is_not_a_breaker_failure():
+    clock = Clock()
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=10, clock=clock)
+    reads = GuardedReads(breaker, LastKnownGood(clock=clock))
+
+    def fail(exc):
+        def fn():
+            raise exc
+        return fn
+
+    for exc in (DeadlineExceeded("request deadline exceeded"), sqlite3.OperationalError("interrupted"), KeyError("x")):
+        with pytest.raises(type(exc)):
+            reads.call("q", fail(exc))
+    assert breaker.state == "closed"
+
+    with pytest.raises(sqlite3.OperationalError):
+        reads.call("q", fail(sqlite3.OperationalError("unable to open database file")))
+    assert breaker.state == "open"
+    # A probe that ends without a verdict (even by a BaseException) frees its slot.
+    clock.now = 10
+    with pytest.raises(KeyboardInterrupt):
+        reads.call("q", fail(KeyboardInterrupt()))
+    with pytest.raises(DeadlineExceeded):
+        reads.call("q", fail(DeadlineExceeded("request deadline exceeded")))
+    assert reads.call("q", lambda: [1]) == ([1], False)
+    assert breaker.state == "closed"
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    monkeypatch.setattr(
+        app_module, "search_reads", GuardedReads(CircuitBreaker("t", failure_threshold=1), LastKnownGood())
+    )
+    monkeypatch.setattr(app_module, "search_admission", AdmissionController(max_inflight=1))
+    # Every request goes to the (patched) database.
+    monkeypatch.setattr(app_module, "search_cache", ResultCache(ttl=0))
+    return app.test_client()
+
+
+def test_query_errors_and_deadline_cancels_are_not_breaker_failures(app):
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=10, clock=Clock())
+    reads = GuardedReads(breaker, LastKnownGood(clock=Clock()))
+
+    def canceled():
+        raise psycopg.errors.QueryCanceled("canceling statement due to statement timeout")
+
+    with app.test_request_context():
+        with pytest.raises(sqlite3.OperationalError, match="no such table"):
+            reads.call("q", lambda: get_db().execute("SELECT * FROM no_such_table"))
+        with pytest.raises(sqlite3.OperationalError, match="no such column"):
+            reads.call("q", lambda: get_db().execute("SELECT no_such_column FROM Jobs"))
+        # The statement_timeout was what was left of the request budget.
+        start_request_deadline(budget_ms=0)
+        with pytest.raises(psycopg.errors.QueryCanceled):
+            reads.call("q", canceled)
+        assert breaker.state == "closed"
+        # Cancelled by the fixed cap with budget to spare: the database is slow.
+        start_request_deadline(budget_ms=2000)
+        with pytest.raises(psycopg.errors.QueryCanceled):
+            reads.call("q", canceled)
+        assert breaker.state == "open"
+
+
+def test_api_jobs_marks_fallback_results_stale(client):
+    rows = [{"id": 1, "job_title": "Backend Engineer", "link": "https://example.com/1", "location": "Berlin"}]
+    with patch("app.app.Job.count", return_value=1), patch("app.app.Job.search", return_value=rows):
+        fresh = client.get("/api/jobs?title=backend").get_json()
+    with patch("app.app.Job.count", side_effect=TimeoutError("canceling statement")) as count:
+        stale = client.get("/api/jobs?title=backend").get_json()
+        again = client.get("/api/jobs?title=backend").get_json()
+        missing = client.get("/api/jobs?title=frontend").get_json()
+    assert fresh["stale"] is False
+    assert stale["stale"] is True and again["stale"] is True
+    assert stale["items"] == fresh["items"]
+    assert count.call_count == 1
+    assert (missing["items"], missing["stale"]) == ([], False)
+
+
+def test_admission_downgrades_then_sheds():
+    admission = AdmissionController(max_inflight=2)
+    with admission.slot(True) as first, admission.slot(False) as second:
+        with admission.slot(True) as expensive, admission.slot(False) as cheap:
+            with admission.slot(False) as fifth:
+                assert (first, second, expensive, cheap, fifth) == ("admit", "admit", "downgrade", "admit", "shed")
+    assert admission.inflight == 0
+
+
+def test_admission_is_counted_across_workers(tmp_path):
+    # Two controllers on one lock dir stand in for two sync workers.
+    first = AdmissionController(max_inflight=1, lock_dir=str(tmp_path))
+    second = AdmissionController(max_inflight=1, lock_dir=str(tmp_path))
+    with first.slot(False) as one, second.slot(True) as two, second.slot(False) as three:
+        assert (one, two, three) == ("admit", "downgrade", "shed")
+    with second.slot(True) as again:
+        assert again == "admit"
+    assert first.inflight == second.inflight == 0
+
+
+def test_request_start_header_units():
+    now = time.time()
+    assert 4.5 < _request_start_age(f"t={now - 5:.3f}") < 5.5
+    assert 4.5 < _request_start_age(f"t={int((now - 5) * 1000)}") < 5.5
+    assert 4.5 < _request_start_age(f"t={int((now - 5) * 1e6)}") < 5.5
+    assert _request_start_age("garbage") == 0.0
+
+
+def test_request_queued_past_deadline_is_shed(client):
+    queued = f"t={time.time() - 60:.3f}"
+    with patch("app.app.Job.count") as count:
+        response = client.get("/api/jobs?title=backend", headers={"X-Request-Start": queued})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    count.assert_not_called()
+
+
+def test_busy_worker_downgrades_page_size(client):
+    rows = [{"id": 1, "job_title": "Backend Engineer", "link": "https://example.com/1"}]
+    app_module.search_admission.inflight = 1
+    try:
+        with patch("app.app.Job.count", return_value=1), patch("app.app.Job.search", return_value=rows) as search:
+            wide = client.get("/api/jobs?per_page=100")
+            deep = client.get("/api/jobs?page=50")
+    finally:
+        app_module.search_admission.inflight = 0
+    assert wide.get_json()["meta"]["per_page"] == 20
+    assert search.call_args.kwargs["limit"] == 20
+    assert deep.status_code == 503
+
+
+def test_shed_search_page_stays_html(client):
+    app_module.search_admission.inflight = 2
+    try:
+        with patch("app.app.Job.count") as count:
+            response = client.get("/?title=backend")
+    finally:
+        app_module.search_admission.inflight = 0
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.mimetype == "text/html"
+    assert b'data-busy="true"' in response.data
+    count.assert_not_called()
+
+
+def test_search_page_says_why_results_are_saved(client):
+    rows = [{"id": 1, "job_title": "Backend Engineer", "link": "https://example.com/1", "location": "Berlin"}]
+    with patch("app.app.insert_search_event"):
+        with patch("app.app.Job.count", return_value=1), patch("app.app.Job.search", return_value=rows):
+            assert b"data-stale" not in client.get("/?title=backend").data
+        app_module.search_admission.inflight = 2
+        try:
+            busy = client.get("/?title=backend")
+        finally:
+            app_module.search_admission.inflight = 0
+        with patch("app.app.Job.count", side_effect=TimeoutError("canceling statement")):
+            down = client.get("/?title=backend")
+    assert busy.status_code == down.status_code == 200
+    assert b'data-stale="busy"' in busy.data and b"unavailable" not in busy.data
+    assert b'data-stale="unavailable"' in down.data
+
+
+def test_request_statement_timeout_is_capped_by_the_fixed_one(app):
+    with app.test_request_context(), patch("app.models.db._pg_connect") as connect:
+        start_request_deadline(budget_ms=2000)
+        conn = _open_pg_for_request()
+        assert connect.call_args.kwargs["statement_timeout_ms"] == STATEMENT_TIMEOUT_MS
+        assert g.statement_timeouts[id(conn)] == STATEMENT_TIMEOUT_MS
+        start_request_deadline(budget_ms=300)
+        conn = _open_pg_for_request()
+        assert 0 < connect.call_args.kwargs["statement_timeout_ms"] <= 300
+        assert g.statement_timeouts[id(conn)] == connect.call_args.kwargs["statement_timeout_ms"]
+
+
+def test_sqlite_queries_stop_at_the_deadline(app):
+    with app.test_request_context("/"):
+        start_request_deadline(budget_ms=50)
+        started = time.monotonic()
+        with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+            get_db().execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+            ).fetchone()
+        assert time.monotonic() - started < 2
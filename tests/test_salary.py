@@ -0,0 +1,160 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from app.models import db as db_module
+from app.models.db import Job, get_db
+from app.models.resilience import search_reads
+from app.models.salary import SalaryIndex, enrich_salary_reference, rank_jobs, salary_index
+
+REGIONS = [
+    ("1", "Berlin", "Germany", "85000", "55000", "EUR"),
+    ("2", "Munich", "Germany", "90000", "60000", "EUR"),
+    ("3", "Hamburg", "Germany", "80000", "52000", "EUR"),
+    ("4", "Zurich", "Switzerland", "130000", "90000", "CHF"),
+]
+
+
+def _reference_db(conn):
+    conn.execute("CREATE TABLE regions (loc_id TEXT, location TEXT, country TEXT, med_sal TEXT, min_sal TEXT, curr TEXT)")
+    conn.executemany("INSERT INTO regions VALUES (?, ?, ?, ?, ?, ?)", REGIONS)
+    conn.execute(
+        "CREATE TABLE salary (GeoSalaryId INTEGER, Location TEXT, MedianSalary REAL, MinSalary REAL, "
+        "CurrencyTicker TEXT, City TEXT, Country TEXT, Region TEXT, RemoteType TEXT)"
+    )
+    conn.execute("INSERT INTO salary VALUES (1, 'Spain', 60000, 40000, 'EUR', '', 'Spain', 'Europe', '')")
+    conn.commit()
+    return conn
+
+
+def test_lookup_matches_city_then_country():
+    index = SalaryIndex(refresh_seconds=3600)
+    assert index.refresh(_reference_db(sqlite3.connect(":memory:")))
+    berlin = index.lookup("Berlin, DE")
+    assert (berlin["median"], berlin["min"], berlin["currency"], berlin["match"]) == (85000, 55000, "EUR", "city")
+    assert index.lookup("Zurich")["currency"] == "CHF"
+    assert index.lookup("Cologne, Germany") == dict(
+        median=85000, min=55000, currency="EUR", label="DE", match="country"
+    )
+    assert index.lookup("Madrid, Spain")["label"] == "Spain"
+    assert index.lookup("Remote") is None
+
+
+def test_refresh_reloads_only_when_tables_change():
+    conn = _reference_db(sqlite3.connect(":memory:"))
+    index = SalaryIndex(refresh_seconds=0)
+    assert index.refresh(conn)
+    assert not index.refresh(conn)
+    conn.execute("DELETE FROM regions WHERE location = 'Berlin'")
+    conn.execute("INSERT INTO regions VALUES ('1', 'Berlin', 'Germany', '95000', '55000', 'EUR')")
+    assert index.refresh(conn)
+    assert index.lookup("Berlin")["median"] == 95000
+    # Throttled: a change inside the refresh window is not picked up until forced.
+    index = SalaryIndex(refresh_seconds=3600)
+    index.refresh(conn)
+    conn.execute("UPDATE regions SET med_sal = '99000' WHERE location = 'Berlin'")
+    assert not index.refresh(conn)
+    assert index.refresh(conn, force=True)
+
+
+def test_enrich_connects_only_when_a_check_is_due(monkeypatch):
+    index = SalaryIndex(refresh_seconds=3600)
+    index.refresh(_reference_db(sqlite3.connect(":memory:")))
+    monkeypatch.setattr("app.models.salary.salary_index", index)
+    with patch("app.models.salary.get_db") as get_db_mock:
+        rows = enrich_salary_reference([{"location": "Berlin, DE"}])
+        assert rows[0]["salary_reference"]["median"] == 85000
+        # Due, but the search breaker is open: no connection attempt either.
+        index._checked_at = None
+        monkeypatch.setattr(search_reads.breaker, "_state", search_reads.breaker.OPEN)
+        monkeypatch.setattr(search_reads.breaker, "_opened_at", search_reads.breaker._clock())
+        enrich_salary_reference([{"location": "Berlin, DE"}])
+    get_db_mock.assert_not_called()
+
+
+def test_missing_tables_give_empty_index():
+    index = SalaryIndex()
+    index.refresh(sqlite3.connect(":memory:"))
+    assert len(index) == 0
+    assert index.lookup("Berlin, DE") is None
+
+
+@pytest.fixture
+def seed_jobs():
+    return [
+        {"job_title": "Backend Engineer", "link": "https://example.com/berlin", "location": "Berlin, DE",
+         "date": "2024-10-03T00:00:00"},
+        {"job_title": "Data Engineer", "link": "https://example.com/zurich", "location": "Zurich",
+         "date": "2024-10-01T00:00:00"},
+        {"job_title": "Support Engineer", "link": "https://example.com/remote", "location": "Remote",
+         "date": "2024-10-04T00:00:00"},
+    ]
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db = get_db()
+        _reference_db(db)
+        salary_index.refresh(db, force=True)
+    yield app
+    salary_index.refresh(sqlite3.connect(":memory:"), force=True)
+
+
+def test_api_items_carry_salary_reference(app):
+    client = app.test_client()
+    items = {item["location"]: item for item in client.get("/api/jobs").get_json()["items"]}
+    assert items["Berlin, DE"]["salary_reference"]["median"] == 85000
+    assert items["Remote"]["salary_reference"] is None
+    insights = {item["location"]: item for item in client.get("/api/salary-insights").get_json()["items"]}
+    assert insights["Zurich"]["salary_reference"]["label"] == "Zurich"
+    assert b"Ref." in client.get("/").data
+
+
+def test_job_card_escapes_unknown_currency(app):
+    with app.app_context():
+        db = get_db()
+        db.execute("UPDATE regions SET curr = '<b>CHF</b>' WHERE location = 'Zurich'")
+        db.commit()
+        salary_index.refresh(db, force=True)
+    page = app.test_client().get("/").data
+    assert b"Ref. &lt;B&gt;CHF&lt;/B&gt; 90,000" in page
+    assert b"&euro; 55,000" in page
+
+
+def test_pay_rank_drives_high_pay_and_sort(app):
+    assert salary_index.pay_rank("Zurich") == 146
+    with app.app_context():
+        assert rank_jobs() == 2
+        assert rank_jobs() == 0
+        assert [row["location"] for row in Job.search(country="HIGH_PAY")] == ["Zurich"]
+        assert Job.count(country="HIGH_PAY") == 1
+    items = app.test_client().get("/api/jobs?sort=pay").get_json()["items"]
+    assert [(item["location"], item["pay_rank"]) for item in items] == [
+        ("Zurich", 146), ("Berlin, DE", 92), ("Remote", None)
+    ]
+
+
+def test_migration_leaves_the_pay_rank_backfill_to_rank_jobs(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "upgrade.db"))
+    conn = _reference_db(db_module._sqlite_connect())
+    try:
+        db_module.migrate_db(conn)
+        conn.executemany(
+            "INSERT INTO Jobs (job_title, link, location) VALUES (?, ?, ?)",
+            [("Data Engineer", f"https://example.com/{i}", "Zurich") for i in range(3)],
+        )
+        # A database migrated before the check existed: ranks are all NULL.
+        conn.execute("DELETE FROM schema_version WHERE version >= 9")
+        conn.commit()
+        with caplog.at_level("WARNING", logger=db_module.logger.name):
+            db_module.migrate_db(conn)
+        assert "rank-jobs" in caplog.text
+        assert conn.execute("SELECT COUNT(pay_rank) FROM Jobs").fetchone()[0] == 0
+        assert rank_jobs(conn, batch_size=2) == 3
+        ranks = [row[0] for row in conn.execute("SELECT pay_rank FROM Jobs")]
+    finally:
+        conn.close()
+        salary_index.refresh(sqlite3.connect(":memory:"), force=True)
+    assert ranks == [146, 146, 146]
@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+from flask import g
+
+import app.app as app_module
+import app.models.db as db_module
+from app.models.cache import ResultCache
+from app.models.db import Job, get_db, get_read_db
+from app.models.serving import build_serving_db
+
+JOBS = [
+    {"job_title": "Backend Engineer", "link": "https://example.com/berlin", "location": "Berlin, DE",
+     "date": "2024-10-03T00:00:00"},
+    {"job_title": "Data Engineer", "link": "https://example.com/zurich", "location": "Zurich",
+     "date": "2024-10-02T00:00:00"},
+]
+
+
+@pytest.fixture
+def seed_jobs():
+    return JOBS
+
+
+@pytest.fixture(autouse=True)
+def serving_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "SERVING_DB_PATH", str(tmp_path / "serving.db"))
+    monkeypatch.setattr(app_module, "search_cache", ResultCache(ttl=0))
+
+
+def test_reads_fall_back_to_main_db_until_built(app):
+    with app.app_context():
+        assert get_read_db() is get_db()
+        assert Job.count() == 2
+
+
+def test_reads_come_from_published_version(app, tmp_path):
+    with app.app_context():
+        built = build_serving_db(db_module.SERVING_DB_PATH, get_db())
+        assert built["jobs"] == 2
+        Job.bulk_upsert([{"job_title": "QA Engineer", "link": "https://example.com/qa", "location": "Remote"}])
+    client = app.test_client()
+    assert client.get("/api/jobs").get_json()["meta"]["total"] == 2
+    with app.app_context():
+        read_db = get_read_db()
+        assert read_db is not get_db()
+        with pytest.raises(sqlite3.OperationalError):
+            read_db.execute("DELETE FROM Jobs")
+        # Not in the serving copy yet, but still resolvable from the main database.
+        qa_id = get_db().execute("SELECT id FROM Jobs WHERE link = 'https://example.com/qa'").fetchone()[0]
+        assert Job.get_link(qa_id) == "https://example.com/qa"
+        build_serving_db(db_module.SERVING_DB_PATH, get_db())
+    assert not list(tmp_path.glob(".serving.db.*"))
+    items = client.get("/api/jobs").get_json()["items"]
+    assert [item["link"] for item in items][-1] == "https://example.com/qa"
+
+
+def test_get_link_opens_the_main_db_only_for_a_miss(app):
+    with app.app_context():
+        build_serving_db(db_module.SERVING_DB_PATH, get_db())
+        Job.bulk_upsert([{"job_title": "QA Engineer", "link": "https://example.com/qa", "location": "Remote"}])
+        served_id, qa_id = (
+            get_db().execute(f"SELECT id FROM Jobs WHERE link = '{link}'").fetchone()[0]
+            for link in ("https://example.com/berlin", "https://example.com/qa")
+        )
+    with app.app_context():
+        assert Job.get_link(served_id) == "https://example.com/berlin"
+        assert "db" not in g
+        assert Job.get_link(qa_id) == "https://example.com/qa"
+        assert "db" in g